@@ -2,94 +2,105 @@
 """
 Analyze Contact Classification
 Detailed analysis of contacts needing classification in Hook Odoo
+Usage: python TEST/analyze_contacts.py [--shards 4]
 """
 
+import argparse
 import sys
 from pathlib import Path
 
 # Add parent directory to path to import our modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from _classification_rules import classification_domain, compile_matcher, describe_rule, load_rules, rank_fields
 from _config import connect_odoo
+from _partner_scan import id_ranges, iter_pages, map_id_ranges
 
+INSTANCE = 'hook'
 
-def analyze_contacts():
-    """Analyze contacts that need classification"""
+
+def analyze_range(start_id, end_id, instance, rules):
+    """
+    Count the contacts of every rule with start_id < id (<= end_id) and
+    collect the first 10 needing classification; run in a worker process per
+    id range when sharded
+    """
+    models, db, uid, password = connect_odoo(instance)
+    
+    # All contacts of every rule streamed in id-ordered pages, counted per rule as they arrive
+    match = compile_matcher(rules)
+    totals = {label: 0 for label, prefixes, ranks in rules}
+    needs_counts = dict(totals)
+    needs_samples = {label: [] for label in totals}
+    for page in iter_pages(models, db, uid, password, classification_domain(rules, unclassified_only=False),
+                           ['name', 'ref'] + rank_fields(rules), start_id=start_id, end_id=end_id):
+        for contact in page:
+            rule = match(contact['ref'])
+            if rule is None:
+                continue
+            label, prefixes, ranks = rule
+            totals[label] += 1
+            if not all(contact[rank_field] for rank_field in ranks):
+                needs_counts[label] += 1
+                if len(needs_samples[label]) < 10:  # Show first 10
+                    needs_samples[label].append(contact)
+    return totals, needs_counts, needs_samples
+
+
+def analyze_contacts(shards=1):
+    """Analyze contacts that need classification, scanning shards id ranges in parallel processes"""
     print("🔍 Analyzing Contact Classification Status...")
     print("-" * 60)
     
     try:
-        models, db, uid, password = connect_odoo('hook')
-        
-        # Get vendor contacts (V* references)
-        print("\n📊 VENDOR ANALYSIS (V* references)")
-        print("-" * 40)
-        
-        vendor_ids = models.execute_kw(
-            db, uid, password, 'res.partner', 'search',
-            [[['ref', '=like', 'V%']]]
-        )
-        
-        if vendor_ids:
-            vendors = models.execute_kw(
-                db, uid, password, 'res.partner', 'read',
-                [vendor_ids], {'fields': ['name', 'ref', 'supplier_rank', 'customer_rank']}
-            )
-            
-            needs_vendor_classification = [v for v in vendors if v['supplier_rank'] == 0]
-            already_vendors = [v for v in vendors if v['supplier_rank'] > 0]
-            
-            print(f"Total V* contacts: {len(vendors)}")
-            print(f"Already classified as vendors: {len(already_vendors)}")
-            print(f"Need vendor classification: {len(needs_vendor_classification)}")
-            
-            if needs_vendor_classification:
-                print("\nContacts needing vendor classification:")
-                for contact in needs_vendor_classification[:10]:  # Show first 10
-                    print(f"  - {contact['name']} ({contact['ref']})")
-                if len(needs_vendor_classification) > 10:
-                    print(f"  ... and {len(needs_vendor_classification) - 10} more")
+        rules = load_rules()
+        if shards > 1:
+            models, db, uid, password = connect_odoo(INSTANCE)
+            ranges = id_ranges(models, db, uid, password, classification_domain(rules, unclassified_only=False),
+                               shards)
+            print(f"🧩 Scanning {len(ranges)} id ranges in worker processes")
+            partials = list(map_id_ranges(analyze_range, ranges, INSTANCE, rules))
         else:
-            print("No contacts found with V* reference pattern")
-        
-        # Get customer contacts (C* references)
-        print("\n📊 CUSTOMER ANALYSIS (C* references)")
-        print("-" * 40)
+            partials = [analyze_range(0, None, INSTANCE, rules)]
         
-        customer_ids = models.execute_kw(
-            db, uid, password, 'res.partner', 'search',
-            [[['ref', '=like', 'C%']]]
-        )
+        # Reduce in id order, so the samples are the first 10 of the whole table
+        totals = {label: 0 for label, prefixes, ranks in rules}
+        needs_counts = dict(totals)
+        needs_samples = {label: [] for label in totals}
+        for partial_totals, partial_needs, partial_samples in partials:
+            for label in totals:
+                totals[label] += partial_totals[label]
+                needs_counts[label] += partial_needs[label]
+                needs_samples[label] = (needs_samples[label] + partial_samples[label])[:10]
         
-        if customer_ids:
-            customers = models.execute_kw(
-                db, uid, password, 'res.partner', 'read',
-                [customer_ids], {'fields': ['name', 'ref', 'supplier_rank', 'customer_rank']}
-            )
+        for rule in rules:
+            label, patterns = rule[0], describe_rule(rule)
+            print(f"\n📊 {label.upper()} ANALYSIS ({patterns} references)")
+            print("-" * 40)
             
-            needs_customer_classification = [c for c in customers if c['customer_rank'] == 0]
-            already_customers = [c for c in customers if c['customer_rank'] > 0]
+            if not totals[label]:
+                print(f"No contacts found with {patterns} reference pattern")
+                continue
             
-            print(f"Total C* contacts: {len(customers)}")
-            print(f"Already classified as customers: {len(already_customers)}")
-            print(f"Need customer classification: {len(needs_customer_classification)}")
+            needs = needs_counts[label]
+            print(f"Total {patterns} contacts: {totals[label]}")
+            print(f"Already classified as {label}s: {totals[label] - needs}")
+            print(f"Need {label} classification: {needs}")
             
-            if needs_customer_classification:
-                print("\nContacts needing customer classification:")
-                for contact in needs_customer_classification[:10]:  # Show first 10
+            if needs:
+                print(f"\nContacts needing {label} classification:")
+                for contact in needs_samples[label]:
                     print(f"  - {contact['name']} ({contact['ref']})")
-                if len(needs_customer_classification) > 10:
-                    print(f"  ... and {len(needs_customer_classification) - 10} more")
-        else:
-            print("No contacts found with C* reference pattern")
+                if needs > 10:
+                    print(f"  ... and {needs - 10} more")
         
         # Summary
-        total_needing_update = len(needs_vendor_classification) + len(needs_customer_classification)
+        total_needing_update = sum(needs_counts.values())
         print(f"\n📋 SUMMARY")
         print("-" * 20)
         print(f"Total contacts needing classification: {total_needing_update}")
-        print(f"- Vendors to update: {len(needs_vendor_classification)}")
-        print(f"- Customers to update: {len(needs_customer_classification)}")
+        for label, needs in needs_counts.items():
+            print(f"- {label.capitalize()}s to update: {needs}")
         
         if total_needing_update > 0:
             print(f"\n🚀 Ready to run classification script!")
@@ -101,4 +112,7 @@ def analyze_contacts():
 
 
 if __name__ == "__main__":
-    analyze_contacts()
+    parser = argparse.ArgumentParser(description='Analyze contact classification status')
+    parser.add_argument('--shards', type=int, default=1,
+                        help='Scan the partner table as N id ranges in N worker processes (default: 1)')
+    analyze_contacts(max(1, parser.parse_args().shards))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Gzip Transport Benchmark
+Bytes on the wire, bytes saved and call time for a large res.partner
+search_read with and without gzip, against a local fake Odoo server that
+compresses like a reverse proxy would
+Usage: python TEST/benchmark_gzip.py [--partners 20000] [--repeat 5] [--compress-threshold 1024]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+FIELDS = ['id', 'name', 'ref', 'is_company', 'customer_rank', 'supplier_rank']
+
+
+def run(server, odoo, protocol, accept_gzip, compress_threshold, repeat):
+    """Return (median call ms, rows, pool stats) for repeated search_reads"""
+    pool = ConnectionPool(server.url, pool_size=1, accept_gzip=accept_gzip,
+                          compress_threshold=compress_threshold)
+    models = server_proxy(pool, 'object', protocol)
+    call_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = models.execute_kw(odoo.database, odoo.uid, odoo.password,
+                                 'res.partner', 'search_read', [[]], {'fields': FIELDS})
+        call_times.append((time.perf_counter() - start) * 1000.0)
+    # A large request body (a long id list) to exercise request compression
+    ids = [row['id'] for row in rows]
+    models.execute_kw(odoo.database, odoo.uid, odoo.password, 'res.partner', 'read', [ids], {'fields': ['id']})
+    pool.close()
+    return statistics.median(call_times), rows, pool.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure gzip savings for large search_read results')
+    parser.add_argument('--partners', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--compress-threshold', type=int, default=1024,
+                       help='Gzip request bodies of at least this many bytes in the gzip runs')
+    parser.add_argument('--gzip-min-size', type=int, default=1024,
+                       help='Server gzips responses of at least this many bytes')
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners)
+    server = start_server(odoo, gzip_min_size=args.gzip_min_size)
+
+    print(f"🏁 search_read of {args.partners} res.partner rows ({len(FIELDS)} fields), median of {args.repeat}")
+    print(f"{'Protocol':<10} {'gzip':<5} {'sent':>10} {'received':>12} {'saved':>12} {'call ms':>9}")
+    print("-" * 63)
+
+    failures = 0
+    for protocol in ('xmlrpc', 'jsonrpc'):
+        baseline_rows = None
+        for accept_gzip in (False, True):
+            call_ms, rows, stats = run(server, odoo, protocol, accept_gzip,
+                                       args.compress_threshold if accept_gzip else 0, args.repeat)
+            if baseline_rows is None:
+                baseline_rows = rows
+            elif rows != baseline_rows:
+                # Streaming decompression must produce exactly the uncompressed result
+                print(f"❌ {protocol}: gzip result differs from the uncompressed one")
+                failures += 1
+            print(f"{protocol:<10} {'on' if accept_gzip else 'off':<5} {stats['bytes_sent']:>10} "
+                  f"{stats['bytes_received']:>12} {stats['bytes_saved']:>12} {call_ms:>9.1f}")
+
+    server.shutdown()
+    print(f"\n{'✓ Results identical with and without gzip' if not failures else f'✗ {failures} mismatch(es)'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
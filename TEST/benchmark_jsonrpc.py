@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+XML-RPC vs JSON-RPC Benchmark
+Side-by-side decode time, end-to-end time and bytes on the wire for a large
+res.partner search_read against a local fake Odoo server
+Usage: python TEST/benchmark_jsonrpc.py [--partners 20000] [--repeat 5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import xmlrpc.client
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+FIELDS = ['id', 'name', 'ref', 'is_company', 'customer_rank', 'supplier_rank']
+
+
+def raw_exchange(pool, odoo, protocol):
+    """Send one search_read and return (request bytes, response bytes, response body)"""
+    args = (odoo.database, odoo.uid, odoo.password, 'res.partner', 'search_read', [[]], {'fields': FIELDS})
+    if protocol == 'xmlrpc':
+        path = '/xmlrpc/2/object'
+        body = xmlrpc.client.dumps(args, 'execute_kw').encode('utf-8')
+        headers = {'Content-Type': 'text/xml'}
+    else:
+        path = '/jsonrpc'
+        payload = {'jsonrpc': '2.0', 'method': 'call', 'id': 1,
+                   'params': {'service': 'object', 'method': 'execute_kw', 'args': list(args)}}
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+    status, reason, response_headers, data = pool.post(path, body, headers)
+    return len(body), len(data), data
+
+
+def decode(protocol, data):
+    if protocol == 'xmlrpc':
+        return xmlrpc.client.loads(data)[0][0]
+    return json.loads(data)['result']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare XML-RPC and JSON-RPC for large search_read results')
+    parser.add_argument('--partners', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners)
+    server = start_server(odoo)
+    pool = ConnectionPool(server.url, pool_size=1)
+
+    print(f"🏁 search_read of {args.partners} res.partner rows ({len(FIELDS)} fields), median of {args.repeat}")
+    print(f"{'Protocol':<10} {'req bytes':>10} {'resp bytes':>12} {'decode ms':>10} {'call ms':>10} {'rows':>8}")
+    print("-" * 66)
+
+    for protocol in ('xmlrpc', 'jsonrpc'):
+        models = server_proxy(pool, 'object', protocol)
+        decode_times = []
+        call_times = []
+        for _ in range(args.repeat):
+            request_bytes, response_bytes, data = raw_exchange(pool, odoo, protocol)
+            start = time.perf_counter()
+            rows = decode(protocol, data)
+            decode_times.append((time.perf_counter() - start) * 1000.0)
+
+            start = time.perf_counter()
+            models.execute_kw(odoo.database, odoo.uid, odoo.password,
+                              'res.partner', 'search_read', [[]], {'fields': FIELDS})
+            call_times.append((time.perf_counter() - start) * 1000.0)
+
+        print(f"{protocol:<10} {request_bytes:>10} {response_bytes:>12} "
+              f"{statistics.median(decode_times):>10.1f} {statistics.median(call_times):>10.1f} {len(rows):>8}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
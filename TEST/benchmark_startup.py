@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures cold start of every entry point (-X importtime plus wall time) and
+fails when a production entry point exceeds its import budget or does work
+(prints) at import time. TEST/ scripts are measured for information only.
+Usage: python TEST/benchmark_startup.py [--runs 5] [--budget-ms 150] [--top 5]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+TEST_DIR = Path(__file__).parent
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def import_code(directory, module):
+    return f"import sys; sys.path[:0] = [{str(ROOT)!r}, {str(directory)!r}]; import {module}"
+
+
+def entry_points():
+    """Return (name, argv, budgeted) for every script with a __main__ block"""
+    entries = [
+        ('classify_contacts.py --help', ['classify_contacts.py', '--help'], True),
+        # Imported by migration_workflow.py - must not read config or connect on import
+        ('import _studio_analyzer', ['-c', import_code(ROOT, '_studio_analyzer')], True),
+    ]
+    for directory in (ROOT, TEST_DIR):
+        for path in sorted(directory.glob('*.py')):
+            if 'if __name__ == "__main__":' not in path.read_text(encoding='utf-8'):
+                continue
+            # Import only - the scripts' main() would prompt, connect or write files
+            entries.append((f"import {path.relative_to(ROOT)}", ['-c', import_code(directory, path.stem)],
+                            directory == ROOT))
+    return entries
+
+
+def parse_importtime(stderr):
+    """Split -X importtime output into [(module, cumulative us, depth)] and other lines"""
+    imports = []
+    other_lines = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(cumulative_us), len(indent)))
+        else:
+            other_lines.append(line)
+    return imports, other_lines
+
+
+def measure(argv, runs):
+    """Return (median wall ms, median top-level import ms, import profile, stdout, error)"""
+    walls = []
+    import_totals = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, cwd=ROOT, capture_output=True, text=True, input='')
+        walls.append((time.perf_counter() - start) * 1000.0)
+
+        result = subprocess.run([sys.executable, '-X', 'importtime'] + argv, cwd=ROOT,
+                                capture_output=True, text=True, input='')
+        imports, other_lines = parse_importtime(result.stderr)
+        import_totals.append(sum(us for module, us, depth in imports if depth == 1) / 1000.0)
+
+    error = None
+    if result.returncode != 0:
+        error = other_lines[-1] if other_lines else f"exit code {result.returncode}"
+    return statistics.median(walls), statistics.median(import_totals), imports, result.stdout, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure and budget the cold start of every entry point')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per entry point (median wall time)')
+    parser.add_argument('--budget-ms', type=float, default=150.0,
+                       help='Maximum total import time per entry point')
+    parser.add_argument('--top', type=int, default=5, help='Heaviest top-level imports to list')
+    args = parser.parse_args()
+
+    baseline_ms, baseline_import_ms, imports, stdout, error = measure(['-c', 'pass'], args.runs)
+
+    print(f"🏁 Startup benchmark ({args.runs} runs, interpreter alone {baseline_ms:.0f} ms, "
+          f"budget {args.budget_ms:.0f} ms of imports)")
+    print(f"{'Entry point':<52} {'wall ms':>8} {'import ms':>10}  status")
+    print("-" * 90)
+
+    failures = 0
+    for name, argv, budgeted in entry_points():
+        wall_ms, import_ms, imports, stdout, error = measure(argv, args.runs)
+        import_ms -= baseline_import_ms
+        top_level = [(module, us) for module, us, depth in imports if depth == 1]
+
+        if error:
+            # Broken imports are reported, not counted against the budget
+            status = f"⚠️  import error: {error}"
+        elif stdout.strip() and not name.endswith('--help'):
+            status = "❌ prints at import time"
+            failures += budgeted
+        elif import_ms > args.budget_ms:
+            status = "❌ over budget" if budgeted else "ℹ️  over budget (TEST script, not enforced)"
+            failures += budgeted
+        else:
+            status = "✅"
+
+        print(f"{name:<52} {wall_ms:>8.0f} {import_ms:>10.1f}  {status}")
+        heaviest = sorted(top_level, key=lambda item: -item[1])[:args.top]
+        if args.top:
+            print("    " + ", ".join(f"{module} {us / 1000.0:.1f}" for module, us in heaviest))
+
+    print(f"\n{'✓ All entry points within budget' if not failures else f'✗ {failures} entry point(s) failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
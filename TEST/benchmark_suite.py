@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Contact Classification / Studio Analysis Benchmark Suite
+Runs classify_contacts_by_reference (dry run and execute) and
+save_analysis_report against a seeded local fake Odoo server at several
+dataset sizes, recording wall time, RPC count, bytes and peak RSS. Compares
+against a JSON baseline and fails when a run regresses past the tolerance.
+Usage: python TEST/benchmark_suite.py [--sizes 1000,10000,100000] [--save-baseline] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+TEST_DIR = Path(__file__).parent
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(ROOT))
+
+SCENARIOS = ('classify_dry', 'classify_execute', 'studio_report')
+DEFAULT_BASELINE = TEST_DIR / 'benchmark_baseline.json'
+INSTANCE = 'hook'
+STUDIO_FIELDS = 50
+STUDIO_VIEWS = 10
+
+# Metrics compared against the baseline; wall time gets an absolute slack on top
+# of the relative tolerance so millisecond-scale runs do not flap
+COMPARED = {'wall_s': 0.05, 'rpc_calls': 0, 'bytes': 0, 'peak_rss_mb': 2.0}
+
+
+def seed(size):
+    """Dataset of one size: V/C partners, a quarter already classified, some without ref"""
+    from fake_odoo_server import FakeOdoo
+
+    return FakeOdoo(partners=size, studio_fields=STUDIO_FIELDS, studio_views=STUDIO_VIEWS,
+                    classified_every=4, without_ref_every=20)
+
+
+def write_configs(home, url, odoo):
+    """Instance configs in a throwaway HOME, pointing both connection styles at the fake server"""
+    config_dir = Path(home) / '.odoo_config'
+    config_dir.mkdir(mode=0o700)
+    common = f"url = {url}\nusername = {odoo.username}\npassword = {odoo.password}\nsession_ttl = 0\n"
+    (config_dir / f'{INSTANCE}.conf').write_text(f"[odoo]\ndatabase = {odoo.database}\n{common}")
+    (config_dir / 'hook_local.conf').write_text(f"[odoo]\ndb_name = {odoo.database}\n{common}")
+
+
+def outcome(scenario, result):
+    """The part of a scenario's result that must not change between runs"""
+    if scenario.startswith('classify'):
+        return {
+            'found': sum(result[f'{label}s_found'] for label in result['rules']),
+            'updated': sum(result[f'{label}s_updated'] for label in result['rules']),
+            'errors': len(result['errors']),
+        }
+    return {
+        'fields_with_data': result['summary']['fields_with_data'],
+        'fields_without_data': result['summary']['fields_without_data'],
+    }
+
+
+def peak_rss_mb():
+    """Peak RSS of this process in MB"""
+    # Linux carries ru_maxrss over exec, so a child forked from the (large) harness
+    # would report the harness's peak; VmHWM belongs to the new address space
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    import resource
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak_rss / 1024.0
+
+
+def run_scenario(scenario):
+    """Child process: run one scenario against the configured instance, print a JSON result line"""
+    import contextlib
+
+    from _rpc_transport import pool_stats
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if scenario.startswith('classify'):
+            from _config import connect_odoo
+            from _contact_updater import classify_contacts_by_reference
+
+            models, db, uid, password = connect_odoo(INSTANCE)
+            result = classify_contacts_by_reference(models, db, uid, password,
+                                                    dry_run=scenario == 'classify_dry')
+        else:
+            from _studio_analyzer import find_studio_fields, save_analysis_report
+
+            with tempfile.TemporaryDirectory() as directory:
+                result = save_analysis_report(find_studio_fields(), filename=f"{directory}/report.json")
+    wall = time.perf_counter() - start
+
+    pools = pool_stats().values()
+    print(json.dumps({
+        'wall_s': round(wall, 3),
+        'bytes_sent': sum(stats['bytes_sent'] for stats in pools),
+        'bytes_received': sum(stats['bytes_received'] for stats in pools),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'outcome': outcome(scenario, result),
+    }))
+
+
+def measure(server, scenario, size):
+    """Reseed the server, run the scenario in a fresh interpreter and return its figures"""
+    server.odoo = seed(size)
+    requests_before = server.requests
+    with tempfile.TemporaryDirectory() as home:
+        write_configs(home, server.url, server.odoo)
+        env = dict(os.environ, HOME=home)
+        for name in ('ODOO_RPC_METRICS_FILE', 'ODOO_RPC_SLOW_CALL_MS'):
+            env.pop(name, None)
+        completed = subprocess.run([sys.executable, __file__, '--run-scenario', scenario],
+                                   cwd=ROOT, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines() or [f"exit code {completed.returncode}"]
+        raise RuntimeError(f"{scenario} at {size} failed: {lines[-1]}")
+
+    figures = json.loads(completed.stdout.strip().splitlines()[-1])
+    figures['rpc_calls'] = server.requests - requests_before
+    figures['bytes'] = figures['bytes_sent'] + figures['bytes_received']
+    return figures
+
+
+def compare(figures, baseline, tolerance):
+    """Return the list of regressions of one run against its baseline entry"""
+    problems = []
+    if baseline.get('outcome') is not None and figures['outcome'] != baseline['outcome']:
+        problems.append(f"outcome {figures['outcome']} != baseline {baseline['outcome']}")
+    for metric, slack in COMPARED.items():
+        if metric not in baseline:
+            continue
+        limit = baseline[metric] * (1.0 + tolerance) + slack
+        if figures[metric] > limit:
+            problems.append(f"{metric} {figures[metric]} > {baseline[metric]} (+{tolerance:.0%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark contact classification and Studio analysis')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated partner counts')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                       help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='Write this run as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                       help='Allowed relative regression per metric (0.25 = 25%%)')
+    parser.add_argument('--run-scenario', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        run_scenario(args.run_scenario)
+        return 0
+
+    from fake_odoo_server import start_server
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = sorted(set(scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    baseline = {}
+    if not args.save_baseline:
+        # Baselines are per machine: without one nothing would be compared and the suite would pass blindly
+        if not args.baseline.exists():
+            print(f"❌ No baseline at {args.baseline} - run with --save-baseline first (on this machine)")
+            return 1
+        baseline = json.loads(args.baseline.read_text()).get('runs', {})
+
+    server = start_server(seed(0))
+    print(f"🏁 Benchmark suite against {server.url} (tolerance {args.tolerance:.0%}, "
+          f"baseline {'saving' if args.save_baseline else args.baseline.name})")
+    print(f"{'Scenario':<18} {'size':>8} {'wall s':>8} {'RPCs':>8} {'MB sent':>9} {'MB recv':>9} "
+          f"{'RSS MB':>8}  status")
+    print("-" * 90)
+
+    runs = {}
+    failures = 0
+    for size in sizes:
+        for scenario in scenarios:
+            key = f"{scenario}@{size}"
+            try:
+                figures = measure(server, scenario, size)
+            except RuntimeError as e:
+                print(f"{scenario:<18} {size:>8}  ❌ {e}")
+                failures += 1
+                continue
+            runs[key] = figures
+
+            if args.save_baseline:
+                status = "💾"
+            elif key in baseline:
+                problems = compare(figures, baseline[key], args.tolerance)
+                status = "✅" if not problems else "❌ " + "; ".join(problems)
+                failures += bool(problems)
+            else:
+                status = "❌ not in the baseline (--save-baseline with these sizes)"
+                failures += 1
+            print(f"{scenario:<18} {size:>8} {figures['wall_s']:>8.2f} {figures['rpc_calls']:>8} "
+                  f"{figures['bytes_sent'] / 1e6:>9.2f} {figures['bytes_received'] / 1e6:>9.2f} "
+                  f"{figures['peak_rss_mb']:>8.1f}  {status}")
+
+    server.shutdown()
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version.split()[0],
+            'runs': runs,
+        }, indent=2) + "\n")
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    print(f"\n{'✓ No regressions' if not failures else f'✗ {failures} run(s) regressed or failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
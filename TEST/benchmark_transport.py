@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Transport Benchmark
+Compares per-call latency of fresh connections, the stock ServerProxy and the
+pooled keep-alive transport against a local fake Odoo server
+Usage: python TEST/benchmark_transport.py [--calls 500] [--handshake-ms 0] [--threads 4]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import xmlrpc.client
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+
+def call_partner(models, odoo):
+    """One small execute_kw round trip"""
+    return models.execute_kw(odoo.database, odoo.uid, odoo.password,
+                             'res.partner', 'search_read', [[]], {'fields': ['ref'], 'limit': 1})
+
+
+def timed_calls(make_models, odoo, calls, threads=1):
+    """Run calls and return per-call latencies in milliseconds"""
+    def one(_):
+        models = make_models()
+        start = time.perf_counter()
+        call_partner(models, odoo)
+        return (time.perf_counter() - start) * 1000.0
+
+    if threads == 1:
+        return [one(i) for i in range(calls)]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(one, range(calls)))
+
+
+def report(name, latencies, wall, connections):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<32} {statistics.mean(latencies):>8.3f} {statistics.median(latencies):>8.3f} "
+          f"{p95:>8.3f} {len(latencies) / wall:>9.0f} {connections:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pooled keep-alive RPC transport')
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=4,
+                       help='Concurrent callers for the shared-pool run')
+    parser.add_argument('--handshake-ms', type=float, default=0.0,
+                       help='Simulated handshake cost per new connection (e.g. 20 for TLS over VPN)')
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=100)
+    server = start_server(odoo, handshake_delay=args.handshake_ms / 1000.0)
+    object_url = f"{server.url}/xmlrpc/2/object"
+
+    print(f"🏁 Transport benchmark: {args.calls} calls, handshake {args.handshake_ms} ms")
+    print(f"{'Transport':<32} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'calls/s':>9} {'conns':>6}")
+    print("-" * 76)
+
+    # Fresh ServerProxy per call - one TCP connection per call
+    # (what every ad-hoc ServerProxy / test_connection call pays)
+    scenarios = [
+        ('fresh connection per call', lambda: (lambda: xmlrpc.client.ServerProxy(object_url)), 1),
+    ]
+
+    # Stock ServerProxy reused - keeps a single connection, not thread-safe
+    stock = xmlrpc.client.ServerProxy(object_url)
+    scenarios.append(('stock ServerProxy (reused)', lambda: (lambda: stock), 1))
+
+    # Pooled transport, serial and shared across threads
+    serial_pool = ConnectionPool(server.url, pool_size=1)
+    serial_models = server_proxy(serial_pool, 'object')
+    scenarios.append(('pooled keep-alive (serial)', lambda: (lambda: serial_models), 1))
+
+    shared_pool = ConnectionPool(server.url, pool_size=args.threads)
+    shared_models = server_proxy(shared_pool, 'object')
+    scenarios.append((f'pooled keep-alive ({args.threads} threads)', lambda: (lambda: shared_models), args.threads))
+
+    for name, factory, threads in scenarios:
+        connections_before = server.connections
+        start = time.perf_counter()
+        latencies = timed_calls(factory(), odoo, args.calls, threads=threads)
+        wall = time.perf_counter() - start
+        report(name, latencies, wall, server.connections - connections_before)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
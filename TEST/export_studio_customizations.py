@@ -7,7 +7,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from _config import connect_odoo, test_connection
+from _config import connect_odoo, execute_many, test_connection
 
 def create_final_studio_replacement():
     """Create final working Studio replacement with proper inheritance"""
@@ -88,10 +88,16 @@ def create_final_studio_replacement():
 '''
     
     exported_count = 0
-    for report_name in target_reports:
-        reports = models.execute_kw(db, uid, password, 'ir.actions.report', 'search_read',
-                                  [[('name', '=', report_name)]], 
-                                  {'fields': ['id', 'name', 'model', 'report_name', 'report_type']})
+    report_lookups = execute_many(models, db, uid, password, [
+        ('ir.actions.report', 'search_read', [[('name', '=', report_name)]],
+         {'fields': ['id', 'name', 'model', 'report_name', 'report_type']})
+        for report_name in target_reports
+    ])
+    
+    for report_name, (reports, error) in zip(target_reports, report_lookups):
+        if error:
+            print(f"  ❌ Report lookup failed for {report_name}: {error}")
+            continue
         
         for report in reports:
             print(f"  📊 {report['name']} -> preserved as comment")
@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+Fake Odoo RPC Server
+Local stand-in for /xmlrpc/2/common, /xmlrpc/2/object and /jsonrpc with an
+in-memory store: search, search_read, search_count, read, write, create and
+read_group with domain evaluation, seeded with up to millions of partners,
+plus the helpers the TEST scripts share (instance configs, script runs)
+Usage: python TEST/fake_odoo_server.py [--port 8069] [--partners 1000] [--studio-fields 50] [--studio-views 10]
+"""
+
+import argparse
+import asyncio
+import bisect
+import gzip
+import itertools
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import xmlrpc.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import ge, gt, le, lt
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+SERVER_VERSION = '18.0-fake'
+SEED_DATE = '2024-01-01 00:00:00'
+
+# Models that carry synthetic Studio fields; res.partner first
+STUDIO_MODELS = ('res.partner', 'sale.order', 'product.template', 'account.move', 'crm.lead')
+STUDIO_TTYPES = ('char', 'integer', 'boolean', 'selection', 'date', 'float')
+# Models that exist (so lookups succeed) but are only filled when seeded
+EMPTY_MODELS = ('ir.model', 'ir.model.fields', 'ir.ui.view', 'ir.model.data', 'ir.actions.report')
+PARTNER_DEFAULTS = {'ref': False, 'is_company': False, 'active': True, 'customer_rank': 0, 'supplier_rank': 0}
+
+# Exception names Odoo reports in JSON-RPC errors for the XML-RPC fault codes used here
+JSONRPC_ERROR_NAMES = {
+    3: 'odoo.exceptions.AccessDenied',
+}
+
+
+class FakeOdoo:
+    """
+    In-memory stand-in for the parts of the Odoo RPC API the scripts use
+
+    Seeds `partners` res.partner rows (refs alternate Vxxxxx / Cxxxxx, ranks 0),
+    plus optionally `studio_fields` synthetic Studio fields in ir.model.fields
+    (with data in the models they belong to) and `studio_views` 'Odoo Studio:'
+    views in ir.ui.view. Every `classified_every`-th partner already has its
+    rank set and every `without_ref_every`-th has no ref (0 = none).
+    """
+
+    def __init__(self, partners=100, database='fake', username='admin', password='admin',
+                 studio_fields=0, studio_views=0, classified_every=0, without_ref_every=0):
+        self.database = database
+        self.username = username
+        self.password = password
+        self.uid = 2
+        self.classified_every = classified_every
+        self.without_ref_every = without_ref_every
+        self._lock = threading.RLock()
+        self._next_ids = {}
+
+        # model -> {id: record}, in id order
+        self.records = {model: {} for model in EMPTY_MODELS}
+        self.records['res.users'] = {self.uid: {'id': self.uid, 'name': 'Administrator', 'login': username}}
+        self.records['res.partner'] = {i: self._make_partner(i) for i in range(1, partners + 1)}
+        if studio_fields or studio_views:
+            self._seed_studio(partners, studio_fields, studio_views)
+
+    @property
+    def partners(self):
+        return list(self.records['res.partner'].values())
+
+    def _make_partner(self, partner_id):
+        prefix = 'V' if partner_id % 2 else 'C'
+        # Counted per V/C pair so vendors and customers are classified alike
+        classified = self.classified_every and (partner_id + 1) // 2 % self.classified_every == 0
+        return {
+            'id': partner_id,
+            'name': f'Partner {partner_id}',
+            'ref': (False if self.without_ref_every and partner_id % self.without_ref_every == 0
+                    else f'{prefix}{partner_id:05d}'),
+            'is_company': True,
+            'active': True,
+            'customer_rank': 1 if classified and prefix == 'C' else 0,
+            'supplier_rank': 1 if classified and prefix == 'V' else 0,
+            'create_date': SEED_DATE,
+            'write_date': SEED_DATE,
+        }
+
+    def _seed_studio(self, partners, studio_fields, studio_views):
+        """Synthetic ir.model / ir.model.fields / ir.ui.view records and Studio field data"""
+        for model in STUDIO_MODELS[1:]:
+            self.records[model] = {i: {'id': i, 'name': f'{model} {i}', 'create_date': SEED_DATE,
+                                       'write_date': SEED_DATE}
+                                   for i in range(1, max(1, partners // 10) + 1)}
+        self.records['ir.model'] = {i: {'id': i, 'model': model, 'name': model.replace('.', ' ').title()}
+                                    for i, model in enumerate(STUDIO_MODELS + ('res.users',), 1)}
+
+        fields = self.records['ir.model.fields']
+        for model in STUDIO_MODELS:
+            for name, ttype in (('name', 'char'), ('create_date', 'datetime'), ('write_date', 'datetime')):
+                self._add(fields, {'name': name, 'model': model, 'ttype': ttype, 'state': 'base'})
+        # Defined by mistake in the real database; the analyzer excludes it
+        self._add(fields, {'name': 'x_studio_code', 'model': 'res.partner', 'ttype': 'char', 'state': 'manual'})
+
+        for n in range(1, studio_fields + 1):
+            model = STUDIO_MODELS[n % len(STUDIO_MODELS)]
+            ttype = STUDIO_TTYPES[n % len(STUDIO_TTYPES)]
+            name = f'x_studio_field_{n:04d}'
+            self._add(fields, {
+                'name': name, 'model': model, 'ttype': ttype, 'state': 'manual',
+                'field_description': f'Studio Field {n}', 'relation': False, 'store': True,
+                'required': False, 'readonly': False, 'translate': False, 'help': False,
+                'selection': "[('option_a', 'Option A'), ('option_b', 'Option B')]" if ttype == 'selection' else False,
+            })
+            # Every fourth field was never filled in; the others on every few records
+            if n % 4 == 3:
+                continue
+            for record in itertools.islice(self.records[model].values(), 0, None, n % 5 + 2):
+                record[name] = _studio_value(ttype, record['id'])
+
+        views = self.records['ir.ui.view']
+        base_views = {model: self._add(views, {'name': f'{model}.form', 'model': model, 'type': 'form',
+                                              'arch_db': '<form><field name="name"/></form>',
+                                              'inherit_id': False, 'priority': 16, 'active': True,
+                                              'key': False})
+                      for model in STUDIO_MODELS}
+        for n in range(1, studio_views + 1):
+            model = STUDIO_MODELS[n % len(STUDIO_MODELS)]
+            view_type = ('form', 'list', 'search')[n % 3]
+            self._add(views, {
+                'name': f'Odoo Studio: {model}.{view_type} customization {n}',
+                'model': model, 'type': view_type, 'priority': 99, 'active': True, 'key': False,
+                'inherit_id': [base_views[model], f'{model}.form'],
+                'arch_db': (f'<data><xpath expr="//field[@name=\'name\']" position="after">'
+                            f'<field name="x_studio_field_{n:04d}"/></xpath></data>'),
+            })
+
+    def _add(self, table, values):
+        """Insert a record with the next id of its table, return the id"""
+        record_id = next(reversed(table), 0) + 1
+        table[record_id] = dict(values, id=record_id)
+        return record_id
+
+    def dispatch(self, service, method, params):
+        """Dispatch one RPC call to the common or object service"""
+        if service == 'common':
+            if method == 'version':
+                return {'server_version': SERVER_VERSION}
+            if method in ('authenticate', 'login'):
+                db, login, password = params[:3]
+                if (db, login, password) == (self.database, self.username, self.password):
+                    return self.uid
+                return False
+        elif service == 'object' and method == 'execute_kw':
+            db, uid, password, model, model_method = params[:5]
+            args = params[5] if len(params) > 5 else []
+            kwargs = params[6] if len(params) > 6 else {}
+            if uid != self.uid or password != self.password:
+                raise xmlrpc.client.Fault(3, 'Access Denied')
+            return self.execute(model, model_method, args, kwargs)
+        raise xmlrpc.client.Fault(1, f'Unknown method {service}.{method}')
+
+    def execute(self, model, method, args, kwargs):
+        """Execute a model method against the in-memory records"""
+        if model not in self.records:
+            raise xmlrpc.client.Fault(2, f"Object {model} doesn't exist")
+        handler = getattr(self, f'_{method}', None)
+        if method not in MODEL_METHODS or handler is None:
+            raise xmlrpc.client.Fault(2, f'The method {model}.{method} does not exist')
+        params = _bind(MODEL_METHODS[method], args, kwargs, f'{model}.{method}')
+        with self._lock:
+            return handler(self.records[model], **params)
+
+    def _filter(self, table, domain, order=None, offset=0, limit=None):
+        matches = compile_domain(domain)
+        if order and order.strip().lower() not in ('id', 'id asc'):
+            records = _sort([record for record in table.values() if matches(record)], order)
+            return records[offset:offset + limit if limit else None]
+
+        # In id order, like the primary key index: only the ids of an 'id in' leaf,
+        # start past an 'id >' bound, stop at the limit
+        ids = _id_candidates(domain)
+        ids = sorted(record_id for record_id in ids if record_id in table) if ids is not None else list(table)
+        start = bisect.bisect_right(ids, _id_lower_bound(domain))
+        records = (table[record_id] for record_id in itertools.islice(ids, start, None))
+        return list(itertools.islice((record for record in records if matches(record)),
+                                     offset, offset + limit if limit else None))
+
+    def _search(self, table, domain, offset=0, limit=None, order=None):
+        return [record['id'] for record in self._filter(table, domain, order, offset, limit)]
+
+    def _search_count(self, table, domain, limit=None):
+        return len(self._filter(table, domain, limit=limit))
+
+    def _search_read(self, table, domain=None, fields=None, offset=0, limit=None, order=None):
+        return [_project(record, fields) for record in self._filter(table, domain or [], order, offset, limit)]
+
+    def _read(self, table, ids, fields=None):
+        return [_project(record, fields) for record in self._browse(table, ids)]
+
+    def _write(self, table, ids, vals):
+        now = _now()
+        for record in self._browse(table, ids):
+            record.update(vals)
+            record['write_date'] = now
+        return True
+
+    def _create(self, table, vals_list):
+        now = _now()
+        defaults = PARTNER_DEFAULTS if table is self.records['res.partner'] else {}
+        ids = [self._add(table, {**defaults, 'create_date': now, 'write_date': now, **vals})
+               for vals in ([vals_list] if isinstance(vals_list, dict) else vals_list)]
+        return ids[0] if isinstance(vals_list, dict) else ids
+
+    def _read_group(self, table, domain, fields, groupby, offset=0, limit=None, orderby=False, lazy=True):
+        groupby = [groupby] if isinstance(groupby, str) else list(groupby)
+        if lazy:
+            groupby = groupby[:1]
+        aggregates = [spec.split(':')[0] for spec in fields
+                      if spec.split(':')[0] not in groupby and spec.split(':')[0] != 'id']
+        count_key = f'{groupby[0]}_count' if len(groupby) == 1 else '__count'
+
+        groups = {}
+        for record in self._filter(table, domain):
+            key = tuple(_group_value(record.get(name, False)) for name in groupby)
+            groups.setdefault(key, []).append(record)
+
+        result = []
+        for key, records in groups.items():
+            group = dict(zip(groupby, key))
+            group[count_key] = len(records)
+            for name in aggregates:
+                group[name] = sum(record.get(name) or 0 for record in records)
+            group['__domain'] = list(domain) + [[name, '=', value] for name, value in zip(groupby, key)]
+            result.append(group)
+        result = _sort(result, orderby or ','.join(groupby))
+        return result[offset:offset + limit if limit else None]
+
+    @staticmethod
+    def _browse(table, ids):
+        ids = [ids] if isinstance(ids, int) else ids
+        missing = [record_id for record_id in ids if record_id not in table]
+        if missing:
+            raise xmlrpc.client.Fault(2, f'Record does not exist or has been deleted. (Records: {missing})')
+        return [table[record_id] for record_id in ids]
+
+
+# Positional parameter names of the supported model methods, as in Odoo
+MODEL_METHODS = {
+    'search': ('domain', 'offset', 'limit', 'order'),
+    'search_count': ('domain', 'limit'),
+    'search_read': ('domain', 'fields', 'offset', 'limit', 'order'),
+    'read': ('ids', 'fields'),
+    'write': ('ids', 'vals'),
+    'create': ('vals_list',),
+    'read_group': ('domain', 'fields', 'groupby', 'offset', 'limit', 'orderby', 'lazy'),
+}
+
+
+def _bind(names, args, kwargs, method):
+    """Map execute_kw args/kwargs onto the method's parameter names"""
+    params = dict(zip(names, args))
+    for name, value in kwargs.items():
+        if name == 'context':
+            continue
+        if name not in names:
+            raise xmlrpc.client.Fault(1, f"{method}() got an unexpected keyword argument '{name}'")
+        params[name] = value
+    return params
+
+
+def _now():
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+def _studio_value(ttype, record_id):
+    return {
+        'char': f'Value {record_id}',
+        'integer': record_id,
+        'float': record_id * 1.5,
+        'boolean': True,
+        'selection': 'option_a' if record_id % 2 else 'option_b',
+        'date': SEED_DATE[:10],
+    }[ttype]
+
+
+def _project(record, fields):
+    if not fields:
+        return dict(record)
+    return {name: record.get(name, False) for name in ['id'] + [f for f in fields if f != 'id']}
+
+
+def _group_value(value):
+    # Many2one values group by id; read_group reports them as [id, name] like Odoo
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _is_null(value):
+    return value is None or value is False
+
+
+def _sort(records, order):
+    """Sort dicts by an Odoo order spec ('name desc, id'); nulls sort last"""
+    for spec in reversed([part.split() for part in order.split(',') if part.strip()]):
+        name = spec[0]
+        descending = len(spec) > 1 and spec[1].lower() == 'desc'
+        present = [r for r in records if not _is_null(r.get(name, False))]
+        nulls = [r for r in records if _is_null(r.get(name, False))]
+        present.sort(key=lambda r: r[name], reverse=descending)
+        records = present + nulls
+    return records
+
+
+def _like_pattern(pattern, anchored, ignore_case):
+    """Compile an SQL LIKE pattern; non-anchored (like/ilike) matches anywhere"""
+    regex = ''.join('.*' if char == '%' else '.' if char == '_' else re.escape(char) for char in str(pattern))
+    if not anchored:
+        regex = f'.*{regex}.*'
+    return re.compile(regex, re.DOTALL | (re.IGNORECASE if ignore_case else 0))
+
+
+def _leaf(field, operator, value):
+    """Return a predicate for one (field, operator, value) domain leaf"""
+    if field in (0, 1) and operator == '=' and value == 1:
+        return (lambda record: True) if field == 1 else (lambda record: False)
+
+    operator = operator.lower()
+    if operator in ('=', '!='):
+        if _is_null(value):
+            test = _is_null
+        else:
+            test = lambda current: not _is_null(current) and current == value
+    elif operator in ('in', 'not in'):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        wanted = {v for v in values if not _is_null(v)}
+        match_null = any(_is_null(v) for v in values)
+        test = lambda current: match_null if _is_null(current) else current in wanted
+    elif operator in ('like', 'ilike', 'not like', 'not ilike', '=like', '=ilike'):
+        anchored = operator.startswith('=')
+        if anchored and 'i' not in operator and str(value).endswith('%') and not LIKE_WILDCARDS.search(value[:-1]):
+            # 'V%' - the common reference-prefix case, without a regex
+            prefix = value[:-1]
+            test = lambda current: current.__class__ is str and current.startswith(prefix)
+        else:
+            pattern = _like_pattern(value, anchored, 'ilike' in operator)
+            test = lambda current: not _is_null(current) and pattern.fullmatch(str(current)) is not None
+    elif operator in COMPARISONS:
+        compare = COMPARISONS[operator]
+
+        def test(current):
+            try:
+                return not _is_null(current) and compare(current, value)
+            except TypeError:
+                return False
+    else:
+        raise xmlrpc.client.Fault(1, f'Invalid operator {operator!r} in domain leaf {(field, operator, value)}')
+
+    # Like Odoo, negative operators also match records where the field is empty
+    negate = operator in ('!=', 'not in', 'not like', 'not ilike')
+
+    def predicate(record):
+        current = record.get(field, False)
+        if current.__class__ is list:
+            # Many2one values are [id, display name]; domains compare the id
+            current = current[0] if current else False
+        return test(current) is not negate
+
+    return predicate
+
+
+LIKE_WILDCARDS = re.compile(r'[%_]')
+COMPARISONS = {'<': lt, '<=': le, '>': gt, '>=': ge}
+
+
+def _top_level_terms(domain):
+    """Split a domain into its implicitly AND-ed top-level expressions"""
+    terms = []
+    index = 0
+    while index < len(domain):
+        start = index
+        needed = 1
+        while needed:
+            term = domain[index]
+            index += 1
+            needed += 1 if term in ('&', '|') else 0 if term == '!' else -1
+        terms.append(domain[start:index])
+    return terms
+
+
+def _id_lower_bound(domain):
+    """Largest id excluded by a top-level ('id', '>', n) / ('id', '>=', n) leaf, else 0"""
+    bound = 0
+    for term in _top_level_terms(list(domain or [])):
+        if len(term) == 1 and not isinstance(term[0], str) and term[0][0] == 'id':
+            field, operator, value = term[0]
+            if operator == '>':
+                bound = max(bound, value)
+            elif operator == '>=':
+                bound = max(bound, value - 1)
+    return bound
+
+
+def _id_candidates(domain):
+    """Ids allowed by top-level ('id', 'in', ids) leaves, or None if there is none"""
+    candidates = None
+    for term in _top_level_terms(list(domain or [])):
+        if len(term) == 1 and not isinstance(term[0], str) and term[0][0] == 'id' and term[0][1] == 'in':
+            ids = set(term[0][2] if isinstance(term[0][2], (list, tuple)) else [term[0][2]])
+            candidates = ids if candidates is None else candidates & ids
+    return candidates
+
+
+def compile_domain(domain):
+    """Return a predicate for an Odoo domain (prefix '&', '|', '!' with an implicit '&')"""
+    stack = []
+    for term in reversed(list(domain or [])):
+        if term == '!':
+            inner = stack.pop()
+            stack.append(lambda record, inner=inner: not inner(record))
+        elif term in ('&', '|'):
+            left, right = stack.pop(), stack.pop()
+            if term == '&':
+                stack.append(lambda record, left=left, right=right: left(record) and right(record))
+            else:
+                stack.append(lambda record, left=left, right=right: left(record) or right(record))
+        else:
+            stack.append(_leaf(*term))
+
+    if not stack:
+        return lambda record: True
+    predicate = stack.pop()
+    while stack:
+        right = stack.pop()
+        predicate = lambda record, left=predicate, right=right: left(record) and right(record)
+    return predicate
+
+
+def handle_xmlrpc(odoo, service, body):
+    """Decode an XML-RPC request, dispatch it and return the encoded response"""
+    try:
+        params, method = xmlrpc.client.loads(body)
+        result = odoo.dispatch(service, method, params)
+        response = xmlrpc.client.dumps((result,), methodresponse=True, allow_none=True)
+    except xmlrpc.client.Fault as fault:
+        response = xmlrpc.client.dumps(fault, methodresponse=True)
+    except Exception as e:
+        response = xmlrpc.client.dumps(xmlrpc.client.Fault(1, str(e)), methodresponse=True)
+    return response.encode('utf-8')
+
+
+def handle_jsonrpc(odoo, body):
+    """Decode a JSON-RPC request, dispatch it and return the encoded response"""
+    request = json.loads(body)
+    params = request.get('params', {})
+    response = {'jsonrpc': '2.0', 'id': request.get('id')}
+    try:
+        response['result'] = odoo.dispatch(params.get('service'), params.get('method'), params.get('args', []))
+    except Exception as e:
+        code = e.faultCode if isinstance(e, xmlrpc.client.Fault) else 1
+        message = e.faultString if isinstance(e, xmlrpc.client.Fault) else str(e)
+        response['error'] = {
+            'code': 200,
+            'message': 'Odoo Server Error',
+            'data': {'name': JSONRPC_ERROR_NAMES.get(code, 'odoo.exceptions.UserError'), 'message': message},
+        }
+    return json.dumps(response).encode('utf-8')
+
+
+def handle_rpc(odoo, path, body):
+    """Route a POST body by path, return (response body, content type)"""
+    path = path.rstrip('/')
+    if path.endswith('/jsonrpc'):
+        return handle_jsonrpc(odoo, body), 'application/json'
+    return handle_xmlrpc(odoo, path.rsplit('/', 1)[-1], body), 'text/xml'
+
+
+class FakeOdooRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 keep-alive handler that decodes XML-RPC / JSON-RPC and calls FakeOdoo"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        server = self.server
+        with server.stats_lock:
+            server.connections += 1
+        # Simulates the TCP/TLS handshake round trips of a remote server
+        if server.handshake_delay:
+            time.sleep(server.handshake_delay)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+
+        server = self.server
+        if server.worker_slots is not None:
+            # Like Odoo workers: each request holds one for service_time, the rest queue
+            with server.worker_slots:
+                time.sleep(server.service_time)
+                data, content_type = handle_rpc(server.odoo, self.path, body)
+        else:
+            data, content_type = handle_rpc(server.odoo, self.path, body)
+
+        with self.server.stats_lock:
+            self.server.requests += 1
+        gzipped = 'gzip' in self.headers.get('Accept-Encoding', '').lower() and len(data) >= server.gzip_min_size
+        if gzipped:
+            data = gzip.compress(data, compresslevel=1)
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeOdooServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding a FakeOdoo instance and connection counters"""
+
+    daemon_threads = True
+
+    def __init__(self, address, odoo, handshake_delay=0.0, workers=None, service_time=0.0, gzip_min_size=None):
+        super().__init__(address, FakeOdooRequestHandler)
+        self.odoo = odoo
+        # Like nginx 'gzip_min_length'; None never compresses (stock Odoo behaviour)
+        self.gzip_min_size = gzip_min_size if gzip_min_size is not None else float('inf')
+        self.handshake_delay = handshake_delay
+        self.worker_slots = threading.Semaphore(workers) if workers else None
+        self.service_time = service_time
+        self.stats_lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(odoo=None, host='127.0.0.1', port=0, handshake_delay=0.0, workers=None, service_time=0.0,
+                 gzip_min_size=None):
+    """Start a fake Odoo server in a background thread and return it"""
+    server = FakeOdooServer((host, port), odoo or FakeOdoo(), handshake_delay=handshake_delay,
+                            workers=workers, service_time=service_time, gzip_min_size=gzip_min_size)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+async def start_async_server(odoo=None, host='127.0.0.1', port=0, latency=0.0):
+    """
+    Start an asyncio stand-in server on the running event loop
+    
+    Every request waits `latency` seconds without blocking other connections,
+    which makes overlapping in-flight calls measurable. Returns the
+    asyncio.Server; its url is available as server.url.
+    """
+    odoo = odoo or FakeOdoo()
+
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                if latency:
+                    await asyncio.sleep(latency)
+                data, content_type = handle_rpc(odoo, path, body)
+
+                writer.write((f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                              f"Content-Length: {len(data)}\r\n\r\n").encode('latin-1') + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    bound_host, bound_port = server.sockets[0].getsockname()[:2]
+    server.url = f"http://{bound_host}:{bound_port}"
+    server.odoo = odoo
+    return server
+
+
+def write_instance_config(home, server, odoo, name='hook', database_key='database', extra=''):
+    """
+    Point ~/.odoo_config/{name}.conf of a throwaway HOME at a stand-in server
+
+    database_key is 'db_name' for _odoo_config-style files; extra is
+    appended to the [odoo] section. Returns the config directory.
+    """
+    config_dir = Path(home) / '.odoo_config'
+    config_dir.mkdir(exist_ok=True)
+    (config_dir / f'{name}.conf').write_text(
+        f"[odoo]\nurl = {server.url}\n{database_key} = {odoo.database}\n"
+        f"username = {odoo.username}\npassword = {odoo.password}\n{extra}")
+    return config_dir
+
+
+def run_script(home, script, *args, env=None):
+    """Run a script of the repo with HOME=home, answering yes to its prompt; return (completed process, seconds)"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, script] + list(args), cwd=ROOT,
+                               env=dict(os.environ, HOME=home, **(env or {})), input='yes\n',
+                               capture_output=True, text=True)
+    return completed, time.perf_counter() - start
+
+
+def run_classify(home, *flags, env=None):
+    """Run classify_contacts.py with HOME=home (see run_script)"""
+    return run_script(home, 'classify_contacts.py', *flags, env=env)
+
+
+def unclassified(odoo):
+    """Partners of a stand-in server with a ref and neither rank yet"""
+    return sum(1 for p in odoo.partners if p['ref'] and not p['customer_rank'] and not p['supplier_rank'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake Odoo RPC server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8069)
+    parser.add_argument('--partners', type=int, default=1000,
+                       help='Number of res.partner records to seed')
+    parser.add_argument('--studio-fields', type=int, default=0,
+                       help='Synthetic Studio fields in ir.model.fields (with data)')
+    parser.add_argument('--studio-views', type=int, default=0,
+                       help="Synthetic 'Odoo Studio:' views in ir.ui.view")
+    parser.add_argument('--classified-every', type=int, default=0,
+                       help='Every Nth partner already has its customer/supplier rank set')
+    parser.add_argument('--without-ref-every', type=int, default=0,
+                       help='Every Nth partner has no reference')
+    parser.add_argument('--handshake-ms', type=float, default=0.0,
+                       help='Delay added to every new connection to simulate network handshakes')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='Simulated Odoo workers; requests beyond this queue (0 = unlimited)')
+    parser.add_argument('--service-ms', type=float, default=0.0,
+                       help='Time each request holds a simulated worker')
+    parser.add_argument('--gzip-min-size', type=int, default=None,
+                       help='Gzip responses of at least this many bytes when the client accepts it')
+    args = parser.parse_args()
+
+    print(f"🌱 Seeding {args.partners} partners...")
+    odoo = FakeOdoo(partners=args.partners, studio_fields=args.studio_fields, studio_views=args.studio_views,
+                    classified_every=args.classified_every, without_ref_every=args.without_ref_every)
+    server = FakeOdooServer((args.host, args.port), odoo,
+                            handshake_delay=args.handshake_ms / 1000.0,
+                            workers=args.workers or None, service_time=args.service_ms / 1000.0,
+                            gzip_min_size=args.gzip_min_size)
+    print(f"🧪 Fake Odoo listening on {server.url} (database 'fake', admin/admin)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from _config import connect_odoo, test_connection
+from _config import connect_odoo, execute_many, test_connection
 
 def generate_migration_report():
     """Generate detailed report of views and reports for manual recreation"""
@@ -75,16 +75,30 @@ Captain Hook Smoke House - Studio to Module Migration
     
     report_content += f"#### 📊 STUDIO REPORTS TO RECREATE ({len(target_reports)} reports)\n\n"
     
-    for i, report_name in enumerate(target_reports, 1):
-        reports = models.execute_kw(db, uid, password, 'ir.actions.report', 'search_read',
-                                  [[('name', '=', report_name)]], 
-                                  {'fields': ['id', 'name', 'model', 'report_name', 'report_type', 'print_report_name']})
-        
+    # Look up all target reports concurrently, then all of their templates
+    report_lookups = execute_many(models, db, uid, password, [
+        ('ir.actions.report', 'search_read', [[('name', '=', report_name)]],
+         {'fields': ['id', 'name', 'model', 'report_name', 'report_type', 'print_report_name']})
+        for report_name in target_reports
+    ])
+    for report_name, (reports, error) in zip(target_reports, report_lookups):
+        if error:
+            print(f"❌ Report lookup failed for {report_name}: {error}")
+    
+    found_reports = [reports or [] for reports, error in report_lookups]
+    template_lookups = iter(execute_many(models, db, uid, password, [
+        ('ir.ui.view', 'search_read', [[('key', '=', report['report_name'])]],
+         {'fields': ['id', 'name', 'arch_db']})
+        for reports in found_reports for report in reports
+    ]))
+    
+    for i, reports in enumerate(found_reports, 1):
         for report in reports:
             # Get template content
-            templates = models.execute_kw(db, uid, password, 'ir.ui.view', 'search_read',
-                                        [[('key', '=', report['report_name'])]], 
-                                        {'fields': ['id', 'name', 'arch_db']})
+            templates, error = next(template_lookups)
+            if error:
+                print(f"❌ Template lookup failed for {report['report_name']}: {error}")
+                templates = []
             
             report_content += f"""**{i}. {report['name']}**
 - **Model**: `{report['model']}`
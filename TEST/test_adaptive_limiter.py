@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive (AIMD) concurrency limiter against a fake Odoo server
+that has a fixed number of workers - the limit should settle near that number -
+and the pool sizing of adaptive_concurrency configs (max_concurrency above
+pool_size grows an unset pool, and is refused with an explicit one)
+Usage: python TEST/test_adaptive_limiter.py [--calls 2000] [--server-workers 4]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _config import execute_many, get_config, get_instance_pool, make_limiter
+from _odoo_config import OdooConfig
+from _rpc_limiter import AdaptiveLimiter
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+
+def run(server, odoo, calls, pool_size, adaptive):
+    pool = ConnectionPool(server.url, pool_size=pool_size)
+    if adaptive:
+        pool.limiter = make_limiter(1, 0, pool_size)
+    else:
+        # min == max: records latencies without ever changing the limit
+        pool.limiter = AdaptiveLimiter(min_limit=pool_size, max_limit=pool_size)
+    models = server_proxy(pool, 'object')
+
+    start = time.perf_counter()
+    results = execute_many(models, odoo.database, odoo.uid, odoo.password,
+                           [('res.partner', 'search_count', [[]])] * calls, max_workers=pool_size)
+    wall = time.perf_counter() - start
+    pool.close()
+    errors = sum(1 for result, error in results if error)
+    return wall, errors, pool
+
+
+def check_config_sizing(url):
+    """
+    Pool and limiter sizes of instance configs, read by get_config and by
+    OdooConfig: (settings, (pool size, limiter max) or None for an error)
+    """
+    cases = ((('max_concurrency = 12',), (12, 12)), (('max_concurrency = 12', 'pool_size = 16'), (16, 12)),
+             (('max_concurrency = 12', 'pool_size = 4'), None), (('max_concurrency = 2',), (4, 2)))
+    entry_points = {
+        'get_config': lambda instance: get_instance_pool(instance, get_config(instance)),
+        'OdooConfig': lambda instance: OdooConfig(instance).pool,
+    }
+    ok = True
+    previous_home = os.environ.get('HOME')
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['HOME'] = home
+        config_dir = os.path.join(home, '.odoo_config')
+        os.mkdir(config_dir)
+        for index, (settings, expected) in enumerate(cases):
+            for name, open_pool in entry_points.items():
+                # One instance per entry point: pools are shared per instance name
+                instance = f'sizing{index}_{name}'
+                with open(os.path.join(config_dir, f'{instance}.conf'), 'w') as conf:
+                    conf.write(f"[odoo]\nurl = {url}\ndatabase = fake\ndb_name = fake\nusername = admin\n"
+                               f"password = admin\nadaptive_concurrency = yes\n" + '\n'.join(settings) + '\n')
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        pool = open_pool(instance)
+                    outcome = (pool.pool_size, pool.limiter.max_limit)
+                    passed = outcome == expected
+                    pool.close()
+                except ValueError as e:
+                    outcome = f'refused ({e.args[0].split(": ", 1)[1]})'
+                    passed = expected is None
+                print(f"{'✅' if passed else '❌'} {name} with {', '.join(settings)}: "
+                      f"pool size, limiter max = {outcome}")
+                ok &= passed
+    if previous_home is not None:
+        os.environ['HOME'] = previous_home
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Test the adaptive RPC concurrency limiter')
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--server-workers', type=int, default=4)
+    parser.add_argument('--service-ms', type=float, default=5.0)
+    parser.add_argument('--pool-size', type=int, default=32)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=10)
+    server = start_server(odoo, workers=args.server_workers, service_time=args.service_ms / 1000.0)
+
+    print("=== Adaptive Concurrency Limiter Test ===")
+    print(f"Server: {args.server_workers} workers x {args.service_ms} ms, client pool {args.pool_size}")
+
+    wall, errors, pool = run(server, odoo, args.calls, args.pool_size, adaptive=False)
+    snapshot = pool.limiter.snapshot()
+    print(f"\nFixed {args.pool_size} in flight: {wall:.2f}s, errors {errors}")
+    print(f"  p50 {snapshot['p50_ms']} ms, p95 {snapshot['p95_ms']} ms")
+
+    wall, errors, pool = run(server, odoo, args.calls, args.pool_size, adaptive=True)
+    snapshot = pool.limiter.snapshot()
+    print(f"Adaptive limit:      {wall:.2f}s, errors {errors}")
+    print(f"  limit {snapshot['limit']} (min {snapshot['min_limit']}, max {snapshot['max_limit']}), "
+          f"+{snapshot['increases']} / -{snapshot['decreases']} adjustments")
+    print(f"  p50 {snapshot['p50_ms']} ms, p95 {snapshot['p95_ms']} ms, baseline p95 {snapshot['baseline_p95_ms']} ms")
+
+    print()
+    sized = check_config_sizing(server.url)
+
+    server.shutdown()
+    settled = snapshot['limit'] <= args.server_workers * 3
+    if not sized:
+        print("\n✗ Pool sizing from max_concurrency failed")
+    print("\n✓ Limit settled near server capacity" if settled else "\n✗ Limit did not back off")
+    return 0 if settled and sized and not errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
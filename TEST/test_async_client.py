@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio Odoo client against a local asyncio stand-in server, its
+pool size from the instance config, and its stale-connection retry: resent
+only when the request was not sent whole or is read-only (a write must not
+run twice), with every failed connection closed
+Usage: python TEST/test_async_client.py [--calls 200] [--latency-ms 20] [--pool-size 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import xmlrpc.client
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _async_odoo import AsyncConnectionPool, connect_async, connect_odoo_async
+from fake_odoo_server import FakeOdoo, start_async_server, write_instance_config
+
+
+class FakeWriter:
+    def __init__(self, fails_on=None):
+        self.fails_on = fails_on
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeReader:
+    def __init__(self, writer):
+        self.writer = writer
+
+    def at_eof(self):
+        return False
+
+
+class DroppingPool(AsyncConnectionPool):
+    """
+    Connections the server drops on send or before answering (fails_on);
+    records the requests that reached the server
+    """
+
+    def __init__(self, *args, fails_on=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fails_on = fails_on
+        self.writers = []
+        self.received = []
+
+    async def _new_connection(self):
+        self.writers.append(FakeWriter(self.fails_on))
+        return FakeReader(self.writers[-1]), self.writers[-1]
+
+    async def _send(self, writer, path, body, headers):
+        if writer.fails_on == 'send':
+            raise BrokenPipeError(32, 'Broken pipe')
+        self.received.append(body)
+
+    async def _receive(self, reader):
+        if reader.writer.fails_on == 'response':
+            raise asyncio.IncompleteReadError(b'', None)
+        return 200, 'OK', {}, b''
+
+
+def request_body(method):
+    return xmlrpc.client.dumps(('fake', 2, 'admin', 'res.partner', method, [[]], {}), 'execute_kw').encode()
+
+
+async def check_stale_retries():
+    """A dropped kept-alive connection: resent after a failed send, after a sent request only if read-only"""
+    ok = True
+    for fails_on, method, retried in (('send', 'create', True), ('send', 'search_read', True),
+                                      ('response', 'search_read', True), ('response', 'create', False)):
+        pool = DroppingPool('http://127.0.0.1:9')
+        reader, stale = await pool._new_connection()
+        stale.fails_on = fails_on
+        pool._idle.append((reader, stale, time.monotonic()))
+        try:
+            await pool.post('/xmlrpc/2/object', request_body(method), {})
+            outcome = 'retried'
+        except (BrokenPipeError, asyncio.IncompleteReadError):
+            outcome = 'raised'
+        passed = (outcome == ('retried' if retried else 'raised') and stale.closed
+                  and len(pool.received) == (2 if retried and fails_on == 'response' else 1))
+        print(f"{'✅' if passed else '❌'} {method} on a connection failing on {fails_on} {outcome}, "
+              f"{len(pool.received)} request(s) reached the server, stale connection "
+              f"{'closed' if stale.closed else 'left open'}")
+        ok &= passed
+    return ok
+
+
+async def check_failed_retry():
+    """A reused connection fails on send, so does the retry on a fresh one: neither may be left open"""
+    pool = DroppingPool('http://127.0.0.1:9', fails_on='send')
+    reader, writer = await pool._new_connection()
+    pool._idle.append((reader, writer, time.monotonic()))
+    try:
+        await pool.post('/xmlrpc/2/object', request_body('write'), {})
+        return False
+    except BrokenPipeError:
+        closed = len(pool.writers) == 2 and all(writer.closed for writer in pool.writers)
+        print(f"{'✅' if closed else '❌'} Failed retry: {sum(w.closed for w in pool.writers)}/"
+              f"{len(pool.writers)} connections closed")
+        return closed
+
+
+async def check_config_pool_size(server, odoo):
+    """connect_odoo_async takes pool_size from the instance config"""
+    with tempfile.TemporaryDirectory() as home:
+        previous_home = os.environ.get('HOME')
+        os.environ['HOME'] = home
+        try:
+            write_instance_config(home, server, odoo, extra='pool_size = 3\n')
+            async with await connect_odoo_async('hook') as client:
+                pool_size = client.pool.pool_size
+        finally:
+            if previous_home is not None:
+                os.environ['HOME'] = previous_home
+    print(f"{'✅' if pool_size == 3 else '❌'} connect_odoo_async: pool_size {pool_size} from the instance config")
+    return pool_size == 3
+
+
+async def run(args):
+    odoo = FakeOdoo(partners=1000)
+    server = await start_async_server(odoo, latency=args.latency_ms / 1000.0)
+    ok = True
+
+    for protocol in ('xmlrpc', 'jsonrpc'):
+        print(f"\n🔌 {protocol}: connecting to {server.url}...")
+        client = await connect_async(server.url, odoo.database, odoo.username, odoo.password,
+                                     protocol=protocol, pool_size=args.pool_size)
+        async with client:
+            print(f"✅ Authenticated (UID: {client.uid})")
+
+            count = await client.execute_kw('res.partner', 'search_count', [[]])
+            rows = await client.search_read('res.partner', [], ['ref'], limit=3)
+            print(f"✅ search_count: {count}, search_read sample: {[r['ref'] for r in rows]}")
+
+            # Overlap many in-flight calls from one event loop
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                client.search_read('res.partner', [], ['ref'], limit=1) for _ in range(args.calls)
+            ])
+            wall = time.perf_counter() - start
+            serial = args.calls * args.latency_ms / 1000.0
+            print(f"✅ {len(results)} concurrent calls in {wall:.2f}s "
+                  f"(serial would take ≥ {serial:.2f}s), {client.pool.stats()['connections_opened']} connections")
+
+            try:
+                client.password = 'wrong'
+                await client.execute_kw('res.partner', 'search_count', [[]])
+                print("❌ Expected an access denied fault")
+                ok = False
+            except Exception as e:
+                print(f"✅ Fault raised as expected: {e}")
+
+            ok = ok and len(results) == args.calls and count == 1000
+
+    print()
+    ok = await check_config_pool_size(server, odoo) and ok
+    ok = await check_stale_retries() and ok
+    ok = await check_failed_retry() and ok
+
+    server.close()
+    await server.wait_closed()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Test the asyncio Odoo client')
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--pool-size', type=int, default=50)
+    args = parser.parse_args()
+
+    print("=== Async Odoo Client Test ===")
+    if asyncio.run(run(args)):
+        print("\n✓ Async client test passed")
+        return 0
+    print("\n✗ Async client test failed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
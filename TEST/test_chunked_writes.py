@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test chunked classification writes against a local fake Odoo server: one
+contact that the server refuses to write makes its chunk fail, the chunk is
+retried and then written contact by contact, so every other contact of it
+is still classified and only the refused one is reported
+Usage: python TEST/test_chunked_writes.py [--contacts 2000] [--chunk-size 100]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import xmlrpc.client
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, start_server, write_instance_config
+
+
+class RefusingOdoo(FakeOdoo):
+    """Refuses every write that includes the refused id; counts writes by size"""
+
+    def __init__(self, *args, refused_id=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.refused_id = refused_id
+        self.write_sizes = []
+
+    def _write(self, table, ids, vals):
+        ids = [ids] if isinstance(ids, int) else ids
+        self.write_sizes.append(len(ids))
+        if self.refused_id in ids:
+            raise xmlrpc.client.Fault(1, f'Partner {self.refused_id} is locked')
+        return super()._write(table, ids, vals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check chunked writes and their per-contact fallback')
+    parser.add_argument('--contacts', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    args = parser.parse_args()
+
+    refused_id = args.contacts // 2 + 1
+    odoo = RefusingOdoo(partners=args.contacts, classified_every=0, refused_id=refused_id)
+    partners = odoo.records['res.partner']
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['HOME'] = home
+        write_instance_config(home, server, odoo)
+
+        from _config import connect_odoo
+        from _contact_updater import update_contacts_in_chunks
+
+        models, db, uid, password = connect_odoo('hook')
+        contacts = [{'id': p['id'], 'name': p['name'], 'ref': p['ref']} for p in partners.values()]
+        outcomes = list(update_contacts_in_chunks(models, db, uid, password, contacts, args.chunk_size,
+                                                  ranks=('customer_rank',), max_workers=4))
+
+        ordered = [contact['id'] for contact, success, message in outcomes] == [c['id'] for c in contacts]
+        print(f"{'✅' if ordered else '❌'} {len(outcomes)} outcomes, in contact order")
+        ok &= ordered
+
+        failed = [(contact['id'], message) for contact, success, message in outcomes if not success]
+        reported = len(failed) == 1 and failed[0][0] == refused_id and 'locked' in failed[0][1]
+        print(f"{'✅' if reported else '❌'} Failures reported: {failed}")
+        ok &= reported
+
+        written = [p['id'] for p in partners.values() if p['customer_rank'] == 1]
+        everyone_else = sorted(written) == [c['id'] for c in contacts if c['id'] != refused_id]
+        print(f"{'✅' if everyone_else else '❌'} {len(written)} of {len(contacts) - 1} other contacts written, "
+              f"including the rest of the refused contact's chunk")
+        ok &= everyone_else
+
+        # Each chunk once, the failing chunk once more as a whole, then one write per contact in it
+        chunks = -(-args.contacts // args.chunk_size)
+        expected = [args.chunk_size] * (chunks + 1) + [1] * args.chunk_size
+        writes_ok = sorted(odoo.write_sizes) == sorted(expected)
+        print(f"{'✅' if writes_ok else '❌'} {len(odoo.write_sizes)} writes: {chunks} chunks, 1 chunk retry, "
+              f"{odoo.write_sizes.count(1)} single-contact writes")
+        ok &= writes_ok
+
+    server.shutdown()
+    print(f"\n{'✓ Chunked write test passed' if ok else '✗ Chunked write test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test dry-run plans against a local fake Odoo server: a dry run with --plan
+saves the ids to update, --execute --plan applies them with a few
+search_count checks and batched writes (no partner reads), and a plan whose
+contacts changed since, or whose file was edited, is refused
+Usage: python TEST/test_classification_plan.py [--partners 100000]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_classify, start_server, unclassified, write_instance_config
+
+
+class MethodCountingOdoo(FakeOdoo):
+    """Counts model calls per method"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = {}
+
+    def execute(self, model, method, args, kwargs):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        return super().execute(model, method, args, kwargs)
+
+
+def classify(home, *flags):
+    return run_classify(home, '--quiet', *flags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check dry-run plans applied with --execute --plan')
+    parser.add_argument('--partners', type=int, default=100000)
+    args = parser.parse_args()
+
+    odoo = MethodCountingOdoo(partners=args.partners, classified_every=4)
+    partners = odoo.records['res.partner']
+    expected = unclassified(odoo)
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        write_instance_config(home, server, odoo)
+        plan_file = Path(home) / 'plan.json'
+
+        completed, elapsed = classify(home, '--plan', str(plan_file))
+        plan = json.loads(plan_file.read_text())
+        planned = sum(len(group['ids']) for group in plan['groups'])
+        print(f"{'✅' if planned == expected else '❌'} Dry run planned {planned}/{expected} contacts in "
+              f"{elapsed:.2f}s ({plan_file.stat().st_size // 1024} KB plan)")
+        ok &= completed.returncode == 0 and planned == expected
+
+        # An edited plan is refused before anything is sent
+        tampered = Path(home) / 'tampered.json'
+        plan['groups'][0]['ids'].append(10 ** 9)
+        tampered.write_text(json.dumps(plan))
+        completed, elapsed = classify(home, '--execute', '--plan', str(tampered))
+        refused = completed.returncode == 1 and 'checksum' in completed.stdout
+        print(f"{'✅' if refused else '❌'} Edited plan refused")
+        ok &= refused
+
+        # Drift: one planned contact got its rank elsewhere in the meantime
+        drifted = plan['groups'][0]['ids'][0]
+        partners[drifted]['customer_rank'] = partners[drifted]['supplier_rank'] = 1
+        calls = dict(odoo.calls)
+        completed, elapsed = classify(home, '--execute', '--plan', str(plan_file))
+        writes = odoo.calls.get('write', 0) - calls.get('write', 0)
+        stale = completed.returncode == 1 and 'Plan is stale: 1 of' in completed.stdout and not writes
+        print(f"{'✅' if stale else '❌'} Stale plan refused after "
+              f"{odoo.calls['search_count'] - calls.get('search_count', 0)} search_count calls, {writes} writes")
+        ok &= stale
+        partners[drifted]['customer_rank'] = partners[drifted]['supplier_rank'] = 0
+
+        calls = dict(odoo.calls)
+        completed, elapsed = classify(home, '--execute', '--plan', str(plan_file))
+        made = {method: count - calls.get(method, 0) for method, count in odoo.calls.items()
+                if count != calls.get(method, 0)}
+        left = unclassified(odoo)
+        print(f"{'✅' if completed.returncode == 0 and not left else '❌'} Plan applied in {elapsed:.2f}s, "
+              f"{left} contacts left; calls: {', '.join(f'{m} {n}' for m, n in sorted(made.items()))}")
+        ok &= completed.returncode == 0 and not left and not made.get('search_read')
+        if completed.returncode != 0:
+            print(completed.stdout[-800:], completed.stderr[-500:])
+
+        completed, elapsed = classify(home, '--execute', '--plan', str(plan_file))
+        again = completed.returncode == 1 and 'Plan is stale' in completed.stdout
+        print(f"{'✅' if again else '❌'} Applying the same plan twice is refused")
+        ok &= again
+
+    server.shutdown()
+    print(f"\n{'✓ Plan test passed' if ok else '✗ Plan test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
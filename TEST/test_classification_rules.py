@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test config-driven classification rules against a local fake Odoo server:
+longest-prefix matching, multi-prefix and multi-rank rules, one streamed
+scan for all rules and one update set per rule, with contacts whose ref
+starts with several rules' prefixes (VC is also V) given to the longest
+Usage: python TEST/test_classification_rules.py [--partners 5000]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _classification_rules import classification_domain, compile_matcher, load_rules
+from _contact_updater import classify_contacts_by_reference
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+class ReadRecordingOdoo(FakeOdoo):
+    """Records the domain and the returned ids of every partner search_read page"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pages = []
+
+    def _search_read(self, table, domain=None, fields=None, offset=0, limit=None, order=None):
+        records = super()._search_read(table, domain, fields, offset, limit, order)
+        if limit != 1:  # not the watermark lookup
+            self.pages.append((domain, [record['id'] for record in records]))
+        return records
+
+
+RULES = """
+[vendor]
+prefixes = V
+ranks = supplier_rank
+
+[customer]
+prefixes = C, EU, US
+ranks = customer_rank
+
+[vendor_customer]
+prefixes = VC
+ranks = supplier_rank, customer_rank
+
+[employee]
+prefixes = E
+ranks = employee_rank
+"""
+
+# ref -> expected rule label (None: no rule applies)
+EXPECTED_MATCHES = {'V001': 'vendor', 'VC001': 'vendor_customer', 'C001': 'customer', 'EU001': 'customer',
+                    'E001': 'employee', 'US001': 'customer', 'X001': None, '': None, False: None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check config-driven classification rules')
+    parser.add_argument('--partners', type=int, default=5000)
+    args = parser.parse_args()
+
+    odoo = ReadRecordingOdoo(partners=args.partners, classified_every=4)
+    partners = odoo.records['res.partner']
+    # Recode every 5th partner to the extra prefixes; every 7th VC already a vendor at rank 3
+    extra = ('VC', 'EU', 'US', 'E')
+    for partner_id, partner in partners.items():
+        partner['employee_rank'] = 0
+        if partner_id % 5 == 0:
+            partner['ref'] = f"{extra[partner_id // 5 % len(extra)]}{partner_id:05d}"
+            partner['supplier_rank'] = 3 if partner['ref'].startswith('VC') and partner_id % 7 == 0 else 0
+            partner['customer_rank'] = 0
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        rules_file = Path(directory) / 'classification_rules.conf'
+        rules_file.write_text(RULES)
+        rules = load_rules(rules_file)
+
+        match = compile_matcher(rules)
+        mismatches = {ref: label for ref, label in EXPECTED_MATCHES.items()
+                      if (match(ref) or (None,))[0] != label}
+        print(f"{'✅' if not mismatches else '❌'} Matcher: {len(EXPECTED_MATCHES) - len(mismatches)}/"
+              f"{len(EXPECTED_MATCHES)} refs matched to the expected rule")
+        ok &= not mismatches
+
+        for bad in ('[x]\nprefixes = V%\nranks = supplier_rank\n', '[x]\nprefixes = V\nranks = name\n',
+                    RULES + '[again]\nprefixes = V\nranks = supplier_rank\n'):
+            rules_file.write_text(bad)
+            try:
+                load_rules(rules_file)
+                print(f"❌ Invalid rules accepted: {bad.splitlines()[1:3]}")
+                ok = False
+            except ValueError as e:
+                print(f"✅ Rejected: {e}")
+
+    expected = {}
+    for partner in partners.values():
+        rule = match(partner['ref'])
+        if rule and not all(partner[rank_field] for rank_field in rule[2]):
+            expected[rule[0]] = expected.get(rule[0], 0) + 1
+
+    pool = ConnectionPool(server.url, pool_size=4)
+    models = server_proxy(pool, 'object')
+
+    # One scan for all rules: every page is the same domain past an id cursor, each contact read
+    # once, and each one planned under the rule of its longest prefix with the ranks it lacks
+    expected_plan = {}
+    for partner_id in sorted(partners):
+        rule = match(partners[partner_id]['ref'])
+        missing = tuple(rank for rank in rule[2] if not partners[partner_id][rank]) if rule else ()
+        if missing:
+            expected_plan.setdefault((rule[0], missing), []).append(partner_id)
+    plan = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        classify_contacts_by_reference(models, odoo.database, odoo.uid, odoo.password, dry_run=True,
+                                       rules=rules, plan=plan)
+    scan_domain = classification_domain(rules)
+    one_domain = all(domain[:len(scan_domain)] == scan_domain and len(domain) == len(scan_domain) + 1
+                     for domain, ids in odoo.pages)
+    read = [record_id for domain, ids in odoo.pages for record_id in ids]
+    once = len(read) == len(set(read)) and set(read) == {i for ids in expected_plan.values() for i in ids}
+    print(f"{'✅' if one_domain and once else '❌'} One scan: {len(odoo.pages)} pages of the same domain, "
+          f"{len(read)} contacts read, {'each once' if once else 'not each once'}")
+    ok &= one_domain and once
+    partitioned = plan == expected_plan
+    print(f"{'✅' if partitioned else '❌'} Partition: " + ', '.join(
+        f"{label} {'+'.join(missing)} {len(ids)}" for (label, missing), ids in sorted(plan.items())))
+    ok &= partitioned
+    for dry_run in (True, False):
+        requests_before = server.requests
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = classify_contacts_by_reference(models, odoo.database, odoo.uid, odoo.password,
+                                                     dry_run=dry_run, preview=not dry_run, rules=rules)
+        to_update = {label: results[f'{label}s_to_update'] for label in results['rules']
+                     if results[f'{label}s_to_update']}
+        same = to_update == expected and not results['errors']
+        print(f"{'✅' if same else '❌'} {'Dry run' if dry_run else 'Execute'}: {to_update} "
+              f"in {server.requests - requests_before} requests")
+        ok &= same
+
+    leftover = [partner['ref'] for partner in partners.values()
+                if match(partner['ref']) and not all(partner[rank] for rank in match(partner['ref'])[2])]
+    kept = all(partner['supplier_rank'] == 3 for partner_id, partner in partners.items()
+               if partner['ref'] and partner['ref'].startswith('VC') and partner_id % 7 == 0)
+    print(f"{'✅' if not leftover and kept else '❌'} After execute: {len(leftover)} contacts unclassified, "
+          f"existing ranks {'kept' if kept else 'overwritten'}")
+    ok &= not leftover and kept
+
+    pool.close()
+    server.shutdown()
+    print(f"\n{'✓ Classification rules test passed' if ok else '✗ Classification rules test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
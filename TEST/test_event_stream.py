@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the classification event stream against a local fake Odoo server: a
+dry run with --events writes one JSON line per contact that would be
+updated, an --execute run one per contact written, and --quiet prints
+nothing but the results summary
+Usage: python TEST/test_event_stream.py [--partners 100000]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_classify, start_server, unclassified, write_instance_config
+
+
+def classify(home, *flags):
+    completed, elapsed = run_classify(home, *flags)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stdout[-800:] + completed.stderr[-500:])
+    return completed.stdout, elapsed
+
+
+def read_events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check JSONL classification events and --quiet')
+    parser.add_argument('--partners', type=int, default=100000)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners, classified_every=4)
+    expected = unclassified(odoo)
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        write_instance_config(home, server, odoo)
+
+        stdout, listed = classify(home, '--preview', '--full')
+        print(f"📄 Dry run listing every contact: {stdout.count(chr(10))} lines in {listed:.2f}s")
+
+        events_file = Path(home) / 'dry-run.jsonl'
+        stdout, streamed = classify(home, '--events', str(events_file), '--full')
+        events = read_events(events_file)
+        would = [e for e in events if e['outcome'] == 'would_update']
+        print(f"{'✅' if len(would) == len(events) == expected else '❌'} Dry run with --events: "
+              f"{len(events)}/{expected} events, {stdout.count(chr(10))} lines in {streamed:.2f}s")
+        ok &= len(would) == len(events) == expected
+        fields = {'id', 'ref', 'rule', 'action', 'ranks', 'outcome'}
+        ok &= all(fields <= set(event) for event in events)
+
+        stdout, quiet = classify(home, '--quiet', '--full')
+        lines = [line for line in stdout.splitlines() if line.strip()]
+        summary = lines[0].startswith('=') and 'CLASSIFICATION RESULTS' in lines[1] if len(lines) > 1 else False
+        print(f"{'✅' if summary else '❌'} --quiet printed {len(lines)} lines, starting with the summary")
+        ok &= summary
+
+        events_file = Path(home) / 'execute.jsonl'
+        stdout, executed = classify(home, '--execute', '--quiet', '--events', str(events_file))
+        events = read_events(events_file)
+        updated = {e['id'] for e in events if e['outcome'] == 'updated'}
+        left = unclassified(odoo)
+        print(f"{'✅' if len(updated) == expected and not left else '❌'} Execute with --events: "
+              f"{len(updated)} updated events, {left} contacts left, {executed:.2f}s")
+        ok &= len(updated) == expected and not left
+
+    server.shutdown()
+    print(f"\n{'✓ Event stream test passed' if ok else '✗ Event stream test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
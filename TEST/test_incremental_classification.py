@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test incremental classification against a local fake Odoo server: a first
+run classifies everything and saves the watermark, the next run examines
+only partners created or changed since, and --full rescans the whole table
+Usage: python TEST/test_incremental_classification.py [--partners 5000]
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import SEED_DATE, FakeOdoo, run_classify, start_server, unclassified, write_instance_config
+
+
+def classify(server, home, *flags):
+    """Run classify_contacts.py --execute; return (requests made, contacts updated)"""
+    requests_before = server.requests
+    completed, elapsed = run_classify(home, '--execute', *flags)
+    updated = re.search(r'Successfully updated (\d+) contacts', completed.stdout)
+    if completed.returncode != 0 or not updated:
+        raise RuntimeError(completed.stdout[-500:] + completed.stderr[-500:])
+    return server.requests - requests_before, int(updated.group(1))
+
+
+def dry_run_counts(home):
+    """Run a dry run; return {'found': n, 'already': n, 'needing': n} summed over the rules"""
+    completed, elapsed = run_classify(home, '--quiet')
+    return {count: sum(int(n) for n in re.findall(rf'^\w+ {label}: (\d+)$', completed.stdout, re.MULTILINE))
+            for count, label in (('found', 'found'), ('already', 'already classified'),
+                                 ('needing', 'needing update'))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check watermark-based incremental classification')
+    parser.add_argument('--partners', type=int, default=5000)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners, classified_every=4)
+    server = start_server(odoo)
+    partners = odoo.records['res.partner']
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        config_dir = write_instance_config(home, server, odoo)
+
+        expected = unclassified(odoo)
+        requests, updated = classify(server, home)
+        print(f"🔄 First run: {updated} contacts updated in {requests} requests")
+        ok &= updated == expected
+        watermark = config_dir / 'watermarks' / 'hook.json'
+        if not watermark.exists():
+            print("❌ No watermark saved")
+            ok = False
+
+        # As if the first run was long ago: its own writes are older than the watermark
+        recorded = json.loads(watermark.read_text())
+        watermark.write_text(json.dumps(dict(recorded, write_date='2025-06-01 00:00:00')))
+        for partner in partners.values():
+            partner['write_date'] = SEED_DATE
+
+        # New partners, and an old one whose rank was cleared after the first run
+        odoo.execute('res.partner', 'create', [[{'name': 'New vendor', 'ref': 'V90001'},
+                                                {'name': 'New customer', 'ref': 'C90002'}]], {})
+        odoo.execute('res.partner', 'write', [[1], {'supplier_rank': 0}], {})
+        # Found and already classified cover the examined partners only, like needing update
+        counts = dry_run_counts(home)
+        scoped = counts['found'] == counts['already'] + counts['needing'] and counts['needing'] == 3 and \
+            counts['found'] == 3
+        print(f"{'✅' if scoped else '❌'} Incremental dry run: {counts['found']} found, {counts['already']} "
+              f"already classified, {counts['needing']} needing update")
+        ok &= scoped
+        requests, updated = classify(server, home, '--page-size', '100')
+        print(f"🕒 Incremental run: {updated} contacts updated in {requests} requests")
+        ok &= updated == 3
+
+        # Seeded as classified and never written since: cleared behind the watermark's back
+        partners[7]['supplier_rank'] = partners[8]['customer_rank'] = 0
+        requests, updated = classify(server, home)
+        print(f"🕒 Incremental run missing untracked changes: {updated} contacts updated")
+        ok &= updated == 0
+        requests, updated = classify(server, home, '--full')
+        print(f"🔁 --full run: {updated} contacts updated in {requests} requests")
+        ok &= updated == 2
+
+    server.shutdown()
+    print(f"\n{'✓ Incremental classification test passed' if ok else '✗ Incremental classification test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
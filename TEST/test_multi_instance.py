@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test multi-instance fan-out of classify_contacts.py: three fake Odoo
+servers (one per instance, with some service time) are classified with
+--instances in one run, which should take about as long as the slowest
+instance rather than the sum of all three
+Usage: python TEST/test_multi_instance.py [--partners 10000] [--service-ms 5]
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_classify, start_server, unclassified, write_instance_config
+
+INSTANCES = ('hook', 'hook_production', 'hook_local')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check concurrent multi-instance classification')
+    parser.add_argument('--partners', type=int, default=10000)
+    parser.add_argument('--service-ms', type=float, default=5.0, help='Server time per request')
+    args = parser.parse_args()
+
+    odoos = {instance: FakeOdoo(partners=args.partners * (index + 1), classified_every=4)
+             for index, instance in enumerate(INSTANCES)}
+    servers = {instance: start_server(odoo, service_time=args.service_ms / 1000.0)
+               for instance, odoo in odoos.items()}
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        for instance, server in servers.items():
+            # hook_local uses the db_name key of _odoo_config-style files
+            write_instance_config(home, server, odoos[instance], name=instance,
+                                  database_key='db_name' if instance == 'hook_local' else 'database')
+
+        completed, elapsed = run_classify(home, '--execute', '--instances', ','.join(INSTANCES))
+        summary = completed.stdout.find('MULTI-INSTANCE SUMMARY')
+        print(completed.stdout[completed.stdout.rfind('\n', 0, summary) + 1:])
+
+        for instance, odoo in odoos.items():
+            left = unclassified(odoo)
+            prefixed = f"[{instance}] ✅ Successfully updated" in completed.stdout
+            print(f"{'✅' if not left and prefixed else '❌'} {instance}: {len(odoo.partners)} partners, "
+                  f"{left} left unclassified, {servers[instance].requests} requests")
+            ok &= not left and prefixed
+
+        timings = re.search(r'Wall time ([\d.]+)s \(instances one after another: ([\d.]+)s\)', completed.stdout)
+        concurrent = timings is not None and float(timings.group(1)) < float(timings.group(2)) * 0.8
+        print(f"{'✅' if concurrent else '❌'} Process took {elapsed:.2f}s; "
+              f"{timings.group(0) if timings else 'no timing line'}")
+        ok &= completed.returncode == 0 and concurrent
+        if completed.returncode != 0:
+            print(completed.stderr[-800:])
+
+    for server in servers.values():
+        server.shutdown()
+    print(f"\n{'✓ Multi-instance test passed' if ok else '✗ Multi-instance test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the parallel write dispatcher against a local fake Odoo server whose
+writes take time per record (like ORM recomputes) and sometimes fail with a
+serialization error: --write-workers sends chunks concurrently, retries the
+failed ones and reports contacts in a deterministic order
+Usage: python TEST/test_parallel_writes.py [--partners 40000] [--record-us 100]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+import xmlrpc.client
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_classify, start_server, unclassified, write_instance_config
+
+
+class TransactionalOdoo(FakeOdoo):
+    """Writes cost time per record outside the store lock; every 7th write fails once"""
+
+    def __init__(self, *args, record_time=0.0001, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.record_time = record_time
+        self.writes = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._flight_lock = threading.Lock()
+
+    def execute(self, model, method, args, kwargs):
+        if method != 'write':
+            return super().execute(model, method, args, kwargs)
+        with self._flight_lock:
+            self.writes += 1
+            fail = self.writes % 7 == 0
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            ids = args[0] if isinstance(args[0], list) else [args[0]]
+            time.sleep(self.record_time * len(ids))
+            if fail:
+                self.failures += 1
+                raise xmlrpc.client.Fault(1, 'could not serialize access due to concurrent update')
+            return super().execute(model, method, args, kwargs)
+        finally:
+            with self._flight_lock:
+                self.in_flight -= 1
+
+
+def run(partners, record_time, workers):
+    odoo = TransactionalOdoo(partners=partners, classified_every=4, record_time=record_time)
+    server = start_server(odoo)
+    with tempfile.TemporaryDirectory() as home:
+        write_instance_config(home, server, odoo)
+        events_file = Path(home) / 'events.jsonl'
+        completed, elapsed = run_classify(home, '--execute', '--quiet', '--write-workers', str(workers),
+                                          '--events', str(events_file))
+        events = [json.loads(line) for line in events_file.read_text().splitlines()]
+    server.shutdown()
+    left = unclassified(odoo)
+    return completed, elapsed, odoo, events, left
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check concurrent chunked classification writes')
+    parser.add_argument('--partners', type=int, default=40000)
+    parser.add_argument('--record-us', type=float, default=100.0, help='Server write time per record')
+    args = parser.parse_args()
+    ok = True
+
+    timings = {}
+    for workers in (1, 4):
+        completed, elapsed, odoo, events, left = run(args.partners, args.record_us / 1e6, workers)
+        timings[workers] = elapsed
+        by_rule = {}
+        for event in events:
+            by_rule.setdefault(event['rule'], []).append(event['id'])
+        ordered = all(ids == sorted(ids) for ids in by_rule.values())
+        failed = sum(1 for event in events if event['outcome'] != 'updated')
+        passed = completed.returncode == 0 and not left and not failed and ordered
+        print(f"{'✅' if passed else '❌'} --write-workers {workers}: {elapsed:.2f}s, {odoo.writes} writes "
+              f"({odoo.failures} failed and retried), up to {odoo.max_in_flight} in flight, {left} left, "
+              f"events {'in order' if ordered else 'out of order'}")
+        ok &= passed and odoo.max_in_flight <= workers
+        if completed.returncode != 0:
+            print(completed.stdout[-800:], completed.stderr[-500:])
+
+    faster = timings[4] < timings[1] * 0.8
+    print(f"{'✅' if faster else '❌'} Concurrent writes {timings[1] / timings[4]:.1f}x faster")
+    ok &= faster
+
+    print(f"\n{'✓ Parallel write test passed' if ok else '✗ Parallel write test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test id-cursor paging against a local fake Odoo server: iter_pages returns
+every matching record once, in id order, across page boundaries, within
+start_id/end_id bounds and when records are deleted between pages; id
+ranges together cover the whole table
+Usage: python TEST/test_partner_scan.py [--partners 1000]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _partner_scan import id_ranges, iter_pages
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+FIELDS = ['id', 'ref']
+
+
+def scan(connection, domain=(), page_size=100, **bounds):
+    pages = [[record['id'] for record in page] for page in iter_pages(*connection, domain, FIELDS, page_size,
+                                                                      **bounds)]
+    return pages, [record_id for page in pages for record_id in page]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check id-cursor paging of iter_pages')
+    parser.add_argument('--partners', type=int, default=1000)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners, classified_every=4)
+    partners = odoo.records['res.partner']
+    all_ids = sorted(partners)
+    server = start_server(odoo)
+    pool = ConnectionPool(server.url, pool_size=2)
+    connection = (server_proxy(pool, 'object'), odoo.database, odoo.uid, odoo.password)
+    ok = True
+
+    # A page size dividing the table, one that does not, one of a single record and one above the table size
+    for page_size in (100, 7, 1, len(all_ids) + 1):
+        pages, ids = scan(connection, page_size=page_size)
+        full = all(len(page) == page_size for page in pages[:-1]) and 0 < len(pages[-1]) <= page_size
+        passed = ids == all_ids and full
+        print(f"{'✅' if passed else '❌'} Page size {page_size}: {len(pages)} pages, {len(ids)}/{len(all_ids)} "
+              f"records in id order")
+        ok &= passed
+
+    # start_id is exclusive, end_id inclusive, also on page boundaries and with a domain narrowing the ids
+    vendors = [['ref', '=like', 'V%']]
+    for domain, start_id, end_id in (((), 250, 600), ((), 0, 100), ((), 300, 300), ((), 990, None),
+                                     (vendors, 250, 601), (vendors, 0, None)):
+        expected = [record_id for record_id in all_ids if record_id > start_id
+                    and (end_id is None or record_id <= end_id)
+                    and (not domain or partners[record_id]['ref'].startswith('V'))]
+        pages, ids = scan(connection, domain, page_size=50, start_id=start_id, end_id=end_id)
+        passed = ids == expected
+        print(f"{'✅' if passed else '❌'} {'Vendors' if domain else 'All'} in ({start_id}, {end_id}]: "
+              f"{len(ids)}/{len(expected)} records")
+        ok &= passed
+
+    # Records deleted while the scan is between pages: the next page starts past the last id seen,
+    # so the deleted ones (just ahead of the cursor or already read) shift nothing
+    deleted = set()
+    ids = []
+    for page in iter_pages(*connection, [], FIELDS, 100):
+        ids += [record['id'] for record in page]
+        last_id = page[-1]['id']
+        with odoo._lock:
+            for record_id in (last_id + 1, last_id + 2, last_id + 150, last_id - 10):
+                if partners.pop(record_id, None) is not None:
+                    deleted.add(record_id)
+    expected = [record_id for record_id in all_ids if record_id not in deleted or record_id in ids]
+    passed = ids == expected and len(set(ids)) == len(ids)
+    print(f"{'✅' if passed else '❌'} {len(deleted)} records deleted between pages: {len(ids)} read, "
+          f"none skipped or repeated ({len(deleted & set(ids))} were read before their deletion)")
+    ok &= passed
+
+    # Id ranges of the remaining records, scanned one after another, are the whole scan
+    remaining = sorted(partners)
+    ranges = id_ranges(*connection, [], 6)
+    ids = [record_id for start_id, end_id in ranges
+           for record_id in scan(connection, page_size=64, start_id=start_id, end_id=end_id)[1]]
+    passed = ids == remaining and len(ranges) == 6
+    print(f"{'✅' if passed else '❌'} {len(ranges)} id ranges cover {len(ids)}/{len(remaining)} records")
+    ok &= passed
+
+    pool.close()
+    server.shutdown()
+    print(f"\n{'✓ Partner scan test passed' if ok else '✗ Partner scan test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test resumable execute runs against a local fake Odoo server: the
+classify_contacts.py process is killed right after the server commits one
+of its writes, then --resume finishes the run from the journal without
+rescanning from the start or writing a contact twice - once for the
+single-process scan and once for a --shards scan
+Usage: python TEST/test_resume_classification.py [--partners 20000] [--kill-after 10] [--shards 3]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import ROOT, FakeOdoo, start_server, unclassified, write_instance_config
+
+
+class KillingOdoo(FakeOdoo):
+    """Counts writes per partner id and kills the client after its Nth write is committed"""
+
+    def __init__(self, *args, kill_after=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.kill_after = kill_after
+        self.writes = 0
+        self.written = {}
+        self.client = None
+
+    def _write(self, table, ids, vals):
+        result = super()._write(table, ids, vals)
+        for record_id in ([ids] if isinstance(ids, int) else ids):
+            self.written[record_id] = self.written.get(record_id, 0) + 1
+        self.writes += 1
+        if self.writes == self.kill_after and self.client is not None:
+            os.kill(self.client.pid, signal.SIGKILL)  # Committed, but the client never hears back
+        return result
+
+
+def classify(home, *flags):
+    """Start classify_contacts.py --execute without waiting for it: the server kills it mid-run"""
+    return subprocess.Popen([sys.executable, 'classify_contacts.py', '--execute', '--page-size', '1000',
+                             '--chunk-size', '200', '--write-workers', '4'] + list(flags),
+                            cwd=ROOT, env=dict(os.environ, HOME=home), stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def check(args, shards):
+    """Kill and resume one run scanning in shards worker processes (1: in the client itself)"""
+    print(f"\n🧪 {'Single-process scan' if shards == 1 else f'Scan in {shards} shards'}")
+    flags = ['--shards', str(shards)]
+    odoo = KillingOdoo(partners=args.partners, classified_every=4, kill_after=args.kill_after)
+    expected = unclassified(odoo)
+    server = start_server(odoo)
+    server.handle_error = lambda request, client_address: None  # The killed client resets its connection
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        config_dir = write_instance_config(home, server, odoo)
+
+        odoo.client = classify(home, *flags)
+        odoo.client.communicate('yes\n')
+        killed = odoo.client.returncode == -signal.SIGKILL
+        journal = next((config_dir / 'runs').glob('hook-*.jsonl'))
+        records = [json.loads(line) for line in journal.read_text().splitlines()]
+        checkpoint = max([r['last_id'] for r in records if r['type'] == 'checkpoint'] or [0])
+        batches = {r['batch']: r['ids'] for r in records if r['type'] == 'previous'}
+        journaled = sum(len(batches[r['batch']]) - len(r.get('failed', ())) for r in records if r['type'] == 'batch')
+        print(f"{'✅' if killed else '❌'} Run killed after {odoo.writes} writes: "
+              f"{journaled} contacts journaled, checkpoint at id {checkpoint}")
+        ok &= killed and checkpoint > 0
+
+        requests_before = server.requests
+        odoo.client = None
+        resumed = classify(home, '--resume', *flags)
+        stdout, stderr = resumed.communicate('yes\n')
+        remaining = unclassified(odoo)
+        twice = sorted(record_id for record_id, count in odoo.written.items() if count > 1)
+        print(f"{'✅' if resumed.returncode == 0 and not remaining else '❌'} Resumed in "
+              f"{server.requests - requests_before} requests: {len(odoo.written)}/{expected} contacts "
+              f"classified, {remaining} left")
+        # Only the batch whose reply was lost (4 concurrent chunks of 200) may be written again
+        print(f"{'✅' if len(twice) <= 800 else '❌'} Contacts written twice: {len(twice)}")
+        ok &= resumed.returncode == 0 and not remaining and len(twice) <= 800
+        if resumed.returncode != 0:
+            print(stdout[-500:], stderr[-500:])
+
+        finished = '"type":"end"' in journal.read_text()
+        # An unfinished, later run of another instance whose name starts with this one's is not resumed
+        (config_dir / 'runs' / 'hook-eu-29991231-235959.jsonl').write_text(
+            json.dumps({'type': 'start', 'instance': 'hook-eu'}) + '\n')
+        again = classify(home, '--resume', *flags)
+        stdout, stderr = again.communicate('yes\n')
+        refused = again.returncode == 1 and 'No unfinished run' in stdout
+        print(f"{'✅' if finished and refused else '❌'} Journal finished, a second --resume is refused "
+              f"(another instance's unfinished run ignored)")
+        ok &= finished and refused
+
+    server.shutdown()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check journaled, resumable classification runs')
+    parser.add_argument('--partners', type=int, default=20000)
+    parser.add_argument('--kill-after', type=int, default=10, help='Writes committed before the client dies')
+    parser.add_argument('--shards', type=int, default=3, help='Worker processes of the sharded run')
+    args = parser.parse_args()
+
+    ok = check(args, 1)
+    ok &= check(args, args.shards)
+    print(f"\n{'✓ Resume test passed' if ok else '✗ Resume test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
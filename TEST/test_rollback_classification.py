@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test rolling back a classification run against a local fake Odoo server:
+an --execute run is undone with --rollback RUN_ID in grouped, batched
+writes, leaving alone the ranks that changed again after the run; a run
+on a non-default instance is rolled back on that instance
+Usage: python TEST/test_rollback_classification.py [--partners 100000]
+"""
+
+import argparse
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_classify, start_server, write_instance_config
+
+
+class CountingOdoo(FakeOdoo):
+    """Counts write calls"""
+
+    writes = 0
+
+    def _write(self, table, ids, vals):
+        self.writes += 1
+        return super()._write(table, ids, vals)
+
+
+def classify(home, *flags):
+    completed, elapsed = run_classify(home, *flags)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stdout[-800:] + completed.stderr[-500:])
+    return completed.stdout
+
+
+def ranks(partners):
+    return {partner_id: (p['supplier_rank'], p['customer_rank']) for partner_id, p in partners.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check batched rollback of a classification run')
+    parser.add_argument('--partners', type=int, default=100000)
+    args = parser.parse_args()
+
+    odoo = CountingOdoo(partners=args.partners, classified_every=4)
+    partners = odoo.records['res.partner']
+    before = ranks(partners)
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        write_instance_config(home, server, odoo)
+
+        stdout = classify(home, '--execute')
+        run_id = re.search(r'runs/(\S+)\.jsonl', stdout).group(1)
+        changed = sum(1 for partner_id, value in ranks(partners).items() if value != before[partner_id])
+        print(f"🔄 Run {run_id} changed {changed} contacts in {odoo.writes} writes")
+
+        # Sales orders after the run: these customers must keep their new rank
+        bumped = [p['id'] for p in partners.values() if p['customer_rank'] == 1 and not before[p['id']][1]][:100]
+        for partner_id in bumped:
+            partners[partner_id]['customer_rank'] = 2
+
+        stdout = classify(home, '--rollback', run_id)
+        would = int(re.search(r'Would restore: (\d+)', stdout).group(1))
+        print(f"{'✅' if would == changed - len(bumped) else '❌'} Dry run would restore {would}")
+        ok &= would == changed - len(bumped) and ranks(partners)[bumped[0]][1] == 2
+
+        writes_before, requests_before = odoo.writes, server.requests
+        start = time.perf_counter()
+        events_file = Path(home) / 'rollback.jsonl'
+        stdout = classify(home, '--rollback', run_id, '--execute', '--quiet', '--events', str(events_file))
+        elapsed = time.perf_counter() - start
+        restored = int(re.search(r'Restored: (\d+)', stdout).group(1))
+        events = [json.loads(line) for line in events_file.read_text().splitlines()]
+        logged = sum(1 for event in events if event['action'] == 'restore_ranks' and event['outcome'] == 'restored')
+        quiet = '↩️' not in stdout and 'Connecting' not in stdout
+        print(f"{'✅' if logged == restored and quiet else '❌'} --events logged {logged} restored contacts, "
+              f"--quiet {'kept' if quiet else 'did not keep'} status lines out")
+        ok &= logged == restored and quiet
+        after = ranks(partners)
+        wrong = [partner_id for partner_id, value in after.items()
+                 if value != before[partner_id] and partner_id not in bumped]
+        kept = all(after[partner_id][1] == 2 for partner_id in bumped)
+        print(f"{'✅' if not wrong and kept else '❌'} Restored {restored} contacts in {elapsed:.2f}s, "
+              f"{odoo.writes - writes_before} writes / {server.requests - requests_before} requests; "
+              f"{len(wrong)} wrong, bumped ranks {'kept' if kept else 'lost'}")
+        ok &= not wrong and kept and restored == changed - len(bumped)
+
+        stdout = classify(home, '--rollback', run_id, '--execute')
+        again = int(re.search(r'Restored: (\d+)', stdout).group(1))
+        print(f"{'✅' if again == 0 else '❌'} Second rollback restored {again}")
+        ok &= again == 0
+
+        # A run on hook_local is rolled back there: named with --instances or taken from the journal
+        local = FakeOdoo(partners=2000, classified_every=4)
+        local_server = start_server(local)
+        write_instance_config(home, local_server, local, name='hook_local')
+        local_before = ranks(local.records['res.partner'])
+        stdout = classify(home, '--execute', '--instances', 'hook_local')
+        local_run = re.search(r'runs/(hook_local-\S+)\.jsonl', stdout).group(1)
+        stdout = classify(home, '--rollback', local_run, '--instances', 'hook_local')
+        would = int(re.search(r'Would restore: (\d+)', stdout).group(1))
+        classify(home, '--rollback', local_run, '--execute')
+        restored = ranks(local.records['res.partner']) == local_before
+        print(f"{'✅' if restored and would else '❌'} Run {local_run} rolled back on hook_local "
+              f"({would} contacts)")
+        ok &= restored and would > 0
+        local_server.shutdown()
+
+    server.shutdown()
+    print(f"\n{'✓ Rollback test passed' if ok else '✗ Rollback test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
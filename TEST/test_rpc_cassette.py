@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test RPC cassettes end to end: record classify_contacts.py and
+TEST/analyze_contacts.py against the fake Odoo server, stop the server, then
+replay both offline (with and without simulated latency) and compare output
+Usage: python TEST/test_rpc_cassette.py [--partners 2000] [--latency-ms 1]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_script, start_server, write_instance_config
+
+SCRIPTS = (['classify_contacts.py'], ['TEST/analyze_contacts.py'])
+
+
+def run(script, home, cassette, mode, latency='0'):
+    return run_script(home, *script, env={'ODOO_RPC_CASSETTE': cassette, 'ODOO_RPC_CASSETTE_MODE': mode,
+                                          'ODOO_RPC_REPLAY_LATENCY': latency})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and replay RPC cassettes')
+    parser.add_argument('--partners', type=int, default=2000)
+    parser.add_argument('--latency-ms', default='1', help="Replay latency per call, or 'recorded'")
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners, classified_every=4)
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        write_instance_config(home, server, odoo)
+
+        recorded = {}
+        for script in SCRIPTS:
+            cassette = str(Path(home) / f"{Path(script[0]).stem}.cassette.json.gz")
+            requests_before = server.requests
+            completed, elapsed = run(script, home, cassette, 'record')
+            recorded[script[0]] = (cassette, completed.stdout)
+            size = os.path.getsize(cassette) if os.path.exists(cassette) else 0
+            print(f"📼 {script[0]}: recorded {server.requests - requests_before} requests in {elapsed:.2f}s, "
+                  f"cassette {size / 1024:.1f} KB")
+            if completed.returncode != 0 or not size:
+                print(f"❌ Recording failed: {completed.stderr.strip()}")
+                ok = False
+
+        # Replay must not need the server at all
+        server.shutdown()
+        server.server_close()
+
+        for script in SCRIPTS:
+            cassette, expected = recorded[script[0]]
+            for latency in ('0', args.latency_ms):
+                completed, elapsed = run(script, home, cassette, 'replay', latency)
+                same = completed.returncode == 0 and completed.stdout == expected
+                print(f"{'✅' if same else '❌'} {script[0]}: replayed with latency {latency} in {elapsed:.2f}s")
+                if not same:
+                    print(completed.stderr.strip())
+                    ok = False
+
+    print(f"\n{'✓ Cassette test passed' if ok else '✗ Cassette test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test per-call RPC metrics against a local fake Odoo server: counts and sizes
+by (model, method), slow-call log, Prometheus textfile and JSON export
+Usage: python TEST/test_rpc_metrics.py [--calls 50]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _rpc_metrics import RpcMetrics, InstrumentedModels
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check per-call RPC metrics and their export')
+    parser.add_argument('--calls', type=int, default=50)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=500)
+    server = start_server(odoo, workers=4, service_time=0.002)
+    ok = True
+
+    for protocol in ('xmlrpc', 'jsonrpc'):
+        registry = RpcMetrics()
+        registry.slow_call_ms = 1.0  # Every call is slow against a 2 ms service time
+        pool = ConnectionPool(server.url, pool_size=2)
+        models = InstrumentedModels(server_proxy(pool, 'object', protocol), pool, 'fake', registry)
+
+        for _ in range(args.calls):
+            models.execute_kw(odoo.database, odoo.uid, odoo.password, 'res.partner', 'search_count', [[]])
+        models.execute_kw(odoo.database, odoo.uid, odoo.password,
+                          'res.partner', 'search_read', [[]], {'fields': ['ref']})
+        try:
+            models.execute_kw(odoo.database, odoo.uid, 'wrong', 'res.partner', 'search_count', [[]])
+        except Exception:
+            pass
+
+        snapshot = registry.snapshot()
+        count = snapshot['fake res.partner.search_count']
+        read = snapshot['fake res.partner.search_read']
+        print(f"\n📊 {protocol}: search_count {count['calls']} calls / {count['errors']} errors, "
+              f"p50 {count['p50_ms']} ms, p99 {count['p99_ms']} ms; "
+              f"search_read {read['request_bytes']} bytes sent, {read['response_bytes']} received")
+        if count['calls'] != args.calls + 1 or count['errors'] != 1:
+            print("❌ Unexpected call/error counts")
+            ok = False
+        if read['response_bytes'] <= count['response_bytes'] / count['calls'] or not read['request_bytes']:
+            print("❌ Payload sizes not recorded")
+            ok = False
+
+        with tempfile.TemporaryDirectory() as directory:
+            prom_path = Path(directory) / 'odoo_rpc.prom'
+            json_path = Path(directory) / 'odoo_rpc.json'
+            registry.write(prom_path)
+            registry.write(json_path)
+            prom = prom_path.read_text()
+            exported = json.loads(json_path.read_text())
+        expected = ('odoo_rpc_calls_total{instance="fake",model="res.partner",method="search_count"} '
+                    f"{args.calls + 1}")
+        if expected not in prom or len(exported['calls']) != 2:
+            print("❌ Export does not match the snapshot")
+            ok = False
+        else:
+            print(f"✅ Exported {len(prom.splitlines())} Prometheus lines and {len(exported['calls'])} JSON entries")
+        pool.close()
+
+    server.shutdown()
+    print(f"\n{'✓ RPC metrics test passed' if ok else '✗ RPC metrics test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test server-side rank filtering against a local fake Odoo server: the rule
+domains leave out contacts that already have their rank (any non-zero
+value), and a dry run without --preview gets its counts from search_count
+alone - no page of contacts is read
+Usage: python TEST/test_server_side_filtering.py [--partners 20000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, start_server, write_instance_config
+
+
+class CallRecordingOdoo(FakeOdoo):
+    """Records (method, kwargs) of every model call"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def execute(self, model, method, args, kwargs):
+        self.calls.append((method, dict(kwargs or {})))
+        return super().execute(model, method, args, kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check rank filtering on the server and count-only dry runs')
+    parser.add_argument('--partners', type=int, default=20000)
+    args = parser.parse_args()
+
+    odoo = CallRecordingOdoo(partners=args.partners, classified_every=4)
+    partners = odoo.records['res.partner']
+    # Ranks come as 0, False (never set) or any positive number (one per sales/purchase order)
+    for partner_id, partner in partners.items():
+        if partner_id % 9 == 0:
+            partner['customer_rank'] = partner['supplier_rank'] = False
+        elif partner_id % 11 == 0:
+            partner['customer_rank' if partner['ref'].startswith('C') else 'supplier_rank'] = 5
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['HOME'] = home
+        write_instance_config(home, server, odoo)
+
+        from _classification_rules import DEFAULT_RULES, rule_domain
+        from _config import connect_odoo
+        from _contact_updater import classify_contacts_by_reference
+        from _event_stream import EventStream
+
+        models, db, uid, password = connect_odoo('hook')
+        expected = {}
+        for rule in DEFAULT_RULES:
+            label, (prefix,), (rank_field,) = rule
+            expected[label] = {p['id'] for p in partners.values()
+                               if p['ref'] and p['ref'].startswith(prefix) and not p[rank_field]}
+            found = set(models.execute_kw(db, uid, password, 'res.partner', 'search',
+                                          [rule_domain(rule, DEFAULT_RULES)]))
+            ranked = sum(1 for p in partners.values() if p['ref'] and p['ref'].startswith(prefix) and p[rank_field])
+            print(f"{'✅' if found == expected[label] else '❌'} {label}: the server matched {len(found)} "
+                  f"unranked contacts, left out {ranked} already ranked")
+            ok &= found == expected[label]
+
+        quiet = EventStream(quiet=True)
+        for preview in (False, True):
+            odoo.calls.clear()
+            results = classify_contacts_by_reference(models, db, uid, password, dry_run=True, preview=preview,
+                                                     events=quiet)
+            counts = {label: results[f'{label}s_to_update'] for label in expected}
+            right = all(counts[label] == len(ids) for label, ids in expected.items())
+            # The watermark lookup reads one partner's write_date; anything more is a page of contacts
+            pages = [kwargs for method, kwargs in odoo.calls if method == 'search_read' and kwargs.get('limit') != 1]
+            print(f"{'✅' if right else '❌'} Dry run{' with --preview' if preview else ''}: to update {counts}, "
+                  f"{len(odoo.calls)} calls, {len(pages)} pages of contacts read")
+            ok &= right and (bool(pages) if preview else not pages)
+
+    server.shutdown()
+    print(f"\n{'✓ Server-side filtering test passed' if ok else '✗ Server-side filtering test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test sharded scans against a local fake Odoo server: classify_contacts.py
+and TEST/analyze_contacts.py with --shards split the partner table into id
+ranges scanned by worker processes, and must report exactly what a
+single-process scan reports
+Usage: python TEST/test_sharded_scan.py [--partners 100000] [--shards 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fake_odoo_server import FakeOdoo, run_script, start_server, unclassified, write_instance_config
+
+
+def run(home, *command):
+    completed, elapsed = run_script(home, *command)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stdout[-800:] + completed.stderr[-500:])
+    return completed.stdout, elapsed
+
+
+def summary(stdout, marker):
+    """The output from marker on - what must not depend on sharding"""
+    return stdout[stdout.find(marker):]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check process-sharded partner scans')
+    parser.add_argument('--partners', type=int, default=100000)
+    parser.add_argument('--shards', type=int, default=4)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(partners=args.partners, classified_every=4)
+    server = start_server(odoo)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as home:
+        write_instance_config(home, server, odoo)
+        shards = ['--shards', str(args.shards)]
+
+        single, single_time = run(home, 'TEST/analyze_contacts.py')
+        sharded, sharded_time = run(home, 'TEST/analyze_contacts.py', *shards)
+        same = summary(single, '📊') == summary(sharded, '📊') and '📊' in single
+        print(f"{'✅' if same else '❌'} analyze_contacts.py: {single_time:.2f}s in one process, "
+              f"{sharded_time:.2f}s with {args.shards} shards, {'same' if same else 'different'} report")
+        ok &= same
+
+        plans = {}
+        for flags in ([], shards):
+            plan_file = Path(home) / f"plan{len(flags)}.json"
+            stdout, elapsed = run(home, 'classify_contacts.py', '--quiet', '--plan', str(plan_file), *flags)
+            plans[len(flags)] = json.loads(plan_file.read_text())['groups'], summary(stdout, '📊')
+            print(f"📋 Dry run {'with ' + str(args.shards) + ' shards' if flags else 'in one process'}: "
+                  f"{elapsed:.2f}s")
+        if (os.cpu_count() or 1) <= args.shards:
+            print(f"ℹ️  {os.cpu_count()} core(s) shared with the stand-in server: shards cannot be faster here")
+        same = plans[0] == plans[len(shards)]
+        print(f"{'✅' if same else '❌'} Sharded dry run plans the same contacts in the same order")
+        ok &= same
+
+        stdout, elapsed = run(home, 'classify_contacts.py', '--execute', '--quiet', *shards)
+        left = unclassified(odoo)
+        print(f"{'✅' if not left else '❌'} Sharded execute in {elapsed:.2f}s: {left} contacts left unclassified")
+        ok &= not left
+
+    server.shutdown()
+    print(f"\n{'✓ Sharded scan test passed' if ok else '✗ Sharded scan test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test the pooled transport's stale-connection retry against a local fake Odoo
+server: a kept-alive connection that fails while the request is being sent
+is retried on a fresh one, one that fails after the whole request went out
+is retried only for read-only calls (a write must not run twice), and the
+failed connection is closed either way
+Usage: python TEST/test_stale_connections.py
+"""
+
+import http.client
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import our modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from _rpc_transport import ConnectionPool, server_proxy
+from fake_odoo_server import FakeOdoo, start_server
+
+
+class StaleConnection:
+    """Idle connection the server already dropped: fails on send or on reading the response"""
+
+    def __init__(self, fails_on):
+        self.fails_on = fails_on
+        self.closed = False
+
+    def request(self, method, url, body=None, headers=None):
+        if self.fails_on == 'send':
+            raise BrokenPipeError(32, 'Broken pipe')
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected('Remote end closed connection without response')
+
+    def close(self):
+        self.closed = True
+
+
+def main():
+    odoo = FakeOdoo(partners=100, classified_every=0)
+    partners = odoo.records['res.partner']
+    server = start_server(odoo)
+    ok = True
+
+    for protocol in ('xmlrpc', 'jsonrpc'):
+        pool = ConnectionPool(server.url, pool_size=2)
+        models = server_proxy(pool, 'object', protocol=protocol)
+        calls = {
+            'read': lambda: models.execute_kw(odoo.database, odoo.uid, odoo.password, 'res.partner',
+                                              'search_count', [[]]),
+            'write': lambda: models.execute_kw(odoo.database, odoo.uid, odoo.password, 'res.partner',
+                                               'write', [[1], {'customer_rank': partners[1]['customer_rank'] + 1}]),
+        }
+        # (failure point, call, retried?)
+        for fails_on, call, retried in (('send', 'write', True), ('send', 'read', True),
+                                        ('response', 'read', True), ('response', 'write', False)):
+            stale = StaleConnection(fails_on)
+            pool._idle.append((stale, time.monotonic()))
+            requests_before = server.requests
+            rank_before = partners[1]['customer_rank']
+            try:
+                calls[call]()
+                outcome = 'retried'
+            except http.client.RemoteDisconnected:
+                outcome = 'raised'
+            sent = server.requests - requests_before
+            writes = partners[1]['customer_rank'] - rank_before
+            passed = (outcome == ('retried' if retried else 'raised') and stale.closed
+                      and sent == (1 if retried else 0) and writes == (1 if retried and call == 'write' else 0))
+            print(f"{'✅' if passed else '❌'} {protocol}: {call} on a connection failing on {fails_on} "
+                  f"{outcome}, {sent} request(s) reached the server, stale connection "
+                  f"{'closed' if stale.closed else 'left open'}")
+            ok &= passed
+        pool.close()
+
+    server.shutdown()
+    print(f"\n{'✓ Stale connection test passed' if ok else '✗ Stale connection test failed'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
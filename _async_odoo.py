@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Async Odoo Client
+asyncio counterpart to _config.connect_odoo - awaitable execute_kw/search_read
+over a semaphore-limited pool of keep-alive connections
+
+A standalone client: it shares the instance config (url, credentials,
+pool_size, protocol, ...) but none of the synchronous transport layers, so
+its calls go through no adaptive limiter, are not counted by _rpc_metrics,
+are not recorded or replayed by cassettes and always authenticate instead
+of using the session cache
+"""
+
+import asyncio
+import gzip
+import itertools
+import json
+import ssl
+import time
+import xmlrpc.client
+from collections import deque
+from urllib.parse import urlsplit
+
+from _config import get_config
+from _rpc_transport import DEFAULT_IDLE_TIMEOUT, DEFAULT_PROTOCOL, PROTOCOLS, is_read_only, jsonrpc_fault
+
+DEFAULT_ASYNC_POOL_SIZE = 16
+
+# asyncio's counterparts of _rpc_transport.STALE_CONNECTION_ERRORS
+STALE_CONNECTION_ERRORS = (ConnectionError, asyncio.IncompleteReadError)
+
+
+class AsyncConnectionPool:
+    """Pool of persistent HTTP/1.1 connections, at most pool_size requests in flight"""
+
+    def __init__(self, url, pool_size=DEFAULT_ASYNC_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, accept_gzip=True):
+        parts = urlsplit(url)
+        self.url = url.rstrip('/')
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == 'https' else 80)
+        self.path = parts.path.rstrip('/')
+        self.pool_size = max(1, int(pool_size))
+        self.idle_timeout = float(idle_timeout)
+        self.accept_gzip = accept_gzip
+
+        self._semaphore = asyncio.Semaphore(self.pool_size)
+        self._idle = deque()  # (reader, writer, last_used) - most recently used on the right
+
+        # Counters
+        self.connections_opened = 0
+        self.requests = 0
+
+    async def _new_connection(self):
+        self.connections_opened += 1
+        ssl_context = ssl.create_default_context() if self.scheme == 'https' else None
+        return await asyncio.open_connection(self.host, self.port, ssl=ssl_context)
+
+    async def _checkout(self):
+        """Return (reader, writer, reused) - an idle connection if one is still fresh"""
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][2] > self.idle_timeout:
+            self._idle.popleft()[1].close()
+        while self._idle:
+            reader, writer, last_used = self._idle.pop()
+            if not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await self._new_connection()
+        return reader, writer, False
+
+    async def post(self, path, body, headers):
+        """POST body to path on a pooled connection, return (status, reason, headers, data)"""
+        async with self._semaphore:
+            reader, writer, reused = await self._checkout()
+            sent = False
+            try:
+                try:
+                    await self._send(writer, path, body, headers)
+                    sent = True
+                    response = await self._receive(reader)
+                except STALE_CONNECTION_ERRORS:
+                    writer.close()
+                    # The server dropped an idle keep-alive connection - retry once on a fresh one, unless
+                    # the whole request went out and may have run: only read-only calls are sent twice
+                    if not reused or (sent and not is_read_only(body)):
+                        raise
+                    reader, writer = await self._new_connection()
+                    response = await self._exchange(reader, writer, path, body, headers)
+            except BaseException:
+                writer.close()
+                raise
+
+            status, reason, response_headers, data = response
+            if response_headers.get('connection', '').lower() == 'close':
+                writer.close()
+            else:
+                self._idle.append((reader, writer, time.monotonic()))
+
+            self.requests += 1
+            return status, reason, response_headers, data
+
+    async def _exchange(self, reader, writer, path, body, headers):
+        """Send one HTTP/1.1 request and read the complete response"""
+        await self._send(writer, path, body, headers)
+        return await self._receive(reader)
+
+    async def _send(self, writer, path, body, headers):
+        """Write one HTTP/1.1 request and wait until it is handed to the socket"""
+        lines = [f"POST {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        if self.accept_gzip:
+            lines.append("Accept-Encoding: gzip")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def _receive(self, reader):
+        """Read one complete HTTP/1.1 response"""
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        version, status, reason = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        if version == 'HTTP/1.0' and response_headers.get('connection', '').lower() != 'keep-alive':
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            data = await reader.readexactly(int(response_headers['content-length']))
+        else:
+            data = await reader.read()
+            response_headers['connection'] = 'close'
+
+        if response_headers.get('content-encoding', '').lower() == 'gzip':
+            data = gzip.decompress(data)
+        return int(status), reason, response_headers, data
+
+    async def close(self):
+        """Close all idle connections"""
+        while self._idle:
+            reader, writer, last_used = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def stats(self):
+        """Return pool counters"""
+        return {
+            'pool_size': self.pool_size,
+            'idle_connections': len(self._idle),
+            'connections_opened': self.connections_opened,
+            'requests': self.requests,
+        }
+
+
+class AsyncOdooClient:
+    """Authenticated async Odoo client with awaitable execute_kw/search_read"""
+
+    def __init__(self, pool, database, password, protocol=DEFAULT_PROTOCOL, uid=None):
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown RPC protocol '{protocol}' (expected one of: {', '.join(PROTOCOLS)})")
+        self.pool = pool
+        self.database = database
+        self.password = password
+        self.protocol = protocol
+        self.uid = uid
+        self._ids = itertools.count(1)
+
+    async def call(self, service, method, *args):
+        """Call a method of an Odoo RPC service ('common' or 'object')"""
+        if self.protocol == 'jsonrpc':
+            payload = {
+                'jsonrpc': '2.0',
+                'method': 'call',
+                'params': {'service': service, 'method': method, 'args': list(args)},
+                'id': next(self._ids),
+            }
+            path = f"{self.pool.path}/jsonrpc"
+            body = json.dumps(payload).encode('utf-8')
+            headers = {'Content-Type': 'application/json'}
+        else:
+            path = f"{self.pool.path}/xmlrpc/2/{service}"
+            body = xmlrpc.client.dumps(args, method).encode('utf-8')
+            headers = {'Content-Type': 'text/xml'}
+
+        status, reason, response_headers, data = await self.pool.post(path, body, headers)
+        if status != 200:
+            raise xmlrpc.client.ProtocolError(f"{self.pool.host}{path}", status, reason, response_headers)
+
+        if self.protocol == 'jsonrpc':
+            response = json.loads(data)
+            if response.get('error'):
+                raise jsonrpc_fault(response['error'])
+            return response.get('result')
+        return xmlrpc.client.loads(data)[0][0]
+
+    async def authenticate(self, username):
+        """Authenticate and remember the uid"""
+        self.uid = await self.call('common', 'authenticate', self.database, username, self.password, {})
+        if not self.uid:
+            raise Exception(f"Authentication failed for {username} on {self.database}")
+        return self.uid
+
+    async def version(self):
+        return await self.call('common', 'version')
+
+    async def execute_kw(self, model, method, args=None, kwargs=None):
+        """Await model.method(*args, **kwargs) on the server"""
+        return await self.call('object', 'execute_kw', self.database, self.uid, self.password,
+                               model, method, list(args or []), kwargs or {})
+
+    async def search_read(self, model, domain=None, fields=None, **kwargs):
+        """Await a search_read; extra kwargs (limit, offset, order) are passed through"""
+        if fields:
+            kwargs['fields'] = fields
+        return await self.execute_kw(model, 'search_read', [domain or []], kwargs)
+
+    async def close(self):
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def connect_async(url, database, username, password, protocol=DEFAULT_PROTOCOL,
+                        pool_size=DEFAULT_ASYNC_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, accept_gzip=True):
+    """Connect and authenticate to an Odoo server, return an AsyncOdooClient"""
+    pool = AsyncConnectionPool(url, pool_size=pool_size, idle_timeout=idle_timeout, accept_gzip=accept_gzip)
+    client = AsyncOdooClient(pool, database, password, protocol=protocol)
+    try:
+        await client.authenticate(username)
+    except BaseException:
+        await client.close()
+        raise
+    return client
+
+
+async def connect_odoo_async(instance_name, pool_size=None):
+    """
+    Async counterpart to _config.connect_odoo - reads ~/.odoo_config/{instance_name}.conf
+
+    At most pool_size calls are in flight, by default the instance's pool_size.
+    """
+    config = get_config(instance_name)
+    return await connect_async(
+        config['url'], config['database'], config['username'], config['password'],
+        protocol=config['protocol'],
+        pool_size=pool_size or config['pool_size'],
+        idle_timeout=config['idle_timeout'],
+        accept_gzip=config['gzip'],
+    )
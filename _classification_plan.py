@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Classification Plans
+A dry run's outcome saved to a file - the ids to update grouped by rule and
+missing ranks, with a checksum - so --execute --plan can write them without
+reading the partners again, after a cheap server-side check for drift
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+from _classification_rules import rule_domain
+from _state import write_text_atomic
+
+PLAN_VERSION = 1
+
+# Plan ids checked per search_count when looking for drift
+PLAN_CHECK_CHUNK_SIZE = 5000
+
+
+def plan_checksum(plan):
+    """sha256 of everything in the plan but its checksum"""
+    body = {key: value for key, value in plan.items() if key != 'checksum'}
+    return hashlib.sha256(json.dumps(body, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def build_plan(instance, rules, since, watermark, groups, found):
+    """
+    Plan of a dry run
+
+    Args:
+        rules: Fingerprint of the classification rules (rules_fingerprint)
+        since: Watermark the dry run started from, or None for a full scan
+        watermark: Watermark taken before the dry run's scan
+        groups: {(rule label, missing ranks): [ids]} collected by the dry run
+        found: {rule label: contacts matching the rule}
+    """
+    plan = {
+        'version': PLAN_VERSION,
+        'instance': instance,
+        'created_at': time.time(),
+        'rules': rules,
+        'since': since,
+        'watermark': watermark,
+        'found': found,
+        'groups': [{'rule': label, 'ranks': list(ranks), 'ids': sorted(ids)}
+                   for (label, ranks), ids in sorted(groups.items())],
+    }
+    plan['checksum'] = plan_checksum(plan)
+    return plan
+
+
+def write_plan(path, plan):
+    """Atomically write a plan file (compact JSON - it holds every id)"""
+    write_text_atomic(Path(path), json.dumps(plan, separators=(',', ':')) + '\n', mode=0o600)
+
+
+def load_plan(path):
+    """Read a plan file, raising ValueError if it is not a plan or was modified"""
+    try:
+        with open(path) as f:
+            plan = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path} is not a classification plan: {e}")
+    if not isinstance(plan, dict) or plan.get('version') != PLAN_VERSION or 'groups' not in plan:
+        raise ValueError(f"{path} is not a version {PLAN_VERSION} classification plan")
+    if plan.get('checksum') != plan_checksum(plan):
+        raise ValueError(f"{path} does not match its checksum - it was modified or is incomplete")
+    return plan
+
+
+def plan_check_calls(plan, rules, chunk_size=PLAN_CHECK_CHUNK_SIZE):
+    """
+    search_count calls that recheck a plan on the server, with the count each should return
+
+    A planned contact still counts if its ref still falls under the rule and
+    every rank the plan sets is still 0, so any difference means drift.
+    """
+    by_label = {rule[0]: rule for rule in rules}
+    checks = []
+    for group in plan['groups']:
+        domain = rule_domain(by_label[group['rule']], rules, unclassified_only=False)
+        domain += [[rank_field, 'in', [0, False]] for rank_field in group['ranks']]
+        ids = group['ids']
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            checks.append((('res.partner', 'search_count', [[['id', 'in', chunk]] + domain]), len(chunk)))
+    return checks
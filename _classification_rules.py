@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Contact Classification Rules
+Reference-prefix rules (V* = vendor, C* = customer, ...) read from
+~/.odoo_config/classification_rules.conf and compiled into one matcher and
+one search domain, so every rule is applied in a single scan
+"""
+
+import configparser
+import hashlib
+import json
+import re
+
+from _state import config_dir
+
+RULES_FILENAME = 'classification_rules.conf'
+
+# (label, reference prefixes, rank fields set to 1 on matching contacts) - used when
+# there is no rules file. The longest matching prefix decides a contact's rule.
+DEFAULT_RULES = (
+    ('vendor', ('V',), ('supplier_rank',)),
+    ('customer', ('C',), ('customer_rank',)),
+)
+
+_RANK_FIELD = re.compile(r'^[a-z_][a-z0-9_]*_rank$')
+
+
+def rules_path():
+    """Default rules file, next to the {instance}.conf files"""
+    return config_dir() / RULES_FILENAME
+
+
+def load_rules(path=None):
+    """
+    Read classification rules from an ini file, one section per rule:
+
+        [vendor_customer]
+        prefixes = VC
+        ranks = supplier_rank, customer_rank
+
+    Without path the default rules file is used if it exists, else DEFAULT_RULES.
+    Raises FileNotFoundError for a missing explicit path and ValueError for invalid rules.
+    """
+    if path is None:
+        path = rules_path()
+        if not path.exists():
+            return DEFAULT_RULES
+    elif not path.exists():
+        raise FileNotFoundError(f"Rules file not found: {path}")
+
+    # No interpolation: a '%' in a prefix must reach the wildcard check below
+    config = configparser.ConfigParser(interpolation=None)
+    try:
+        config.read(path)
+    except configparser.Error as e:
+        raise ValueError(f"Invalid rules file {path}: {e}") from e
+
+    rules = []
+    for label in config.sections():
+        prefixes = _split(config.get(label, 'prefixes', fallback=config.get(label, 'prefix', fallback='')))
+        ranks = _split(config.get(label, 'ranks', fallback=''))
+        if not prefixes or not ranks:
+            raise ValueError(f"Rule [{label}] in {path} needs prefixes and ranks")
+        for prefix in prefixes:
+            if '%' in prefix or '_' in prefix:
+                raise ValueError(f"Rule [{label}] in {path}: prefix '{prefix}' contains a like wildcard")
+        for rank_field in ranks:
+            if not _RANK_FIELD.match(rank_field):
+                raise ValueError(f"Rule [{label}] in {path}: '{rank_field}' is not a *_rank field")
+        rules.append((label, prefixes, ranks))
+
+    validate_rules(rules, path)
+    return tuple(rules)
+
+
+def _split(value):
+    return tuple(part.strip() for part in value.split(',') if part.strip())
+
+
+def validate_rules(rules, source='rules'):
+    """Reject an empty rule set and prefixes claimed by more than one rule"""
+    if not rules:
+        raise ValueError(f"No classification rules in {source}")
+    owners = {}
+    for label, prefixes, ranks in rules:
+        for prefix in prefixes:
+            if prefix in owners:
+                raise ValueError(f"Prefix '{prefix}' is used by both [{owners[prefix]}] and [{label}] in {source}")
+            owners[prefix] = label
+
+
+def rank_fields(rules):
+    """All rank fields set by any rule, in rule order"""
+    return list(dict.fromkeys(rank_field for label, prefixes, ranks in rules for rank_field in ranks))
+
+
+def rules_fingerprint(rules):
+    """Short hash of a rule set - a changed rule set invalidates incremental watermarks"""
+    return hashlib.sha256(json.dumps(rules).encode('utf-8')).hexdigest()[:16]
+
+
+def compile_matcher(rules):
+    """
+    Compile rules into a function ref -> rule (or None)
+
+    All prefixes go into one anchored regex alternation, longest first, so a
+    single match picks the most specific rule (VC123 is VC, not V).
+    """
+    by_prefix = {prefix: rule for rule in rules for prefix in rule[1]}
+    pattern = re.compile('|'.join(re.escape(prefix) for prefix in sorted(by_prefix, key=len, reverse=True)))
+
+    def match(ref):
+        found = pattern.match(ref) if ref else None
+        return by_prefix[found.group()] if found else None
+
+    return match
+
+
+def _combine(operator, terms):
+    """Join single-expression domains with a prefix-notation operator"""
+    terms = [term for term in terms if term]
+    return [operator] * (len(terms) - 1) + [leaf for term in terms for leaf in term]
+
+
+def rule_domain(rule, rules, unclassified_only=True):
+    """
+    Domain (a single expression) of the contacts a rule applies to
+
+    Contacts whose ref starts with a longer prefix of another rule are left
+    out, matching compile_matcher. With unclassified_only only contacts still
+    missing at least one of the rule's ranks are matched.
+    """
+    label, prefixes, ranks = rule
+    other_prefixes = [prefix for other in rules if other is not rule for prefix in other[1]]
+    branches = []
+    for prefix in prefixes:
+        longer = [other for other in other_prefixes if other != prefix and other.startswith(prefix)]
+        branches.append(_combine('&', [[['ref', '=like', f'{prefix}%']]]
+                                 + [['!', ['ref', '=like', f'{other}%']] for other in longer]))
+    domain = _combine('|', branches)
+    if unclassified_only:
+        domain = _combine('&', [domain, _combine('|', [[[rank_field, 'in', [0, False]]] for rank_field in ranks])])
+    return domain
+
+
+def classification_domain(rules, unclassified_only=True):
+    """OR of the domains of all rules - everything one scan has to look at"""
+    return _combine('|', [rule_domain(rule, rules, unclassified_only) for rule in rules])
+
+
+def describe_rule(rule):
+    """'V*, VC*' style summary of a rule's prefixes"""
+    return ', '.join(f'{prefix}*' for prefix in rule[1])
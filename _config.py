@@ -1,17 +1,23 @@
 #!/usr/bin/env python3
 """
 Odoo Connection Configuration
-Single configuration module for all Odoo connections via XML-RPC
+Single configuration module for all Odoo connections via XML-RPC (or JSON-RPC)
 """
 
-import xmlrpc.client
 import configparser
 import os
-from pathlib import Path
+
+from _rpc_cassette import cassette_settings, open_cassette
+from _rpc_limiter import DEFAULT_MIN_CONCURRENCY, AdaptiveLimiter
+from _rpc_metrics import configure as configure_metrics, instrument
+from _rpc_transport import (DEFAULT_COMPRESS_THRESHOLD, DEFAULT_IDLE_TIMEOUT, DEFAULT_POOL_SIZE, DEFAULT_PROTOCOL,
+                            get_pool, server_proxy)
+from _session_cache import DEFAULT_SESSION_TTL, invalidate_session, is_access_denied, load_session, save_session
+from _state import config_dir
 
 def get_config(instance_name):
     """Read configuration from ~/.odoo_config/{instance_name}.conf"""
-    config_path = Path.home() / '.odoo_config' / f'{instance_name}.conf'
+    config_path = config_dir() / f'{instance_name}.conf'
     
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
@@ -19,45 +25,161 @@ def get_config(instance_name):
     config = configparser.ConfigParser()
     config.read(config_path)
     
+    cassette = cassette_settings(config.get('odoo', 'cassette', fallback=''),
+                                 config.get('odoo', 'cassette_mode', fallback='replay'),
+                                 config.get('odoo', 'replay_latency', fallback='0'))
+    adaptive_concurrency = config.getboolean('odoo', 'adaptive_concurrency', fallback=False)
+    max_concurrency = config.getint('odoo', 'max_concurrency', fallback=0)
+    
     return {
         'url': config.get('odoo', 'url'),
-        'database': config.get('odoo', 'database'), 
+        # hook_local style configs (read by _odoo_config.OdooConfig) name it db_name
+        'database': config.get('odoo', 'database', fallback=None) or config.get('odoo', 'db_name'),
         'username': config.get('odoo', 'username'),
-        'password': config.get('odoo', 'password')
+        'password': config.get('odoo', 'password'),
+        'protocol': config.get('odoo', 'protocol', fallback=DEFAULT_PROTOCOL).strip().lower(),
+        'pool_size': concurrency_pool_size(config.getint('odoo', 'pool_size', fallback=None),
+                                           adaptive_concurrency, max_concurrency, config_path),
+        'idle_timeout': config.getfloat('odoo', 'idle_timeout', fallback=DEFAULT_IDLE_TIMEOUT),
+        'gzip': config.getboolean('odoo', 'gzip', fallback=True),
+        'compress_threshold': config.getint('odoo', 'compress_threshold', fallback=DEFAULT_COMPRESS_THRESHOLD),
+        'adaptive_concurrency': adaptive_concurrency,
+        'min_concurrency': config.getint('odoo', 'min_concurrency', fallback=DEFAULT_MIN_CONCURRENCY),
+        'max_concurrency': max_concurrency,
+        # Recorded/replayed runs always authenticate, so the cassette holds the login
+        'session_ttl': 0 if cassette else config.getfloat('odoo', 'session_ttl', fallback=DEFAULT_SESSION_TTL),
+        'cassette': cassette,
+        'metrics_file': config.get('odoo', 'metrics_file', fallback=''),
+        'slow_call_ms': config.getfloat('odoo', 'slow_call_ms', fallback=0.0)
     }
 
-def connect_odoo(instance_name):
-    """Connect to Odoo instance and return API objects"""
-    config = get_config(instance_name)
+def get_instance_pool(instance_name, config):
+    """Return the keep-alive connection pool shared by all proxies of an instance"""
+    pool = get_pool(instance_name, config['url'], config['pool_size'], config['idle_timeout'],
+                    accept_gzip=config['gzip'], compress_threshold=config['compress_threshold'])
+    if config['adaptive_concurrency'] and pool.limiter is None:
+        pool.limiter = make_limiter(config['min_concurrency'], config['max_concurrency'], pool.pool_size)
+    if config['cassette'] and pool.cassette is None:
+        pool.cassette = open_cassette(*config['cassette'])
+    return pool
+
+def concurrency_pool_size(pool_size, adaptive_concurrency, max_concurrency, source):
+    """
+    Connections in an instance's pool - pool_size None means not configured
+    
+    Every call in flight holds a connection, so the adaptive limit can never
+    go past the pool: an unset pool_size grows to max_concurrency, an
+    explicit one below it is a config error (ValueError).
+    """
+    if not adaptive_concurrency or not max_concurrency:
+        return pool_size or DEFAULT_POOL_SIZE
+    if pool_size and max_concurrency > pool_size:
+        raise ValueError(f"{source}: max_concurrency = {max_concurrency} exceeds pool_size = {pool_size} "
+                         f"- raise pool_size or leave it unset")
+    return pool_size or max(DEFAULT_POOL_SIZE, max_concurrency)
+
+def make_limiter(min_concurrency, max_concurrency, pool_size):
+    """Build the adaptive limiter for an instance - max_concurrency 0 means pool_size"""
+    return AdaptiveLimiter(min_limit=min_concurrency, max_limit=min(max_concurrency or pool_size, pool_size))
+
+def instance_proxies(instance_name, config):
+    """
+    Return (common, models) proxies that drop the cached session on access denied
     
-    # Setup XML-RPC clients
-    common = xmlrpc.client.ServerProxy(f"{config['url']}/xmlrpc/2/common")
-    models = xmlrpc.client.ServerProxy(f"{config['url']}/xmlrpc/2/object")
+    Every models.execute_kw is timed and sized into _rpc_metrics.metrics.
+    """
+    pool = get_instance_pool(instance_name, config)
+    configure_metrics(config['metrics_file'], config['slow_call_ms'])
     
-    # Authenticate
+    def on_fault(fault):
+        if is_access_denied(fault):
+            invalidate_session(instance_name)
+    
+    common = server_proxy(pool, 'common', config['protocol'], on_fault=on_fault)
+    models = instrument(server_proxy(pool, 'object', config['protocol'], on_fault=on_fault), pool, instance_name)
+    return common, models
+
+def cached_session(instance_name, config):
+    """Return the cached session of an instance if it is still valid"""
+    return load_session(instance_name, config['url'], config['database'], config['username'],
+                        config['password'], ttl=config['session_ttl'])
+
+def authenticate(instance_name, config, common, server_version=None):
+    """Authenticate against the server and cache the uid for later processes"""
     uid = common.authenticate(config['database'], config['username'], config['password'], {})
     
     if not uid:
         raise Exception(f"Authentication failed for {config['username']} on {config['database']}")
     
+    if config['session_ttl'] > 0:
+        save_session(instance_name, config['url'], config['database'], config['username'],
+                     config['password'], uid, server_version)
+    return uid
+
+def connect_odoo(instance_name):
+    """Connect to Odoo instance and return API objects"""
+    config = get_config(instance_name)
+    
+    # Setup XML-RPC (or JSON-RPC) clients on the instance's pooled keep-alive transport
+    common, models = instance_proxies(instance_name, config)
+    
+    # Authenticate, reusing a cached uid from an earlier process when still valid
+    session = cached_session(instance_name, config)
+    if session:
+        uid = session['uid']
+    else:
+        uid = authenticate(instance_name, config, common)
+    
     return models, config['database'], uid, config['password']
 
+def execute_many(models, db, uid, password, calls, max_workers=DEFAULT_POOL_SIZE):
+    """
+    Run independent execute_kw calls concurrently on a pooled models proxy
+    
+    Args:
+        calls: Iterable of (model, method, args) or (model, method, args, kwargs) tuples
+        max_workers: Maximum number of calls in flight at once
+    
+    Returns:
+        List of (result, error) tuples in the order of calls - error is None
+        on success, otherwise the exception raised by that call
+    """
+    calls = [tuple(call) + ({},) * (4 - len(call)) for call in calls]
+    
+    def run(call):
+        model, method, args, kwargs = call
+        try:
+            return models.execute_kw(db, uid, password, model, method, list(args), kwargs or {}), None
+        except Exception as e:
+            return None, e
+    
+    if len(calls) <= 1 or max_workers <= 1:
+        return [run(call) for call in calls]
+    
+    # Imported here: concurrent.futures (and logging) would otherwise weigh on every script's startup
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        return list(executor.map(run, calls))
+
 def test_connection(instance_name):
     """Test connection and return basic info"""
     try:
         config = get_config(instance_name)
-        common = xmlrpc.client.ServerProxy(f"{config['url']}/xmlrpc/2/common")
-        
-        # Test connection
-        version = common.version()
+        common, models = instance_proxies(instance_name, config)
         
-        # Test authentication
-        uid = common.authenticate(config['database'], config['username'], config['password'], {})
-        if not uid:
-            raise Exception("Authentication failed")
+        session = cached_session(instance_name, config)
+        if session and session.get('server_version'):
+            # Cached by a recent run - the user read below still proves the uid works
+            uid, version = session['uid'], session['server_version']
+        else:
+            # Test connection
+            version = common.version().get('server_version', 'unknown')
+            
+            # Test authentication
+            uid = authenticate(instance_name, config, common, version)
         
         # Get user info
-        models = xmlrpc.client.ServerProxy(f"{config['url']}/xmlrpc/2/object")
         user_info = models.execute_kw(
             config['database'], uid, config['password'],
             'res.users', 'read', [uid], {'fields': ['name', 'login']}
@@ -69,7 +191,7 @@ def test_connection(instance_name):
             'user_id': uid,
             'name': user_info['name'],
             'login': user_info['login'],
-            'version': version.get('server_version', 'unknown')
+            'version': version
         }
         
     except Exception as e:
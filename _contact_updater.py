@@ -2,7 +2,8 @@
 """
 Contact Classification Updater Module
 Handles updating contact classification (customer/vendor) in Odoo
-based on reference field patterns (Vxxxx = Vendor, Cxxxx = Customer)
+based on reference field patterns (Vxxxx = Vendor, Cxxxx = Customer,
+or the rules of _classification_rules)
 """
 
 import sys
@@ -11,7 +12,30 @@ from pathlib import Path
 # Add current directory to Python path to import our config
 sys.path.insert(0, str(Path(__file__).parent))
 
-from _config import connect_odoo
+from _classification_plan import plan_check_calls
+from _classification_rules import (DEFAULT_RULES, classification_domain, compile_matcher, describe_rule,
+                                   rank_fields, rule_domain, rules_fingerprint)
+from _config import connect_odoo, execute_many
+from _event_stream import EventStream
+from _partner_scan import DEFAULT_PAGE_SIZE, id_ranges, iter_pages, map_id_ranges
+from _scan_watermark import WATERMARK_CALLS, changed_since_domain, watermark_from
+
+# Contacts written per res.partner.write call in execute mode
+DEFAULT_WRITE_CHUNK_SIZE = 500
+
+# Write chunks in flight at once (each its own transaction on a pooled connection), and
+# how often a failed chunk is retried whole before its contacts are written one by one
+DEFAULT_WRITE_WORKERS = 4
+DEFAULT_WRITE_RETRIES = 1
+
+# Ids checked per search when a rollback looks up which contacts still hold the run's values
+ROLLBACK_SEARCH_CHUNK_SIZE = 5000
+
+# Id ranges per worker process of a sharded scan: smaller ranges are written and checkpointed sooner
+SHARD_RANGES_PER_WORKER = 4
+
+# Fields read for contacts that need an update (plus the rules' rank fields); the rank filter runs on the server
+CONTACT_FIELDS = ['name', 'ref']
 
 
 def find_contacts_by_reference_pattern(models, db, uid, password, pattern):
@@ -40,24 +64,19 @@ def get_contact_details(models, db, uid, password, contact_ids):
         return []
 
 
-def update_contact_classification(models, db, uid, password, contact_id, is_customer=False, is_vendor=False):
+def update_contact_classification(models, db, uid, password, contact_id, is_customer=False, is_vendor=False,
+                                  ranks=()):
     """
     Update contact classification by setting customer_rank and supplier_rank
     
     Args:
-        contact_id: Partner ID
+        contact_id: Partner ID, or a list of IDs to update in one write
         is_customer: Set as customer (customer_rank = 1)
         is_vendor: Set as vendor (supplier_rank = 1)
+        ranks: Further rank fields to set to 1
     """
     try:
-        update_data = {}
-        
-        if is_customer:
-            update_data['customer_rank'] = 1
-        
-        if is_vendor:
-            update_data['supplier_rank'] = 1
-            
+        update_data = classification_values(is_customer, is_vendor, ranks)
         if not update_data:
             return False, "No classification specified"
         
@@ -72,75 +91,502 @@ def update_contact_classification(models, db, uid, password, contact_id, is_cust
         return False, f"Error updating classification: {e}"
 
 
-def classify_contacts_by_reference(models, db, uid, password, dry_run=True):
+def classification_values(is_customer=False, is_vendor=False, ranks=()):
+    """Values of a classification write: 1 for every rank to set"""
+    update_data = {}
+    if is_customer:
+        update_data['customer_rank'] = 1
+    if is_vendor:
+        update_data['supplier_rank'] = 1
+    for rank_field in ranks:
+        update_data[rank_field] = 1
+    return update_data
+
+
+def dispatch_writes(models, db, uid, password, ids, values, chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+                    max_workers=DEFAULT_WRITE_WORKERS, retries=DEFAULT_WRITE_RETRIES, model='res.partner'):
+    """
+    Write the same values to many records, one write per chunk of ids
+    
+    Chunks are sent max_workers at a time over the instance's connection
+    pool, so each is a short transaction of its own rather than one long
+    write holding locks and serialising recomputes. Chunks that fail (lock
+    timeouts, serialization failures) are retried together up to retries
+    times.
+    
+    Returns:
+        List of (chunk ids, success, message) in the order of ids
+    """
+    chunk_size = max(1, int(chunk_size))
+    chunks = [ids[start:start + chunk_size] for start in range(0, len(ids), chunk_size)]
+    outcomes = [None] * len(chunks)
+    todo = list(range(len(chunks)))
+    for attempt in range(retries + 1):
+        calls = [(model, 'write', [list(chunks[index]), values]) for index in todo]
+        failed = []
+        for index, (result, error) in zip(todo, execute_many(models, db, uid, password, calls, max_workers)):
+            if error is None and result:
+                outcomes[index] = (chunks[index], True, "Success")
+            else:
+                outcomes[index] = (chunks[index], False,
+                                   f"Error updating classification: {error}" if error else "Write returned False")
+                failed.append(index)
+        todo = failed
+        if not todo:
+            break
+    return outcomes
+
+
+def update_contacts_in_chunks(models, db, uid, password, contacts, chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+                             is_customer=False, is_vendor=False, ranks=(), max_workers=1,
+                             retries=DEFAULT_WRITE_RETRIES):
+    """
+    Set the classification of many contacts with one write per chunk of ids
+    
+    Yields (contact, success, message) for every contact, in order. Chunks
+    are written max_workers at a time (see dispatch_writes). When a chunk's
+    write still fails after its retries its contacts are written one by one,
+    so only the contacts that really fail are reported as errors.
+    """
+    update_data = classification_values(is_customer, is_vendor, ranks)
+    if not update_data:
+        for contact in contacts:
+            yield contact, False, "No classification specified"
+        return
+    
+    chunk_size = max(1, int(chunk_size))
+    outcomes = dispatch_writes(models, db, uid, password, [contact['id'] for contact in contacts], update_data,
+                               chunk_size, max_workers, retries)
+    for start, (ids, success, message) in zip(range(0, len(contacts), chunk_size), outcomes):
+        chunk = contacts[start:start + chunk_size]
+        if success or len(chunk) == 1:
+            for contact in chunk:
+                yield contact, bool(success), message
+            continue
+        
+        for contact in chunk:
+            success, message = update_contact_classification(
+                models, db, uid, password, contact['id'], is_customer=is_customer, is_vendor=is_vendor,
+                ranks=ranks
+            )
+            yield contact, bool(success), message
+
+
+def classify_contacts_by_reference(models, db, uid, password, dry_run=True, chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+                                   preview=False, page_size=DEFAULT_PAGE_SIZE, since=None, rules=DEFAULT_RULES,
+                                   journal=None, events=None, plan=None, write_workers=DEFAULT_WRITE_WORKERS,
+                                   shards=1, instance=None):
     """
     Classify all contacts based on reference field patterns
-    V* = Vendor, C* = Customer
+    V* = Vendor, C* = Customer by default, or the given rules
     
     Args:
-        dry_run: If True, only show what would be updated without making changes
+        dry_run: If True, only count (or with preview, list) what would be updated without making changes
+        chunk_size: Contacts updated per write call in execute mode
+        preview: In a dry run, read and list the contacts that would be updated
+        page_size: Contacts read per search_read page
+        since: Watermark of the last successful run (see _scan_watermark), or None for a full scan
+        rules: Classification rules (see _classification_rules.load_rules)
+        journal: RunJournal of an execute run (resumed if it has a checkpoint), or None
+        events: EventStream to report to; by default one line per contact is printed
+        plan: Dict a dry run fills with {(rule label, missing ranks): [ids]}, or None
+        write_workers: Write chunks sent concurrently (see dispatch_writes)
+        shards: Worker processes scanning id ranges of the table at once (see _sharded_classification)
+        instance: Instance name the shard workers connect to (required with shards)
+    
+    Returns:
+        Dict with '{label}s_found', '_already', '_to_update' and '_updated'
+        counts per rule label (results['rules'] lists the labels), 'errors',
+        'watermark' (taken before scanning) and 'completed' (False if the run was interrupted)
     """
-    results = {
-        'vendors_found': 0,
-        'customers_found': 0,
-        'vendors_updated': 0,
-        'customers_updated': 0,
-        'errors': []
-    }
+    results = {'rules': [label for label, prefixes, ranks in rules]}
+    for label in results['rules']:
+        for count in ('found', 'already', 'to_update', 'updated'):
+            results[f'{label}s_{count}'] = 0
+    results['errors'] = []
+    results['watermark'] = None
+    results['completed'] = False
+    if events is None:
+        events = EventStream(echo=True)
     
     try:
-        # Find vendor contacts (V*)
-        vendor_ids = find_contacts_by_reference_pattern(models, db, uid, password, 'V%')
-        vendor_contacts = get_contact_details(models, db, uid, password, vendor_ids)
-        results['vendors_found'] = len(vendor_contacts)
+        counts_only = dry_run and not preview and plan is None
+        window = changed_since_domain(since)
+        scan_domain = classification_domain(rules) + list(window)
         
-        print(f"Found {len(vendor_contacts)} contacts with vendor reference pattern (V*)")
+        # The new watermark, contacts per rule in scope (and, for count-only dry runs, the ones
+        # needing an update) in one round trip; taken before scanning, so partners
+        # changed during this run are examined again next time
+        calls = list(WATERMARK_CALLS)
+        calls += [('res.partner', 'search_count', [rule_domain(rule, rules, unclassified_only=False) + window])
+                  for rule in rules]
+        if counts_only:
+            calls += [('res.partner', 'search_count', [rule_domain(rule, rules) + window]) for rule in rules]
+        else:
+            # Progress total: what the scan will read, after a resumed run's checkpoint
+            start_id = journal.checkpoint_id if journal is not None else 0
+            calls.append(('res.partner', 'search_count', [scan_domain + [['id', '>', start_id]]]))
+        counts = []
+        for count, error in execute_many(models, db, uid, password, calls):
+            if error is not None:
+                raise error
+            counts.append(count)
+        results['watermark'] = watermark_from(*counts[:len(WATERMARK_CALLS)])
+        results['watermark']['rules'] = rules_fingerprint(rules)
+        if journal is not None:
+            journal.record_watermark(results['watermark'])
+            results['watermark'] = journal.watermark
+        counts = counts[len(WATERMARK_CALLS):]
+        if since:
+            events.info(f"🕒 Incremental run: partners changed since {since.get('write_date')} "
+                  f"or created after id {since.get('id', 0)}")
         
-        for contact in vendor_contacts:
-            if contact['supplier_rank'] == 0:  # Not yet classified as vendor
-                if not dry_run:
-                    success, message = update_contact_classification(
-                        models, db, uid, password, contact['id'], is_vendor=True
-                    )
-                    if success:
-                        results['vendors_updated'] += 1
-                        print(f"✅ Updated vendor: {contact['name']} ({contact['ref']})")
-                    else:
-                        results['errors'].append(f"Vendor {contact['name']}: {message}")
-                        print(f"❌ Failed vendor: {contact['name']} - {message}")
-                else:
-                    results['vendors_updated'] += 1
-                    print(f"🔍 Would update vendor: {contact['name']} ({contact['ref']})")
-            else:
-                print(f"⏭️  Already vendor: {contact['name']} ({contact['ref']})")
+        for index, rule in enumerate(rules):
+            results[f'{rule[0]}s_found'] = counts[index]
+            events.info(f"Found {counts[index]} {'changed ' if since else ''}contacts with {rule[0]} reference "
+                        f"pattern ({describe_rule(rule)})")
         
-        # Find customer contacts (C*)
-        customer_ids = find_contacts_by_reference_pattern(models, db, uid, password, 'C%')
-        customer_contacts = get_contact_details(models, db, uid, password, customer_ids)
-        results['customers_found'] = len(customer_contacts)
+        if counts_only:
+            for index, (label, prefixes, ranks) in enumerate(rules):
+                results[f'{label}s_to_update'] = counts[len(rules) + index]
+                results[f'{label}s_updated'] = results[f'{label}s_to_update']
+        elif shards > 1:
+            _sharded_classification(models, db, uid, password, results, rules, dry_run, chunk_size, page_size,
+                                    scan_domain, counts[-1], journal, events, plan, write_workers, shards, instance)
+        else:
+            _stream_classification(models, db, uid, password, results, rules, dry_run, chunk_size, page_size,
+                                   scan_domain, counts[-1], journal, events, plan, write_workers)
         
-        print(f"Found {len(customer_contacts)} contacts with customer reference pattern (C*)")
+        for label, prefixes, ranks in rules:
+            plural = f"{label}s"
+            results[f'{plural}_already'] = results[f'{plural}_found'] - results[f'{plural}_to_update']
+            events.info(f"⏭️  Already {label}: {results[f'{plural}_already']}, "
+                  f"needs update: {results[f'{plural}_to_update']}")
+            if counts_only and results[f'{plural}_to_update']:
+                events.info(f"🔍 Would update {results[f'{plural}_to_update']} {plural}")
+        results['completed'] = True
+                
+    except Exception as e:
+        results['errors'].append(f"General error: {e}")
+        events.error(f"❌ Error during classification: {e}")
+    finally:
+        events.flush()
+    
+    return results
+
+
+def _stream_classification(models, db, uid, password, results, rules, dry_run, chunk_size, page_size, domain, total,
+                           journal, events, plan=None, write_workers=1):
+    """
+    Page through the contacts missing a rank under any rule in one scan,
+    listing or updating them
+    
+    Each rule keeps its own update set: contacts grouped by the ranks they
+    are missing, written a chunk at a time. With a journal, a batch still
+    pending after a whole page is written at the end of the next one, so the
+    checkpoint (everything up to it handled) trails the scan by at most a page.
+    It never passes a contact whose write failed, so a resume retries it.
+    Progress is reported per page against total, the count of domain.
+    """
+    match = compile_matcher(rules)
+    pending = {label: {} for label, prefixes, ranks in rules}  # label -> {missing ranks: [contacts]}
+    fields = _scan_fields(rules)
+    start_id = journal.checkpoint_id if journal is not None else 0
+    applied_ids = journal.applied_ids if journal is not None else ()
+    if start_id or applied_ids:
+        events.info(f"⏩ Resuming after id {start_id}, {len(applied_ids)} contacts already applied")
+    
+    previous_page_end = start_id
+    first_failed = None
+    scanned = 0
+    for page in iter_pages(models, db, uid, password, domain, fields, page_size, start_id=start_id):
+        for contact in page:
+            rule = match(contact['ref'])
+            if rule is None or contact['id'] in applied_ids:
+                continue
+            label, prefixes, ranks = rule
+            missing = _missing_ranks(contact, ranks)
+            if not missing:
+                continue
+            results[f'{label}s_to_update'] += 1
+            
+            if dry_run:
+                results[f'{label}s_updated'] += 1
+                events.contact(contact, label, missing, 'would_update')
+                if plan is not None:
+                    plan.setdefault((label, missing), []).append(contact['id'])
+                continue
+            
+            # Written while the scan goes on: the id cursor is already past these contacts
+            batch = pending[label].setdefault(missing, [])
+            batch.append(contact)
+            if len(batch) >= chunk_size * write_workers:
+                failed = _write_pending(models, db, uid, password, results, label, missing, batch, chunk_size,
+                                        journal, events, write_workers)
+                first_failed = min([first_failed or failed[0]] + failed) if failed else first_failed
+                del pending[label][missing]
+        scanned += len(page)
+        events.progress(scanned, total)
         
-        for contact in customer_contacts:
-            if contact['customer_rank'] == 0:  # Not yet classified as customer
-                if not dry_run:
-                    success, message = update_contact_classification(
-                        models, db, uid, password, contact['id'], is_customer=True
-                    )
-                    if success:
-                        results['customers_updated'] += 1
-                        print(f"✅ Updated customer: {contact['name']} ({contact['ref']})")
-                    else:
-                        results['errors'].append(f"Customer {contact['name']}: {message}")
-                        print(f"❌ Failed customer: {contact['name']} - {message}")
+        if journal is None:
+            continue
+        for label, batches in pending.items():
+            for missing in [missing for missing, batch in batches.items() if batch[0]['id'] <= previous_page_end]:
+                failed = _write_pending(models, db, uid, password, results, label, missing, batches.pop(missing),
+                                        chunk_size, journal, events, write_workers)
+                first_failed = min([first_failed or failed[0]] + failed) if failed else first_failed
+        previous_page_end = page[-1]['id']
+        unhandled = [batch[0]['id'] for batches in pending.values() for batch in batches.values()]
+        unhandled += [first_failed] if first_failed else []
+        journal.checkpoint(min(unhandled) - 1 if unhandled else previous_page_end)
+    
+    for label, batches in pending.items():
+        for missing, batch in batches.items():
+            _write_pending(models, db, uid, password, results, label, missing, batch, chunk_size, journal, events,
+                           write_workers)
+
+
+def _scan_fields(rules):
+    """Fields a classification scan reads"""
+    # Single-rank rules are filtered on that rank by the server; only multi-rank rules need the ranks read
+    return CONTACT_FIELDS + rank_fields([rule for rule in rules if len(rule[2]) > 1])
+
+
+def _missing_ranks(contact, ranks):
+    """Ranks of a rule the contact still lacks (a single rank was already checked by the server)"""
+    return tuple(rank_field for rank_field in ranks if len(ranks) == 1 or not contact.get(rank_field))
+
+
+def _sharded_classification(models, db, uid, password, results, rules, dry_run, chunk_size, page_size, domain,
+                            total, journal, events, plan, write_workers, shards, instance):
+    """
+    Scan id ranges of the table in worker processes, listing or updating each range's matches as it comes in
+    
+    Decoding pages and matching rules is client CPU work, so a single
+    process caps the scan on large tables; each worker (see _scan_shard) has
+    its own connection and core. The table is cut into
+    SHARD_RANGES_PER_WORKER ranges per worker; ranges are taken in id order
+    and their matches written from here, journaled per batch, followed by a
+    checkpoint at the range's end - or just before its first failed write,
+    after which the checkpoint no longer moves, so a resume retries it.
+    """
+    if not instance:
+        raise ValueError("A sharded scan needs the instance name its workers connect to")
+    start_id = journal.checkpoint_id if journal is not None else 0
+    applied_ids = journal.applied_ids if journal is not None else ()
+    if start_id or applied_ids:
+        events.info(f"⏩ Resuming after id {start_id}, {len(applied_ids)} contacts already applied")
+    ranges = id_ranges(models, db, uid, password, domain, shards * SHARD_RANGES_PER_WORKER, start_id=start_id)
+    events.info(f"🧩 Scanning {len(ranges)} id ranges in {min(shards, len(ranges))} worker processes")
+    
+    scanned = 0
+    first_failed = None
+    outcomes = map_id_ranges(_scan_shard, ranges, instance, domain, _scan_fields(rules), page_size, rules,
+                             workers=shards)
+    for (range_start, range_end), (range_scanned, groups) in zip(ranges, outcomes):
+        scanned += range_scanned
+        for (label, missing), matches in groups.items():
+            contacts = [{'id': contact_id, 'name': name, 'ref': ref} for contact_id, name, ref in matches
+                        if contact_id not in applied_ids]
+            results[f'{label}s_to_update'] += len(contacts)
+            if dry_run:
+                results[f'{label}s_updated'] += len(contacts)
+                for contact in contacts:
+                    events.contact(contact, label, missing, 'would_update')
+                if plan is not None:
+                    plan.setdefault((label, missing), []).extend(contact['id'] for contact in contacts)
+                continue
+            
+            batch_size = chunk_size * write_workers
+            for start in range(0, len(contacts), batch_size):
+                failed = _write_pending(models, db, uid, password, results, label, missing,
+                                        contacts[start:start + batch_size], chunk_size, journal, events, write_workers)
+                first_failed = min([first_failed or failed[0]] + failed) if failed else first_failed
+        events.progress(scanned, total)
+        if journal is not None:
+            journal.checkpoint(first_failed - 1 if first_failed else range_end)
+
+
+def _scan_shard(start_id, end_id, instance, domain, fields, page_size, rules):
+    """
+    Worker process of a sharded scan: read ids start_id < id <= end_id on a connection of its own
+    
+    Returns:
+        (records scanned, {(rule label, missing ranks): [(id, name, ref)]})
+    """
+    models, db, uid, password = connect_odoo(instance)
+    match = compile_matcher(rules)
+    scanned = 0
+    groups = {}
+    for page in iter_pages(models, db, uid, password, domain, fields, page_size, start_id=start_id, end_id=end_id):
+        scanned += len(page)
+        for contact in page:
+            rule = match(contact['ref'])
+            if rule is None:
+                continue
+            missing = _missing_ranks(contact, rule[2])
+            if missing:
+                groups.setdefault((rule[0], missing), []).append((contact['id'], contact['name'], contact['ref']))
+    return scanned, groups
+
+
+def _write_pending(models, db, uid, password, results, label, ranks, contacts, chunk_size, journal, events,
+                   write_workers=1):
+    """Set a rule's missing ranks on a batch of contacts, record the outcome per contact and return the failed ids"""
+    if journal is not None:
+        # Missing ranks are 0 or empty, both stored as 0; recorded before the write so a rollback sees it
+        batch = journal.record_previous(label, [contact['id'] for contact in contacts],
+                                        {rank_field: 0 for rank_field in ranks},
+                                        {rank_field: 1 for rank_field in ranks})
+    failed = []
+    for contact, success, message in update_contacts_in_chunks(models, db, uid, password, contacts, chunk_size,
+                                                               ranks=ranks, max_workers=write_workers):
+        if success:
+            results[f'{label}s_updated'] += 1
+            events.contact(contact, label, ranks, 'updated')
+        else:
+            failed.append(contact['id'])
+            results['errors'].append(f"{label.capitalize()} {contact.get('name', contact['id'])}: {message}")
+            events.contact(contact, label, ranks, 'failed', message)
+    if journal is not None:
+        journal.record_batch(batch, failed)
+    return failed
+
+
+def apply_classification_plan(models, db, uid, password, plan, rules, chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+                              journal=None, events=None, write_workers=DEFAULT_WRITE_WORKERS):
+    """
+    Write the ranks of a dry run's plan (see _classification_plan) without reading the contacts
+    
+    A handful of concurrent search_count calls first check that every
+    planned contact still matches its rule and still misses the planned
+    ranks; if any does not, nothing is written and the dry run has to be
+    repeated. Each group is written in chunks as in a normal run,
+    write_workers at a time, and journaled the same way, so a plan run can
+    be resumed and rolled back.
+    
+    Returns:
+        Dict shaped like classify_contacts_by_reference's, plus 'drifted'
+        (planned contacts that no longer match)
+    """
+    results = {'rules': [label for label, prefixes, ranks in rules]}
+    for label in results['rules']:
+        results[f'{label}s_found'] = plan['found'].get(label, 0)
+        results[f'{label}s_to_update'] = sum(len(group['ids']) for group in plan['groups'] if group['rule'] == label)
+        results[f'{label}s_already'] = results[f'{label}s_found'] - results[f'{label}s_to_update']
+        results[f'{label}s_updated'] = 0
+    results['errors'] = []
+    results['watermark'] = plan['watermark']
+    results['completed'] = False
+    results['drifted'] = 0
+    if events is None:
+        events = EventStream(echo=True)
+    if journal is not None:
+        journal.record_watermark(plan['watermark'])
+    
+    try:
+        checks = plan_check_calls(plan, rules)
+        answers = execute_many(models, db, uid, password, [call for call, expected in checks])
+        for (call, expected), (count, error) in zip(checks, answers):
+            if error is not None:
+                raise error
+            results['drifted'] += expected - count
+        planned = sum(len(group['ids']) for group in plan['groups'])
+        if results['drifted']:
+            results['errors'].append(f"Plan is stale: {results['drifted']} of {planned} planned contacts "
+                                     f"changed since the dry run - run it again")
+            events.error(f"❌ {results['errors'][-1]}")
+            return results
+        events.info(f"✅ Plan checked in {len(checks)} requests: all {planned} contacts unchanged")
+        
+        done = 0
+        for group in plan['groups']:
+            batch_size = chunk_size * write_workers
+            for start in range(0, len(group['ids']), batch_size):
+                contacts = [{'id': contact_id} for contact_id in group['ids'][start:start + batch_size]]
+                _write_pending(models, db, uid, password, results, group['rule'], tuple(group['ranks']), contacts,
+                               chunk_size, journal, events, write_workers)
+                done += len(contacts)
+                events.progress(done, planned)
+        results['completed'] = True
+    except Exception as e:
+        results['errors'].append(f"General error: {e}")
+        events.error(f"❌ Error applying the plan: {e}")
+    finally:
+        events.flush()
+    
+    return results
+
+
+def rollback_classification(models, db, uid, password, changes, dry_run=True, chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+                            search_chunk_size=ROLLBACK_SEARCH_CHUNK_SIZE, write_workers=DEFAULT_WRITE_WORKERS,
+                            events=None):
+    """
+    Restore the rank values a classification run replaced
+    
+    The run's write batches are regrouped per (rank field, value set,
+    previous value), so a rollback sends a few large writes instead of one
+    per original batch. Only contacts still holding the value the run set
+    are restored - ranks changed since (e.g. by a new sales order) are left
+    alone, which also makes a repeated rollback harmless. Lookups and
+    writes of a group are sent concurrently.
+    
+    Args:
+        changes: (ids, previous {rank: value}, assigned {rank: value}) per
+            write batch, as recorded in the run journal
+        dry_run: If True, only count what would be restored
+        chunk_size: Contacts restored per write call
+        search_chunk_size: Ids checked per search call
+        write_workers: Restore writes sent concurrently (see dispatch_writes)
+        events: EventStream getting status lines and a 'restore_ranks' event per contact
+    
+    Returns:
+        Dict with 'recorded', 'restorable', 'changed_since' and 'restored'
+        counts (of rank values) and 'errors'
+    """
+    results = {'recorded': 0, 'restorable': 0, 'changed_since': 0, 'restored': 0, 'errors': []}
+    if events is None:
+        events = EventStream()
+    groups = {}
+    for ids, previous, assigned in changes:
+        for rank_field, value in assigned.items():
+            groups.setdefault((rank_field, value, previous.get(rank_field, 0)), set()).update(ids)
+    
+    try:
+        for (rank_field, value, previous), ids in groups.items():
+            ids = sorted(ids)
+            results['recorded'] += len(ids)
+            searches = [('res.partner', 'search', [[['id', 'in', ids[start:start + search_chunk_size]],
+                                                    [rank_field, '=', value]]], {'order': 'id'})
+                        for start in range(0, len(ids), search_chunk_size)]
+            current = []
+            for found, error in execute_many(models, db, uid, password, searches):
+                if error is not None:
+                    raise error
+                current += found
+            results['restorable'] += len(current)
+            results['changed_since'] += len(ids) - len(current)
+            events.info(f"↩️  {rank_field}: {len(current)} of {len(ids)} contacts still at {value}, "
+                        f"{'would restore' if dry_run else 'restoring'} {previous}")
+            if dry_run:
+                for contact_id in current:
+                    events.contact({'id': contact_id}, None, (rank_field,), 'would_restore', action='restore_ranks')
+                continue
+            
+            for chunk, success, message in dispatch_writes(models, db, uid, password, current, {rank_field: previous},
+                                                           chunk_size, write_workers):
+                if success:
+                    results['restored'] += len(chunk)
                 else:
-                    results['customers_updated'] += 1
-                    print(f"🔍 Would update customer: {contact['name']} ({contact['ref']})")
-            else:
-                print(f"⏭️  Already customer: {contact['name']} ({contact['ref']})")
-                
+                    results['errors'].append(f"{rank_field} of ids {chunk[0]}-{chunk[-1]}: {message}")
+                    events.error(f"❌ Failed to restore {rank_field} of {len(chunk)} contacts: {message}")
+                for contact_id in chunk:
+                    events.contact({'id': contact_id}, None, (rank_field,), 'restored' if success else 'failed',
+                                   None if success else message, action='restore_ranks')
     except Exception as e:
         results['errors'].append(f"General error: {e}")
-        print(f"❌ Error during classification: {e}")
+        events.error(f"❌ Error during rollback: {e}")
+    finally:
+        events.flush()
     
     return results
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Classification Event Stream
+Per-contact outcomes as buffered JSON lines in a file, a live progress line
+with throughput and ETA, and status messages that --quiet can silence
+"""
+
+import json
+import sys
+import time
+
+# Seconds between flushes of the events file and redraws of the progress line
+FLUSH_INTERVAL = 1.0
+PROGRESS_INTERVAL = 0.2
+
+
+class EventStream:
+    """
+    Where a classification run reports to
+
+    Args:
+        path: JSON-lines file receiving one event per contact (id, ref, rule,
+            action, ranks, outcome, error), or None
+        echo: Also print one line per contact (the pre-event-stream output)
+        progress: Redraw a one-line progress display on stderr
+        quiet: Drop status messages; only the caller's summary remains
+        instance: Added to every event when set
+    """
+
+    def __init__(self, path=None, echo=False, progress=False, quiet=False, instance=None):
+        self.path = path
+        self.echo = echo and not quiet
+        self.show_progress = progress and not quiet
+        self.quiet = quiet
+        self.instance = instance
+        self.events = 0
+        self._file = open(path, 'a', encoding='utf-8', buffering=1 << 20) if path else None
+        self._flushed_at = time.monotonic()
+        self._started_at = None
+        self._drawn_at = 0.0
+        self._line_width = 0
+
+    def info(self, message):
+        """Status message (counts, resume notes) - not shown with quiet"""
+        if not self.quiet:
+            self._clear_progress()
+            print(message)
+
+    def error(self, message):
+        """Error message - shown even with quiet"""
+        self._clear_progress()
+        print(message)
+
+    def contact(self, contact, rule, ranks, outcome, error=None, action='set_ranks'):
+        """
+        One contact's outcome: 'would_update' (dry run), 'updated' or 'failed';
+        for action 'restore_ranks' (a rollback) 'would_restore', 'restored' or 'failed'
+        """
+        if self._file is not None:
+            event = {'id': contact['id'], 'ref': contact.get('ref'), 'rule': rule, 'action': action,
+                     'ranks': list(ranks), 'outcome': outcome}
+            if error:
+                event['error'] = str(error)
+            if self.instance:
+                event['instance'] = self.instance
+            self._file.write(json.dumps(event, separators=(',', ':')) + '\n')
+            self.events += 1
+            if time.monotonic() - self._flushed_at >= FLUSH_INTERVAL:
+                self.flush()
+        if self.echo and action == 'set_ranks':
+            self._clear_progress()
+            name = contact.get('name', f"id {contact['id']}")
+            shown = f"{name} ({contact['ref']})" if contact.get('ref') else name
+            if outcome == 'would_update':
+                print(f"🔍 Would update {rule}: {shown}")
+            elif outcome == 'updated':
+                print(f"✅ Updated {rule}: {shown}")
+            else:
+                print(f"❌ Failed {rule}: {name} - {error}")
+
+    def progress(self, done, total):
+        """Redraw 'done/total, rate, ETA' (at most every PROGRESS_INTERVAL seconds)"""
+        now = time.monotonic()
+        if self._started_at is None:
+            self._started_at = now
+        if not self.show_progress or (now - self._drawn_at < PROGRESS_INTERVAL and done < total):
+            return
+        self._drawn_at = now
+        elapsed = now - self._started_at
+        rate = done / elapsed if elapsed > 0 else 0.0
+        line = f"⏳ {done:,}/{total:,} contacts"
+        if total:
+            line += f" ({min(done / total, 1.0):.0%})"
+        line += f" · {rate:,.0f}/s"
+        if rate and total > done:
+            line += f" · ETA {_duration((total - done) / rate)}"
+        sys.stderr.write('\r' + line.ljust(self._line_width))
+        sys.stderr.flush()
+        self._line_width = len(line)
+
+    def _clear_progress(self):
+        if self._line_width:
+            sys.stderr.write('\r' + ' ' * self._line_width + '\r')
+            sys.stderr.flush()
+            self._line_width = 0
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        self._clear_progress()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _duration(seconds):
+    """'42s' / '3m05s' / '1h02m'"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+def events_path(path, instance, instances):
+    """Events file of one instance - suffixed with the instance name when several run at once"""
+    if not path or len(instances) <= 1:
+        return path
+    path = str(path)
+    stem, dot, suffix = path.rpartition('.')
+    return f"{stem}.{instance}.{suffix}" if dot and '/' not in suffix else f"{path}.{instance}"
@@ -5,17 +5,25 @@ Reads from ~/.odoo_config/{env}.conf files and provides XML-RPC connections
 Compatible with classify_contacts.py pattern
 """
 
-import xmlrpc.client
 import configparser
 import os
-from pathlib import Path
+import threading
+
+from _config import concurrency_pool_size, execute_many, make_limiter
+from _rpc_cassette import cassette_settings, open_cassette
+from _rpc_limiter import DEFAULT_MIN_CONCURRENCY
+from _rpc_metrics import configure as configure_metrics, instrument, metrics
+from _rpc_transport import (DEFAULT_COMPRESS_THRESHOLD, DEFAULT_IDLE_TIMEOUT, DEFAULT_POOL_SIZE, DEFAULT_PROTOCOL,
+                            get_pool, server_proxy)
+from _session_cache import DEFAULT_SESSION_TTL, invalidate_session, is_access_denied, load_session, save_session
+from _state import config_dir
 
 class OdooConfig:
     """Odoo configuration management - reads from ~/.odoo_config/ files"""
     
     def __init__(self, env_name="hook_local"):
         self.env_name = env_name
-        self.config_dir = Path.home() / ".odoo_config"
+        self.config_dir = config_dir()
         self.config_file = self.config_dir / f"{env_name}.conf"
         
         # Default values
@@ -23,11 +31,24 @@ class OdooConfig:
         self.db_name = env_name
         self.username = "admin"
         self.password = "admin"
+        self.pool_size = DEFAULT_POOL_SIZE
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.protocol = DEFAULT_PROTOCOL
+        self.gzip = True
+        self.compress_threshold = DEFAULT_COMPRESS_THRESHOLD
+        self.adaptive_concurrency = False
+        self.min_concurrency = DEFAULT_MIN_CONCURRENCY
+        self.max_concurrency = 0
+        self.session_ttl = DEFAULT_SESSION_TTL
+        self.metrics_file = ''
+        self.slow_call_ms = 0.0
+        self.cassette = cassette_settings()
         
         # XML-RPC connection
         self.uid = None
         self.common = None
         self.models = None
+        self.pool = None
         
         # Load configuration and setup
         self.load_config()
@@ -45,6 +66,7 @@ class OdooConfig:
             print(f"password = {self.password}")
             return
         
+        pool_size = None
         try:
             config = configparser.ConfigParser()
             config.read(self.config_file)
@@ -55,33 +77,83 @@ class OdooConfig:
                 self.db_name = odoo_section.get('db_name', self.db_name)
                 self.username = odoo_section.get('username', self.username)
                 self.password = odoo_section.get('password', self.password)
+                pool_size = odoo_section.getint('pool_size', None)
+                self.idle_timeout = odoo_section.getfloat('idle_timeout', self.idle_timeout)
+                self.protocol = odoo_section.get('protocol', self.protocol).strip().lower()
+                self.gzip = odoo_section.getboolean('gzip', self.gzip)
+                self.compress_threshold = odoo_section.getint('compress_threshold', self.compress_threshold)
+                self.adaptive_concurrency = odoo_section.getboolean('adaptive_concurrency', self.adaptive_concurrency)
+                self.min_concurrency = odoo_section.getint('min_concurrency', self.min_concurrency)
+                self.max_concurrency = odoo_section.getint('max_concurrency', self.max_concurrency)
+                self.session_ttl = odoo_section.getfloat('session_ttl', self.session_ttl)
+                self.metrics_file = odoo_section.get('metrics_file', self.metrics_file)
+                self.slow_call_ms = odoo_section.getfloat('slow_call_ms', self.slow_call_ms)
+                self.cassette = cassette_settings(odoo_section.get('cassette', ''),
+                                                  odoo_section.get('cassette_mode', 'replay'),
+                                                  odoo_section.get('replay_latency', '0'))
             
             print(f"✓ Loaded configuration from {self.config_file}")
             print(f"  URL: {self.url}")
             print(f"  Database: {self.db_name}")
             print(f"  Username: {self.username}")
+            if self.protocol != DEFAULT_PROTOCOL:
+                print(f"  Protocol: {self.protocol}")
             
         except Exception as e:
             print(f"Error reading config file: {e}")
+        
+        # Raised, not printed: falling back to the default pool would silently cap max_concurrency
+        self.pool_size = concurrency_pool_size(pool_size, self.adaptive_concurrency, self.max_concurrency,
+                                               self.config_file)
     
     def setup_xmlrpc(self):
-        """Setup XML-RPC clients"""
+        """Setup XML-RPC (or JSON-RPC) clients on a pooled keep-alive transport"""
         try:
-            self.common = xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/common')
-            self.models = xmlrpc.client.ServerProxy(f'{self.url}/xmlrpc/2/object')
+            self.pool = get_pool(self.env_name, self.url, self.pool_size, self.idle_timeout,
+                                 accept_gzip=self.gzip, compress_threshold=self.compress_threshold)
+            if self.adaptive_concurrency and self.pool.limiter is None:
+                self.pool.limiter = make_limiter(self.min_concurrency, self.max_concurrency, self.pool_size)
+            if self.cassette:
+                if self.pool.cassette is None:
+                    self.pool.cassette = open_cassette(*self.cassette)
+                # Recorded/replayed runs always authenticate, so the cassette holds the login
+                self.session_ttl = 0
+            self.common = server_proxy(self.pool, 'common', self.protocol, on_fault=self._on_fault)
+            self.models = instrument(server_proxy(self.pool, 'object', self.protocol, on_fault=self._on_fault),
+                                     self.pool, self.env_name)
+            configure_metrics(self.metrics_file, self.slow_call_ms)
         except Exception as e:
             print(f"Error setting up XML-RPC: {e}")
     
-    def authenticate(self):
-        """Authenticate with Odoo"""
+    def _on_fault(self, fault):
+        """Drop the cached session when the server no longer accepts it"""
+        if is_access_denied(fault):
+            invalidate_session(self.env_name)
+            self.uid = None
+    
+    def _cached_session(self):
+        return load_session(self.env_name, self.url, self.db_name, self.username, self.password,
+                            ttl=self.session_ttl)
+    
+    def authenticate(self, server_version=None):
+        """Authenticate with Odoo, reusing a cached session from an earlier run"""
         if not self.common:
             print("✗ XML-RPC not initialized")
             return False
+        
+        session = self._cached_session()
+        if session and (server_version is None or session.get('server_version')):
+            self.uid = session['uid']
+            print(f"✓ Authenticated as {self.username} (UID: {self.uid}, cached session)")
+            return True
             
         try:
             self.uid = self.common.authenticate(self.db_name, self.username, self.password, {})
             if self.uid:
                 print(f"✓ Authenticated as {self.username} (UID: {self.uid})")
+                if self.session_ttl > 0:
+                    save_session(self.env_name, self.url, self.db_name, self.username, self.password,
+                                 self.uid, server_version)
                 return True
             else:
                 print("✗ Authentication failed")
@@ -94,11 +166,16 @@ class OdooConfig:
         """Test Odoo connection and authentication"""
         try:
             # Test connection
-            version = self.common.version()
-            print(f"✓ Connected to Odoo {version.get('server_version', 'unknown')}")
+            session = self._cached_session()
+            if session and session.get('server_version'):
+                server_version = session['server_version']
+                print(f"✓ Connected to Odoo {server_version} (cached session)")
+            else:
+                server_version = self.common.version().get('server_version', 'unknown')
+                print(f"✓ Connected to Odoo {server_version}")
             
             # Test authentication
-            return self.authenticate()
+            return self.authenticate(server_version)
             
         except Exception as e:
             print(f"✗ Connection failed: {e}")
@@ -120,6 +197,29 @@ class OdooConfig:
             print(f"✗ Error executing {model}.{method}: {e}")
             return None
     
+    def execute_many(self, calls, max_workers=None):
+        """
+        Execute independent (model, method, args, kwargs) calls concurrently
+        
+        Returns a list of (result, error) tuples in the order of calls; errors
+        are captured per call instead of being printed and swallowed.
+        """
+        if not self.uid:
+            if not self.authenticate():
+                error = Exception(f"Not authenticated on {self.db_name}")
+                return [(None, error) for _ in calls]
+        
+        return execute_many(
+            self.models, self.db_name, self.uid, self.password,
+            calls, max_workers=max_workers or self.pool_size
+        )
+    
+    def rpc_stats(self):
+        """Connection pool counters, per-(model, method) call stats, adaptive limit when enabled"""
+        stats = self.pool.stats() if self.pool else {}
+        stats['calls'] = metrics.snapshot(self.env_name)
+        return stats
+    
     def search_read(self, model, domain=None, fields=None, limit=None):
         """Search and read records"""
         domain = domain or []
@@ -131,9 +231,39 @@ class OdooConfig:
             
         return self.execute(model, 'search_read', domain, **kwargs)
 
+class LazyOdooConfig:
+    """
+    Stand-in for a module-level OdooConfig that is only built on first use
+    
+    Importing a module that holds one reads no config, prints nothing and
+    creates no proxies; the first attribute access does all of that once.
+    """
+    
+    def __init__(self, env_name):
+        object.__setattr__(self, '_env_name', env_name)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+    
+    def _get_instance(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, '_instance', OdooConfig(self._env_name))
+        return self._instance
+    
+    def __getattr__(self, name):
+        return getattr(self._get_instance(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._get_instance(), name, value)
+    
+    def __repr__(self):
+        state = 'loaded' if self._instance is not None else 'not loaded'
+        return f"<LazyOdooConfig {self._env_name} ({state})>"
+
 def get_odoo_config(env_name):
     """Get Odoo configuration for specific environment"""
     return OdooConfig(env_name)
 
-# For hook_fix project - use hook_local by default
-odoo_config = OdooConfig("hook_local")
+# For hook_fix project - use hook_local by default (created on first use)
+odoo_config = LazyOdooConfig("hook_local")
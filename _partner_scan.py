@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Partner Scanner
+Streams records matching a domain in pages of `id > last_id` (id order), so
+memory stays flat on large tables and records written while scanning never
+shift the pages that follow. Large scans can be split into id ranges, each
+scanned by a worker process of its own; multiprocessing is only imported
+once such a split is asked for
+"""
+
+DEFAULT_PAGE_SIZE = 2000
+
+
+def iter_pages(models, db, uid, password, domain, fields, page_size=DEFAULT_PAGE_SIZE, model='res.partner',
+               start_id=0, end_id=None):
+    """Yield lists of at most page_size records matching domain with start_id < id (<= end_id), in id order"""
+    page_size = max(1, int(page_size))
+    last_id = start_id
+    domain = list(domain) + ([['id', '<=', end_id]] if end_id is not None else [])
+    while True:
+        page = models.execute_kw(
+            db, uid, password, model, 'search_read',
+            [domain + [['id', '>', last_id]]],
+            {'fields': fields, 'order': 'id', 'limit': page_size}
+        )
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1]['id']
+
+
+def id_ranges(models, db, uid, password, domain, shards, model='res.partner', start_id=0):
+    """
+    Split the ids of the records matching domain (past start_id) into at most
+    shards ranges of equal id span, as (start_id, end_id) pairs for iter_pages
+
+    Returns [] when nothing matches.
+    """
+    bounds = [
+        models.execute_kw(db, uid, password, model, 'search', [list(domain) + [['id', '>', start_id]]],
+                          {'order': order, 'limit': 1})
+        for order in ('id', 'id desc')
+    ]
+    if not bounds[0]:
+        return []
+    first, last = bounds[0][0], bounds[1][0]
+    shards = max(1, min(int(shards), last - first + 1))
+    span = (last - first + 1) / shards
+    edges = [first - 1] + [first - 1 + round(span * index) for index in range(1, shards)] + [last]
+    return list(zip(edges, edges[1:]))
+
+
+def map_id_ranges(function, ranges, *args, workers=None):
+    """
+    Run function(start_id, end_id, *args) for every range in worker
+    processes (one per range, or at most workers), and yield the results in
+    range order as soon as each is ready
+
+    The function must be importable (module level) and open its own
+    connection: processes are spawned, not forked, so no socket or lock of
+    this process is shared with them. Workers exit when this process dies.
+    """
+    import multiprocessing
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not ranges:
+        return
+    with ProcessPoolExecutor(max_workers=min(workers or len(ranges), len(ranges)),
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_exit_with_parent, initargs=(os.getpid(),)) as executor:
+        futures = [executor.submit(function, start_id, end_id, *args) for start_id, end_id in ranges]
+        for future in futures:
+            yield future.result()
+
+
+def _exit_with_parent(parent_pid):
+    """Worker initializer: end the worker once its parent is gone (a killed run would otherwise orphan it)"""
+    import os
+    import threading
+    import time
+
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(0.5)
+        os._exit(1)
+
+    threading.Thread(target=watch, daemon=True).start()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+RPC Cassettes
+Record every request/response of a pooled transport to a compact gzipped
+file, and replay them later without a server - with optional simulated latency
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Environment overrides of the cassette / cassette_mode / replay_latency conf keys
+CASSETTE_ENV = 'ODOO_RPC_CASSETTE'
+CASSETTE_MODE_ENV = 'ODOO_RPC_CASSETTE_MODE'
+REPLAY_LATENCY_ENV = 'ODOO_RPC_REPLAY_LATENCY'
+
+MODES = ('record', 'replay')
+CASSETTE_FORMAT = 1
+
+
+class CassetteMiss(LookupError):
+    """A replayed request was never recorded"""
+
+
+class Cassette:
+    """
+    Recorded responses keyed by a hash of (path, request body)
+
+    Requests are only stored as hashes - passwords in the bodies never reach
+    the file. A request recorded several times is replayed in the same order,
+    the last response repeating once they are used up.
+    """
+
+    def __init__(self, path, mode='replay', latency=0.0):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected one of: {', '.join(MODES)})")
+        self.path = os.path.expanduser(str(path))
+        self.mode = mode
+        # Seconds added to every replayed call, or 'recorded' to replay the recorded durations
+        self.latency = latency
+        self.interactions = {}  # key -> [{'status', 'reason', 'content_type', 'body', 'elapsed'}]
+        self.misses = 0
+        self._positions = {}
+        self._lock = threading.Lock()
+        if mode == 'replay':
+            self.load()
+
+    @staticmethod
+    def key(path, body):
+        """Stable hash of a request; JSON-RPC ids are per-process counters and ignored"""
+        if path.endswith('/jsonrpc'):
+            payload = json.loads(body)
+            payload.pop('id', None)
+            body = json.dumps(payload, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(path.encode('utf-8') + b'\0' + body).hexdigest()
+
+    def record(self, path, body, status, reason, headers, data, elapsed):
+        """Store one response (data is the decompressed body)"""
+        interaction = {
+            'status': status,
+            'reason': reason,
+            'content_type': headers.get('Content-Type', ''),
+            'body': data.decode('utf-8', 'surrogateescape'),
+            'elapsed': round(elapsed, 6),
+        }
+        with self._lock:
+            self.interactions.setdefault(self.key(path, body), []).append(interaction)
+
+    def lookup(self, path, body):
+        """Return (status, reason, headers, data, delay seconds) of the next recorded response"""
+        key = self.key(path, body)
+        with self._lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for POST {path} in cassette {self.path}")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            interaction = recorded[min(position, len(recorded) - 1)]
+
+        delay = interaction['elapsed'] if self.latency == 'recorded' else self.latency
+        return (interaction['status'], interaction['reason'], {'Content-Type': interaction['content_type']},
+                interaction['body'].encode('utf-8', 'surrogateescape'), delay)
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            content = json.load(f)
+        if content.get('format') != CASSETTE_FORMAT:
+            raise ValueError(f"Unsupported cassette format in {self.path}: {content.get('format')}")
+        self.interactions = content['interactions']
+
+    def save(self):
+        """Atomically write the recorded interactions, readable by the owner only"""
+        from _state import write_text_atomic
+
+        with self._lock:
+            content = {
+                'format': CASSETTE_FORMAT,
+                'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'interactions': self.interactions,
+            }
+            data = gzip.compress(json.dumps(content, separators=(',', ':')).encode('utf-8'), compresslevel=6)
+        write_text_atomic(self.path, data, mode=0o600)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'requests': len(self.interactions),
+                'responses': sum(len(recorded) for recorded in self.interactions.values()),
+                'misses': self.misses,
+            }
+
+
+def cassette_settings(path='', mode='replay', latency='0'):
+    """
+    Resolve an instance's cassette settings (environment variables take precedence)
+
+    Returns None when no cassette is configured, else (path, mode, latency)
+    with latency in seconds or 'recorded'.
+    """
+    path = os.environ.get(CASSETTE_ENV) or path
+    if not path:
+        return None
+    mode = (os.environ.get(CASSETTE_MODE_ENV) or mode or 'replay').strip().lower()
+    latency = str(os.environ.get(REPLAY_LATENCY_ENV) or latency or '0').strip().lower()
+    return path, mode, latency if latency == 'recorded' else float(latency) / 1000.0
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def open_cassette(path, mode='replay', latency=0.0):
+    """Return the process-wide cassette for path; recordings are saved at exit"""
+    path = os.path.expanduser(str(path))
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path, mode, latency)
+            if mode == 'record':
+                import atexit
+                atexit.register(_save_at_exit, cassette)
+        return cassette
+
+
+def _save_at_exit(cassette):
+    try:
+        cassette.save()
+        stats = cassette.stats()
+        print(f"📼 Recorded {stats['responses']} RPC responses to {cassette.path}", file=sys.stderr)
+    except OSError as e:
+        print(f"⚠️  Could not write RPC cassette {cassette.path}: {e}", file=sys.stderr)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Adaptive RPC Concurrency Limiter
+AIMD limit on in-flight RPC calls: grows while latency stays flat, backs off
+multiplicatively when p95 latency or the fault rate rises
+"""
+
+import threading
+from collections import deque
+
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_WINDOW = 20
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class AdaptiveLimiter:
+    """
+    Additive-increase / multiplicative-decrease limit on concurrent RPC calls
+
+    Every `window` completed calls the limiter compares the window's p95
+    latency against a baseline (the smoothed no-load p95):
+    - p95 above baseline * latency_tolerance, or fault rate above
+      max_fault_rate: limit = limit * backoff
+    - otherwise, if the limit was actually reached: limit = limit + 1
+    """
+
+    def __init__(self, initial_limit=None, min_limit=DEFAULT_MIN_CONCURRENCY, max_limit=8,
+                 window=DEFAULT_WINDOW, latency_tolerance=1.5, max_fault_rate=0.05,
+                 backoff=0.5, history=1000):
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(min(max(initial_limit or self.min_limit, self.min_limit), self.max_limit))
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.max_fault_rate = max_fault_rate
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.baseline_p95 = None
+        self.increases = 0
+        self.decreases = 0
+        self.calls = 0
+        self.faults = 0
+
+        self._cond = threading.Condition()
+        self._window_samples = []  # (latency, ok) since the last adjustment
+        self._window_peak = 0
+        self._latencies = deque(maxlen=history)
+
+    @property
+    def current_limit(self):
+        return int(self.limit)
+
+    def acquire(self):
+        """Block until a call may start under the current limit"""
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            self._window_peak = max(self._window_peak, self.in_flight)
+
+    def release(self, latency, ok=True):
+        """Record a finished call (latency in seconds) and adjust the limit"""
+        with self._cond:
+            self.in_flight -= 1
+            self.calls += 1
+            if not ok:
+                self.faults += 1
+            self._latencies.append(latency)
+            self._window_samples.append((latency, ok))
+            if len(self._window_samples) >= self.window:
+                self._adjust()
+            self._cond.notify_all()
+
+    def _adjust(self):
+        samples = self._window_samples
+        p95 = percentile([latency for latency, ok in samples], 0.95)
+        fault_rate = sum(1 for latency, ok in samples if not ok) / len(samples)
+
+        if self.baseline_p95 is None:
+            self.baseline_p95 = p95
+
+        if fault_rate > self.max_fault_rate or p95 > self.baseline_p95 * self.latency_tolerance:
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+            self.decreases += 1
+        elif self._window_peak >= int(self.limit) and self.limit < self.max_limit:
+            self.limit = min(float(self.max_limit), self.limit + 1)
+            self.increases += 1
+
+        # The baseline follows improvements immediately and degradations slowly,
+        # so a lasting shift in server speed is eventually accepted as normal
+        if p95 < self.baseline_p95:
+            self.baseline_p95 = p95
+        else:
+            self.baseline_p95 += (p95 - self.baseline_p95) * 0.1
+
+        self._window_samples = []
+        self._window_peak = self.in_flight
+
+    def latencies(self):
+        """Recent call latencies in seconds, oldest first"""
+        with self._cond:
+            return list(self._latencies)
+
+    def snapshot(self):
+        """Current limit and observed latency figures (milliseconds)"""
+        with self._cond:
+            recent = list(self._latencies)
+            baseline = self.baseline_p95
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'calls': self.calls,
+                'faults': self.faults,
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'baseline_p95_ms': round(baseline * 1000.0, 3) if baseline is not None else None,
+                'p50_ms': round(percentile(recent, 0.50) * 1000.0, 3) if recent else None,
+                'p95_ms': round(percentile(recent, 0.95) * 1000.0, 3) if recent else None,
+            }
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+RPC Call Metrics
+Per-(model, method) call counts, latency percentiles and payload sizes for
+every execute_kw, exported at exit as a Prometheus textfile or JSON file
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from _rpc_limiter import percentile
+
+# Environment overrides of the metrics_file / slow_call_ms conf keys, for one-off runs
+METRICS_FILE_ENV = 'ODOO_RPC_METRICS_FILE'
+SLOW_CALL_ENV = 'ODOO_RPC_SLOW_CALL_MS'
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+# Latency samples kept per (instance, model, method) for the percentiles
+SAMPLES_PER_CALL = 2048
+
+
+class CallStats:
+    """Aggregated figures of one (instance, model, method)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latencies = deque(maxlen=SAMPLES_PER_CALL)
+
+    def as_dict(self):
+        latencies = list(self.latencies)
+        stats = {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': round(self.seconds * 1000.0, 3),
+            'max_ms': round(self.max_seconds * 1000.0, 3),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+        }
+        for fraction in QUANTILES:
+            value = percentile(latencies, fraction)
+            stats[f'p{int(fraction * 100)}_ms'] = round(value * 1000.0, 3) if value is not None else None
+        return stats
+
+
+class RpcMetrics:
+    """Thread-safe in-process registry of call statistics"""
+
+    def __init__(self):
+        self.slow_call_ms = 0.0
+        self._stats = {}  # (instance, model, method) -> CallStats
+        self._lock = threading.Lock()
+
+    def record(self, instance, model, method, seconds, request_bytes=0, response_bytes=0, ok=True):
+        """Add one finished call"""
+        key = (instance, model, method)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CallStats()
+            stats.calls += 1
+            stats.errors += 0 if ok else 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.request_bytes += request_bytes
+            stats.response_bytes += response_bytes
+            stats.latencies.append(seconds)
+
+        if self.slow_call_ms and seconds * 1000.0 >= self.slow_call_ms:
+            print(f"🐢 Slow RPC: {instance} {model}.{method} took {seconds * 1000.0:.0f} ms "
+                  f"({request_bytes} bytes sent, {response_bytes} received{'' if ok else ', failed'})",
+                  file=sys.stderr)
+
+    def _items(self, instance=None):
+        """Sorted [((instance, model, method), stats dict, latencies)]"""
+        with self._lock:
+            return sorted((key, stats.as_dict(), list(stats.latencies)) for key, stats in self._stats.items()
+                          if instance is None or key[0] == instance)
+
+    def snapshot(self, instance=None):
+        """Return {'instance model.method': stats dict}, optionally for one instance"""
+        return {f"{key[0]} {key[1]}.{key[2]}": stats for key, stats, _ in self._items(instance)}
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def to_json(self):
+        return {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'calls': [dict(instance=key[0], model=key[1], method=key[2], **stats)
+                      for key, stats, _ in self._items()],
+        }
+
+    def to_prometheus(self):
+        """Render the statistics in the Prometheus text exposition format"""
+        items = self._items()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(key, **extra):
+            pairs = dict(zip(('instance', 'model', 'method'), key), **extra)
+            return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs.items()) + '}'
+
+        latency_samples = []
+        for key, stats, latencies in items:
+            for fraction in QUANTILES:
+                value = percentile(latencies, fraction)
+                if value is not None:
+                    latency_samples.append(f"odoo_rpc_call_seconds{labels(key, quantile=fraction)} {value:.6f}")
+            latency_samples.append(f"odoo_rpc_call_seconds_sum{labels(key)} {stats['total_ms'] / 1000.0:.6f}")
+            latency_samples.append(f"odoo_rpc_call_seconds_count{labels(key)} {stats['calls']}")
+
+        metric('odoo_rpc_call_seconds', 'summary', 'Odoo execute_kw latency', latency_samples)
+        metric('odoo_rpc_calls_total', 'counter', 'Odoo execute_kw calls',
+               [f"odoo_rpc_calls_total{labels(key)} {stats['calls']}" for key, stats, _ in items])
+        metric('odoo_rpc_errors_total', 'counter', 'Odoo execute_kw calls that raised',
+               [f"odoo_rpc_errors_total{labels(key)} {stats['errors']}" for key, stats, _ in items])
+        metric('odoo_rpc_request_bytes_total', 'counter', 'Uncompressed request body bytes',
+               [f"odoo_rpc_request_bytes_total{labels(key)} {stats['request_bytes']}" for key, stats, _ in items])
+        metric('odoo_rpc_response_bytes_total', 'counter', 'Uncompressed response body bytes',
+               [f"odoo_rpc_response_bytes_total{labels(key)} {stats['response_bytes']}" for key, stats, _ in items])
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the statistics to path - Prometheus text for *.prom, JSON otherwise"""
+        import json
+
+        from _state import write_text_atomic
+
+        path = os.path.expanduser(str(path))
+        if path.endswith('.prom'):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.to_json(), indent=2)
+        write_text_atomic(path, text)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class InstrumentedModels:
+    """Wrap an 'object' service proxy so every execute_kw is timed, sized and counted"""
+
+    def __init__(self, models, pool, instance, registry=None):
+        self._models = models
+        self._pool = pool
+        self._instance = instance
+        self._registry = registry or metrics
+
+    def execute_kw(self, *args):
+        # (db, uid, password, model, method, args[, kwargs])
+        model, method = args[3], args[4]
+        self._pool.last_exchange()  # Discard sizes left over from a call that never completed
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = self._models.execute_kw(*args)
+            ok = True
+            return result
+        finally:
+            request_bytes, response_bytes = self._pool.last_exchange() or (0, 0)
+            self._registry.record(self._instance, model, method, time.perf_counter() - start,
+                                  request_bytes, response_bytes, ok)
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+    def __repr__(self):
+        return f"<InstrumentedModels {self._instance} {self._models!r}>"
+
+
+# One registry per process, shared by every instance
+metrics = RpcMetrics()
+_export_paths = set()
+_export_lock = threading.Lock()
+
+
+def configure(metrics_file=None, slow_call_ms=None):
+    """
+    Apply an instance's metrics settings (environment variables take precedence)
+
+    metrics_file is written once at interpreter exit; slow_call_ms logs every
+    call at or above that many milliseconds to stderr (0 disables it).
+    """
+    metrics_file = os.environ.get(METRICS_FILE_ENV) or metrics_file
+    slow_call_ms = os.environ.get(SLOW_CALL_ENV) or slow_call_ms
+    if slow_call_ms:
+        metrics.slow_call_ms = float(slow_call_ms)
+
+    if metrics_file:
+        with _export_lock:
+            if not _export_paths:
+                import atexit
+                atexit.register(_export_at_exit)
+            _export_paths.add(os.path.expanduser(metrics_file))
+
+
+def _export_at_exit():
+    for path in sorted(_export_paths):
+        try:
+            metrics.write(path)
+        except OSError as e:
+            print(f"⚠️  Could not write RPC metrics to {path}: {e}", file=sys.stderr)
+
+
+def instrument(models, pool, instance):
+    """Return models wrapped so its execute_kw calls land in the process registry"""
+    return InstrumentedModels(models, pool, instance)
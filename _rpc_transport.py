@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Pooled RPC Transport
+Keep-alive HTTP connection pool shared by every XML-RPC / JSON-RPC proxy of an Odoo instance
+"""
+
+import gzip
+import http.client
+import itertools
+import json
+import threading
+import time
+import xmlrpc.client
+import zlib
+from collections import deque
+from urllib.parse import urlsplit
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 30.0
+DEFAULT_PROTOCOL = 'xmlrpc'
+PROTOCOLS = ('xmlrpc', 'jsonrpc')
+# Request bodies are only gzipped when a threshold is configured: stock Odoo
+# does not inflate request bodies, a reverse proxy in front of it has to
+DEFAULT_COMPRESS_THRESHOLD = 0
+READ_CHUNK_SIZE = 64 * 1024
+
+# Errors raised when a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+# Calls that change nothing on the server - the only ones sent again when the
+# server may already have received them (service methods and model methods)
+READ_ONLY_SERVICE_METHODS = frozenset({'version', 'about', 'login', 'authenticate', 'server_version'})
+READ_ONLY_MODEL_METHODS = frozenset({'search', 'search_read', 'search_count', 'read', 'read_group', 'fields_get',
+                                     'name_search', 'default_get', 'check_access_rights'})
+
+
+class ConnectionPool:
+    """Bounded pool of persistent HTTP(S) connections to one Odoo server"""
+
+    def __init__(self, url, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, timeout=None,
+                 limiter=None, accept_gzip=True, compress_threshold=DEFAULT_COMPRESS_THRESHOLD):
+        parts = urlsplit(url)
+        self.url = url.rstrip('/')
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path.rstrip('/')
+        self.pool_size = max(1, int(pool_size))
+        self.idle_timeout = float(idle_timeout)
+        self.timeout = timeout
+        # Optional AdaptiveLimiter gating how many requests are in flight
+        self.limiter = limiter
+        # Ask for gzip responses; gzip request bodies of at least compress_threshold bytes (0 = never)
+        self.accept_gzip = accept_gzip
+        self.compress_threshold = compress_threshold
+        # Optional _rpc_cassette.Cassette recording or replaying every request
+        self.cassette = None
+
+        self._idle = deque()  # (connection, last_used) - most recently used on the right
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        # Counters - *_raw are uncompressed sizes, the others what went over the wire
+        self.connections_opened = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_sent_raw = 0
+        self.bytes_received = 0
+        self.bytes_received_raw = 0
+
+    def _new_connection(self):
+        """Open a new connection to the server"""
+        with self._lock:
+            self.connections_opened += 1
+        kwargs = {'timeout': self.timeout} if self.timeout is not None else {}
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, **kwargs)
+        return http.client.HTTPConnection(self.host, self.port, **kwargs)
+
+    def _checkout(self):
+        """Return (connection, reused) - an idle connection if one is still fresh"""
+        now = time.monotonic()
+        with self._lock:
+            # Oldest connections sit on the left; drop the ones past the idle timeout
+            while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                self._idle.popleft()[0].close()
+            if self._idle:
+                return self._idle.pop()[0], True
+        return self._new_connection(), False
+
+    def _checkin(self, connection):
+        """Return a connection to the idle list"""
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+
+    def post(self, path, body, headers, sink=None):
+        """
+        POST body to path on a pooled connection, return (status, reason, headers, data)
+        
+        Responses are decompressed as they are read. If sink is given, a 200
+        response body is passed to it chunk by chunk and data is None.
+        """
+        cassette = self.cassette
+        if cassette is not None:
+            if cassette.mode == 'replay':
+                return self._replay(cassette, path, body, sink)
+            return self._record(cassette, path, body, headers, sink)
+        return self._send(path, body, headers, sink)
+
+    def _replay(self, cassette, path, body, sink):
+        """Answer from the cassette without touching the network"""
+        status, reason, response_headers, data, delay = cassette.lookup(path, body)
+        if delay:
+            time.sleep(delay)
+        self._local.last_exchange = (len(body), len(data))
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent_raw += len(body)
+            self.bytes_received_raw += len(data)
+        if sink is not None and status == 200:
+            sink(data)
+            data = None
+        return status, reason, response_headers, data
+
+    def _record(self, cassette, path, body, headers, sink):
+        """Send the request and store the decompressed response in the cassette"""
+        chunks = []
+        tee = None
+        if sink is not None:
+            def tee(chunk):
+                chunks.append(chunk)
+                sink(chunk)
+
+        start = time.monotonic()
+        status, reason, response_headers, data = self._send(path, body, headers, tee)
+        cassette.record(path, body, status, reason, response_headers,
+                        data if data is not None else b''.join(chunks), time.monotonic() - start)
+        return status, reason, response_headers, data
+
+    def _send(self, path, body, headers, sink):
+        """Send through the adaptive limiter when one is attached"""
+        limiter = self.limiter
+        if limiter is None:
+            return self._post(path, body, headers, sink)
+
+        limiter.acquire()
+        start = time.monotonic()
+        ok = False
+        try:
+            response = self._post(path, body, headers, sink)
+            # Overload shows up as 5xx / 429; application faults arrive as 200
+            ok = response[0] < 500 and response[0] != 429
+            return response
+        finally:
+            limiter.release(time.monotonic() - start, ok)
+
+    def _post(self, path, body, headers, sink):
+        raw_body = body
+        raw_size = len(body)
+        headers = dict(headers)
+        if self.accept_gzip:
+            headers['Accept-Encoding'] = 'gzip'
+        if self.compress_threshold and raw_size >= self.compress_threshold:
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+
+        self._slots.acquire()
+        try:
+            connection, reused = self._checkout()
+            sent = False
+            try:
+                try:
+                    connection.request('POST', path, body, headers)
+                    sent = True
+                    response = connection.getresponse()
+                except STALE_CONNECTION_ERRORS:
+                    connection.close()
+                    # The server dropped an idle keep-alive connection - retry once on a fresh one, unless
+                    # the whole request went out and may have run: only read-only calls are sent twice
+                    if not reused or (sent and not is_read_only(raw_body)):
+                        raise
+                    connection = self._new_connection()
+                    response = self._exchange(connection, path, body, headers)
+            except Exception:
+                connection.close()
+                raise
+
+            try:
+                data, wire_size, decoded_size = self._read_body(response, sink if response.status == 200 else None)
+            except Exception:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._checkin(connection)
+
+            # Uncompressed sizes of this thread's latest exchange, for per-call metrics
+            self._local.last_exchange = (raw_size, decoded_size)
+            with self._lock:
+                self.requests += 1
+                self.bytes_sent += len(body)
+                self.bytes_sent_raw += raw_size
+                self.bytes_received += wire_size
+                self.bytes_received_raw += decoded_size
+            return response.status, response.reason, response.msg, data
+        finally:
+            self._slots.release()
+
+    def _exchange(self, connection, path, body, headers):
+        """Send one request and return the response object"""
+        connection.request('POST', path, body, headers)
+        return connection.getresponse()
+
+    @staticmethod
+    def _read_body(response, sink=None):
+        """Read and decompress a response body, return (data or None, wire bytes, decoded bytes)"""
+        encoding = (response.getheader('Content-Encoding') or '').lower()
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == 'gzip' else None
+        chunks = []
+        emit = sink or chunks.append
+        wire_size = decoded_size = 0
+
+        while True:
+            chunk = response.read(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            wire_size += len(chunk)
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            if chunk:
+                decoded_size += len(chunk)
+                emit(chunk)
+
+        if decompressor:
+            tail = decompressor.flush()
+            if tail:
+                decoded_size += len(tail)
+                emit(tail)
+
+        return (None if sink else b''.join(chunks)), wire_size, decoded_size
+
+    def last_exchange(self):
+        """Return and clear (request bytes, response bytes) of this thread's latest request"""
+        sizes = getattr(self._local, 'last_exchange', None)
+        self._local.last_exchange = None
+        return sizes
+
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            while self._idle:
+                self._idle.pop()[0].close()
+
+    def stats(self):
+        """Return pool counters"""
+        with self._lock:
+            stats = {
+                'pool_size': self.pool_size,
+                'idle_connections': len(self._idle),
+                'connections_opened': self.connections_opened,
+                'requests': self.requests,
+                'bytes_sent': self.bytes_sent,
+                'bytes_sent_raw': self.bytes_sent_raw,
+                'bytes_received': self.bytes_received,
+                'bytes_received_raw': self.bytes_received_raw,
+                'bytes_saved': (self.bytes_sent_raw - self.bytes_sent)
+                               + (self.bytes_received_raw - self.bytes_received),
+            }
+        if self.limiter is not None:
+            stats['limiter'] = self.limiter.snapshot()
+        if self.cassette is not None:
+            stats['cassette'] = self.cassette.stats()
+        return stats
+
+
+def is_read_only(body):
+    """Whether an XML-RPC or JSON-RPC request body is a call that changes nothing on the server"""
+    try:
+        if body.lstrip().startswith(b'{'):
+            params = json.loads(body)['params']
+            method, args = params['method'], params['args']
+        else:
+            args, method = xmlrpc.client.loads(body)
+    except Exception:
+        return False  # Not a request this module sent - assume it writes
+    if method in ('execute', 'execute_kw'):
+        return len(args) > 4 and args[4] in READ_ONLY_MODEL_METHODS
+    return method in READ_ONLY_SERVICE_METHODS
+
+
+class PooledTransport(xmlrpc.client.Transport):
+    """XML-RPC transport that sends every request through a ConnectionPool"""
+
+    def __init__(self, pool, on_fault=None):
+        super().__init__()
+        self.pool = pool
+        self.on_fault = on_fault
+
+    def request(self, host, handler, request_body, verbose=False):
+        headers = {
+            'Content-Type': 'text/xml',
+            'User-Agent': self.user_agent,
+        }
+        # The response is parsed while it streams in - never held whole in memory
+        parser, unmarshaller = self.getparser()
+        status, reason, response_headers, data = self.pool.post(handler, request_body, headers, sink=parser.feed)
+
+        if status != 200:
+            raise xmlrpc.client.ProtocolError(host + handler, status, reason, dict(response_headers))
+
+        parser.close()
+        try:
+            return unmarshaller.close()
+        except xmlrpc.client.Fault as fault:
+            if self.on_fault:
+                self.on_fault(fault)
+            raise
+
+
+class JsonRpcProxy:
+    """Odoo /jsonrpc proxy for one service with the same call surface as ServerProxy"""
+
+    def __init__(self, pool, service, on_fault=None):
+        self.pool = pool
+        self.service = service
+        self.on_fault = on_fault
+        self._ids = itertools.count(1)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args: self._call(name, args)
+
+    def _call(self, method, args):
+        payload = {
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': {'service': self.service, 'method': method, 'args': list(args)},
+            'id': next(self._ids),
+        }
+        body = json.dumps(payload).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        status, reason, response_headers, data = self.pool.post(f"{self.pool.path}/jsonrpc", body, headers)
+
+        if status != 200:
+            raise xmlrpc.client.ProtocolError(f"{self.pool.url}/jsonrpc", status, reason, dict(response_headers))
+
+        response = json.loads(data)
+        if response.get('error'):
+            fault = jsonrpc_fault(response['error'])
+            if self.on_fault:
+                self.on_fault(fault)
+            raise fault
+        return response.get('result')
+
+    def __repr__(self):
+        return f"<JsonRpcProxy for {self.pool.url}/jsonrpc ({self.service})>"
+
+
+def jsonrpc_fault(error):
+    """Convert an Odoo JSON-RPC error object to the xmlrpc.client.Fault callers already handle"""
+    data = error.get('data') or {}
+    code = data.get('name') or error.get('code', 1)
+    message = data.get('message') or error.get('message', 'Unknown JSON-RPC error')
+    return xmlrpc.client.Fault(code, message)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, url, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+             accept_gzip=True, compress_threshold=DEFAULT_COMPRESS_THRESHOLD):
+    """Return the shared connection pool for an instance, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.url != url.rstrip('/'):
+            if pool is not None:
+                pool.close()
+            pool = ConnectionPool(url, pool_size=pool_size, idle_timeout=idle_timeout,
+                                  accept_gzip=accept_gzip, compress_threshold=compress_threshold)
+            _pools[key] = pool
+        return pool
+
+
+def pool_stats():
+    """Return the stats of every shared pool, keyed by instance"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {key: pool.stats() for key, pool in pools.items()}
+
+
+def server_proxy(pool, service, protocol=DEFAULT_PROTOCOL, on_fault=None):
+    """
+    Return a proxy for an Odoo service ('common' or 'object') on the pooled transport
+    
+    on_fault, if given, is called with every xmlrpc.client.Fault before it is raised.
+    """
+    if protocol == 'jsonrpc':
+        return JsonRpcProxy(pool, service, on_fault=on_fault)
+    if protocol == 'xmlrpc':
+        transport = PooledTransport(pool, on_fault=on_fault)
+        return xmlrpc.client.ServerProxy(f"{pool.url}/xmlrpc/2/{service}", transport=transport)
+    raise ValueError(f"Unknown RPC protocol '{protocol}' (expected one of: {', '.join(PROTOCOLS)})")
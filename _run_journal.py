@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Run Journal
+Append-only journal of a classification run's committed write batches, the
+rank values they replaced and scan checkpoints, kept under
+~/.odoo_config/runs so an interrupted --execute run can be resumed where it
+stopped, and any run rolled back
+"""
+
+import json
+import os
+import re
+import time
+
+from _state import state_dir
+
+# Journal records are fsynced in groups: after this many records or seconds, whichever comes first
+DEFAULT_SYNC_EVERY = 64
+DEFAULT_SYNC_INTERVAL = 1.0
+
+
+def _journal_path(run_id):
+    return state_dir('runs') / f'{run_id}.jsonl'
+
+
+def new_run_id(instance_name):
+    """Unused, sortable run id: {instance}-{YYYYmmdd-HHMMSS}, suffixed for runs in the same second"""
+    run_id = base = f"{instance_name}-{time.strftime('%Y%m%d-%H%M%S')}"
+    suffix = 1
+    while _journal_path(run_id).exists():
+        suffix += 1
+        run_id = f"{base}-{suffix}"
+    return run_id
+
+
+class RunJournal:
+    """
+    Append-only JSON-lines journal of one run
+
+    The values a write batch replaces are recorded before it is sent, the
+    batch itself once the server committed it. Every record is handed to the
+    OS right away - a killed process loses nothing - and fsynced in groups,
+    so the journal never becomes the bottleneck. A machine crash can only
+    lose the last unsynced records: their writes are simply redone on resume
+    (setting a rank that is already set is harmless, and the rank filter
+    skips those contacts anyway).
+
+    With resume the existing journal is replayed first (filling in instance,
+    since, watermark, rules, applied_ids, changes, checkpoint_id and
+    finished) and appended to; otherwise the journal must not exist yet.
+    """
+
+    def __init__(self, run_id, resume=False, sync_every=DEFAULT_SYNC_EVERY, sync_interval=DEFAULT_SYNC_INTERVAL):
+        self.run_id = run_id
+        self.path = _journal_path(run_id)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.instance = None
+        self.since = None
+        self.watermark = None
+        self.rules = None
+        self.applied_ids = set()
+        self.changes = []  # (ids, previous {rank: value}, assigned {rank: value}) per write batch
+        self._batch_ids = {}  # batch number -> ids, until its commit record
+        self.checkpoint_id = 0
+        self.finished = False
+        self.resumed = resume
+        if resume:
+            if not self.path.exists():
+                raise FileNotFoundError(f"No journal for run {run_id}: {self.path}")
+            self._replay()
+        elif self.path.exists():
+            raise FileExistsError(f"Journal of run {run_id} already exists: {self.path}")
+
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._file = os.fdopen(fd, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _replay(self):
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line) if line.endswith(b'\n') else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    break  # Torn last line of a crashed run
+                valid_size += len(line)
+                kind = record.get('type')
+                if kind == 'start':
+                    self.instance = record['instance']
+                    self.since = record.get('since')
+                    self.rules = record.get('rules')
+                elif kind == 'watermark':
+                    self.watermark = record['watermark']
+                elif kind == 'previous':
+                    self.changes.append((record['ids'], record['previous'], record['assigned']))
+                    self._batch_ids[record['batch']] = record['ids']
+                elif kind == 'batch':
+                    failed = set(record.get('failed', ()))
+                    self.applied_ids.update(i for i in self._batch_ids.pop(record['batch'], ()) if i not in failed)
+                elif kind == 'checkpoint':
+                    self.checkpoint_id = max(self.checkpoint_id, record['last_id'])
+                elif kind == 'end':
+                    self.finished = True
+        # Appending after a torn line would merge the next record into it
+        if valid_size < os.path.getsize(self.path):
+            os.truncate(self.path, valid_size)
+
+    def append(self, record, sync=False):
+        """Append one record; fsync when the group is full, old enough, or sync is set"""
+        self._file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if sync or self._unsynced >= self.sync_every or time.monotonic() - self._synced_at >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if not self._unsynced:
+            return
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def start(self, instance, since, rules):
+        """First record of a new run: what it scans and with which rules"""
+        self.instance, self.since, self.rules = instance, since, rules
+        self.append({'type': 'start', 'run_id': self.run_id, 'instance': instance, 'since': since,
+                     'rules': rules, 'started_at': time.time()}, sync=True)
+
+    def record_watermark(self, watermark):
+        """Watermark taken before the first scan - a resumed run saves this one, not its own"""
+        if self.watermark is None:
+            self.watermark = watermark
+            self.append({'type': 'watermark', 'watermark': watermark})
+
+    def record_previous(self, label, ids, previous, assigned):
+        """
+        Rank values a write batch is about to replace ({rank: old}) and set
+        ({rank: new}); returns the batch number to commit it with
+        """
+        batch = len(self.changes) + 1
+        self.changes.append((list(ids), previous, assigned))
+        self._batch_ids[batch] = list(ids)
+        self.append({'type': 'previous', 'batch': batch, 'rule': label, 'ids': list(ids), 'previous': previous,
+                     'assigned': assigned})
+        return batch
+
+    def record_batch(self, batch, failed=()):
+        """The server committed a write batch, except for the failed ids"""
+        failed = set(failed)
+        self.applied_ids.update(i for i in self._batch_ids.pop(batch, ()) if i not in failed)
+        record = {'type': 'batch', 'batch': batch}
+        if failed:
+            record['failed'] = sorted(failed)
+        self.append(record)
+
+    def checkpoint(self, last_id):
+        """Every contact up to last_id has been handled; a resume continues after it"""
+        if last_id > self.checkpoint_id:
+            self.checkpoint_id = last_id
+            self.append({'type': 'checkpoint', 'last_id': last_id})
+
+    def record_rollback(self, summary):
+        self.append({'type': 'rollback', 'rolled_back_at': time.time(), **summary}, sync=True)
+
+    def finish(self, summary):
+        self.finished = True
+        self.append({'type': 'end', 'finished_at': time.time(), **summary}, sync=True)
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+def find_unfinished_run(instance_name):
+    """Run id of the instance's latest run if it did not finish, else None"""
+    # Only this instance's run ids (see new_run_id): 'hook-eu-...' is not a run of 'hook'
+    run_id = re.compile(rf'{re.escape(instance_name)}-(\d{{8}}-\d{{6}})(?:-(\d+))?')
+    journals = []
+    for path in state_dir('runs').glob(f'{instance_name}-*.jsonl'):
+        match = run_id.fullmatch(path.stem)
+        if match:
+            journals.append(((match.group(1), int(match.group(2) or 1)), path))
+    if not journals:
+        return None
+    latest = max(journals)[1]
+    with open(latest, encoding='utf-8') as f:
+        for line in f:
+            if '"type":"end"' in line:
+                return None
+    return latest.stem
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Scan Watermarks
+Per-instance high-water mark (latest write_date and id) of the partners a
+successful classification run has seen, kept under ~/.odoo_config/watermarks
+so the next run only examines partners created or changed since
+"""
+
+import time
+
+from _state import read_json, state_dir, write_private_json
+
+# Fetch the current watermark: latest write_date and highest id of all partners
+WATERMARK_CALLS = [
+    ('res.partner', 'search_read', [[]], {'fields': ['write_date'], 'order': 'write_date desc, id desc', 'limit': 1}),
+    ('res.partner', 'search', [[]], {'order': 'id desc', 'limit': 1}),
+]
+
+
+def _watermark_path(instance_name):
+    return state_dir('watermarks') / f'{instance_name}.json'
+
+
+def watermark_from(latest_written, highest_ids):
+    """Build a watermark from the results of WATERMARK_CALLS"""
+    return {
+        'write_date': latest_written[0]['write_date'] if latest_written else False,
+        'id': highest_ids[0] if highest_ids else 0,
+    }
+
+
+def changed_since_domain(watermark):
+    """
+    Domain of partners changed at or after the watermark's write_date, or
+    created past its id ([] without a watermark, i.e. everything)
+
+    write_date only has second precision, so partners written in the same
+    second as the watermark are examined again rather than missed.
+    """
+    if not watermark:
+        return []
+    if not watermark.get('write_date'):
+        return [['id', '>', watermark.get('id', 0)]]
+    return ['|', ['write_date', '>=', watermark['write_date']], ['id', '>', watermark.get('id', 0)]]
+
+
+def load_watermark(instance_name):
+    """Return the instance's saved watermark dict, or None if there is none"""
+    watermark = read_json(_watermark_path(instance_name))
+    if not watermark or 'id' not in watermark:
+        return None
+    return watermark
+
+
+def save_watermark(instance_name, watermark):
+    """Persist the watermark of a successful run"""
+    write_private_json(_watermark_path(instance_name), {
+        'write_date': watermark.get('write_date') or False,
+        'id': watermark.get('id', 0),
+        # Fingerprint of the classification rules the run applied
+        'rules': watermark.get('rules'),
+        'recorded_at': time.time(),
+    })
+
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Session Cache
+Per-instance cache of the authenticated uid and server version, kept valid
+across processes under ~/.odoo_config/sessions with a TTL
+"""
+
+import hashlib
+import time
+
+from _state import read_json, state_dir, write_private_json
+
+DEFAULT_SESSION_TTL = 12 * 3600
+
+# Odoo's XML-RPC fault code for odoo.exceptions.AccessDenied
+ACCESS_DENIED_FAULT_CODE = 3
+
+
+def _session_path(instance_name):
+    return state_dir('sessions') / f'{instance_name}.json'
+
+
+def _fingerprint(url, database, username, password):
+    """Hash of the connection details - a changed password or URL invalidates the cache"""
+    return hashlib.sha256('\0'.join([url, database, username, password]).encode('utf-8')).hexdigest()
+
+
+def load_session(instance_name, url, database, username, password, ttl=DEFAULT_SESSION_TTL):
+    """Return the cached session dict (uid, server_version) if still valid, else None"""
+    if not ttl or ttl <= 0:
+        return None
+
+    session = read_json(_session_path(instance_name))
+    if not session or not session.get('uid'):
+        return None
+    if session.get('fingerprint') != _fingerprint(url, database, username, password):
+        return None
+    if time.time() - session.get('authenticated_at', 0) > ttl:
+        return None
+    return session
+
+
+def save_session(instance_name, url, database, username, password, uid, server_version=None):
+    """Cache an authenticated uid (and server version) for the instance"""
+    write_private_json(_session_path(instance_name), {
+        'uid': uid,
+        'server_version': server_version,
+        'authenticated_at': time.time(),
+        'fingerprint': _fingerprint(url, database, username, password),
+    })
+
+
+def invalidate_session(instance_name):
+    """Drop the cached session of an instance"""
+    try:
+        _session_path(instance_name).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def is_access_denied(fault):
+    """True if an RPC fault means the cached credentials are no longer accepted"""
+    code = fault.faultCode
+    return (
+        code == ACCESS_DENIED_FAULT_CODE
+        or 'AccessDenied' in str(code)
+        or str(fault.faultString).strip().lower() == 'access denied'
+    )
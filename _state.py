@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Local State Files
+Locations and private (0600) writes for per-instance state kept under ~/.odoo_config
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+def config_dir():
+    """Directory holding the {instance}.conf files"""
+    return Path.home() / '.odoo_config'
+
+
+def state_dir(kind):
+    """Return ~/.odoo_config/{kind}, created readable by the owner only"""
+    path = config_dir() / kind
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    os.chmod(path, 0o700)
+    return path
+
+
+def write_text_atomic(path, text, mode=0o644):
+    """Atomically replace path with text (str or bytes) - readers never see a partial file"""
+    import tempfile
+    
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(text, bytes) else 'w') as f:
+            f.write(text)
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_private_json(path, data):
+    """Atomically replace path with JSON data, readable by the owner only"""
+    write_text_atomic(path, json.dumps(data, indent=2, default=str), mode=0o600)
+
+
+def read_json(path, default=None):
+    """Read a JSON state file, returning default if it is missing or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
@@ -43,47 +43,54 @@ def find_studio_fields():
     print(f"Found {len(studio_fields)} Studio fields (excluding x_studio_code)")
     return studio_fields
 
-def analyze_field_data(field_info):
-    """Analyze data in a Studio field via XML-RPC"""
+def field_analysis_calls(field_info):
+    """Build the independent RPC calls needed to analyze one Studio field"""
     
     model = field_info['model']
     field_name = field_info['name']
+    non_null_domain = [(field_name, '!=', False)]
     
-    try:
+    return [
         # Count total records in the model
-        total_count = odoo_config.execute(model, 'search_count', [])
-        
-        if total_count == 0:
-            return {
-                'total_records': 0,
-                'non_null_values': 0,
-                'has_data': False,
-                'sample_values': []
-            }
-        
+        (model, 'search_count', [[]]),
         # Count records where the field is not False/empty
-        non_null_domain = [(field_name, '!=', False)]
-        non_null_count = odoo_config.execute(model, 'search_count', non_null_domain)
-        
+        (model, 'search_count', [non_null_domain]),
         # Get sample values (limit 5)
-        sample_ids = odoo_config.execute(model, 'search', non_null_domain, {'limit': 5})
-        sample_values = []
-        
-        if sample_ids:
-            sample_records = odoo_config.execute(model, 'read', sample_ids, [field_name])
-            sample_values = [record.get(field_name) for record in sample_records if record.get(field_name)]
-        
-        analysis = {
-            'total_records': total_count,
-            'non_null_values': non_null_count,
-            'has_data': non_null_count > 0,
-            'sample_values': sample_values[:5]  # Ensure max 5 samples
+        (model, 'search_read', [non_null_domain], {'fields': [field_name], 'limit': 5}),
+    ]
+
+def build_field_analysis(field_info, call_results):
+    """Build the analysis dict of one field from its (result, error) call results"""
+    
+    for result, error in call_results:
+        if error is not None:
+            return {'error': str(error)}
+    
+    (total_count, _), (non_null_count, _), (sample_records, _) = call_results
+    
+    if total_count == 0:
+        return {
+            'total_records': 0,
+            'non_null_values': 0,
+            'has_data': False,
+            'sample_values': []
         }
-        
-        return analysis
-        
-    except Exception as e:
-        return {'error': str(e)}
+    
+    field_name = field_info['name']
+    sample_values = [record.get(field_name) for record in sample_records if record.get(field_name)]
+    
+    return {
+        'total_records': total_count,
+        'non_null_values': non_null_count,
+        'has_data': non_null_count > 0,
+        'sample_values': sample_values[:5]  # Ensure max 5 samples
+    }
+
+def analyze_field_data(field_info):
+    """Analyze data in a Studio field via XML-RPC"""
+    
+    call_results = odoo_config.execute_many(field_analysis_calls(field_info))
+    return build_field_analysis(field_info, call_results)
 
 def save_analysis_report(studio_fields, filename="studio_fields_analysis.json"):
     """Save complete analysis report"""
@@ -98,10 +105,19 @@ def save_analysis_report(studio_fields, filename="studio_fields_analysis.json"):
         'fields': []
     }
     
+    # Dispatch the calls of every field at once; they are independent of each other
+    calls = []
+    for field in studio_fields:
+        calls.extend(field_analysis_calls(field))
+    call_results = odoo_config.execute_many(calls)
+    
+    calls_per_field = len(calls) // len(studio_fields) if studio_fields else 0
+    
     for i, field in enumerate(studio_fields, 1):
         print(f"Analyzing field {i}/{len(studio_fields)}: {field['model']}.{field['name']}")
         
-        field_analysis = analyze_field_data(field)
+        offset = (i - 1) * calls_per_field
+        field_analysis = build_field_analysis(field, call_results[offset:offset + calls_per_field])
         field_report = {
             **field,
             'analysis': field_analysis
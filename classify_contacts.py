@@ -2,19 +2,22 @@
 """
 Contact Classification Script
 Classify contacts as customers or vendors based on reference patterns
-Usage: python classify_contacts.py [--dry-run] [--execute]
+Usage: python classify_contacts.py [--dry-run] [--preview] [--execute] [--chunk-size 500] [--write-workers 4] [--page-size 2000] [--shards 1] [--full] [--rules FILE] [--resume [RUN_ID]]
+                                     [--events FILE] [--quiet] [--plan FILE]
+       python classify_contacts.py --execute --plan FILE
+       python classify_contacts.py --instances hook,hook_production,hook_local [--execute]
+       python classify_contacts.py --rollback RUN_ID [--execute]
 """
 
 import sys
 import argparse
+import threading
+import time
 from pathlib import Path
 
 # Add current directory to path to import our modules
 sys.path.insert(0, str(Path(__file__).parent))
 
-from _config import connect_odoo
-from _contact_updater import classify_contacts_by_reference
-
 
 def main():
     parser = argparse.ArgumentParser(description='Classify contacts by reference patterns')
@@ -24,16 +27,60 @@ def main():
                        help='Actually perform the updates')
     parser.add_argument('--production', action='store_true',
                        help='Connect to production instance (hook_production) instead of staging (hook)')
+    parser.add_argument('--instances', metavar='A,B,C',
+                       help='Classify several instances concurrently, e.g. hook,hook_production,hook_local')
+    parser.add_argument('--preview', action='store_true',
+                       help='In a dry run, list every contact that would be updated (default: counts only)')
+    parser.add_argument('--chunk-size', type=int, default=500,
+                       help='Contacts updated per write call with --execute (default: 500)')
+    parser.add_argument('--write-workers', type=int, default=4,
+                       help='Write chunks sent concurrently, each its own transaction (default: 4, '
+                            'capped by the instance pool_size)')
+    parser.add_argument('--page-size', type=int, default=2000,
+                       help='Contacts read per page while scanning (default: 2000)')
+    parser.add_argument('--shards', type=int, default=1,
+                       help='Scan the partner table as N id ranges in N worker processes (default: 1)')
+    parser.add_argument('--full', action='store_true',
+                       help='Rescan every partner instead of only those changed since the last successful run')
+    parser.add_argument('--rules', type=Path,
+                       help='Classification rules file (default: ~/.odoo_config/classification_rules.conf, '
+                            'else V* = vendor, C* = customer)')
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='RUN_ID',
+                       help='Continue an interrupted --execute run (default: the latest unfinished one)')
+    parser.add_argument('--rollback', metavar='RUN_ID',
+                       help='Restore the ranks an --execute run changed (dry run unless --execute)')
+    parser.add_argument('--events', type=Path, metavar='FILE',
+                       help='Append one JSON line per contact (id, ref, rule, action, ranks, outcome) to FILE')
+    parser.add_argument('--plan', type=Path, metavar='FILE',
+                       help='Dry run: save the ids to update to FILE; --execute: apply FILE without rescanning')
+    parser.add_argument('--quiet', action='store_true',
+                       help='Print only the results summary (no status lines, contact lines or progress)')
     
     args = parser.parse_args()
+    if args.resume and not args.execute:
+        parser.error('--resume only applies to --execute runs')
+    if args.resume and args.rollback:
+        parser.error('--resume and --rollback cannot be combined')
+    instances = [name.strip() for name in (args.instances or '').split(',') if name.strip()]
+    if instances and args.production:
+        parser.error('--instances cannot be combined with --production')
+    if len(instances) > 1 and args.rollback:
+        parser.error('--rollback undoes one run - name at most one instance with --instances')
+    if len(instances) > 1 and args.resume not in (None, 'latest'):
+        parser.error('--resume RUN_ID names one run - use --resume alone with --instances')
+    if args.write_workers < 1 or args.shards < 1:
+        parser.error('--write-workers and --shards must be at least 1')
+    if args.plan and (args.resume or args.rollback or len(instances) > 1):
+        parser.error('--plan cannot be combined with --resume, --rollback or several --instances')
     
     # Default to dry-run if no specific flag is provided
     dry_run = not args.execute
     
-    print("🏷️  Contact Classification Script")
-    print("=" * 50)
-    print(f"Mode: {'DRY RUN (no changes)' if dry_run else 'EXECUTE (making changes)'}")
-    print("-" * 50)
+    if not args.quiet:
+        print("🏷️  Contact Classification Script")
+        print("=" * 50)
+        print(f"Mode: {'DRY RUN (no changes)' if dry_run else 'EXECUTE (making changes)'}")
+        print("-" * 50)
     
     if not dry_run:
         confirm = input("⚠️  You are about to modify contact data. Are you sure? (yes/no): ")
@@ -41,44 +88,333 @@ def main():
             print("❌ Operation cancelled.")
             return
     
+    if args.rollback:
+        # The journal names the run's instance; --production / --instances only double-check it
+        instance = instances[0] if instances else 'hook_production' if args.production else None
+        return rollback(args.rollback, instance, dry_run, args)
+    
+    # Imported after argument parsing so --help and cancelled runs start fast
+    from _classification_rules import describe_rule, load_rules
+    
+    try:
+        rules = load_rules(args.rules)
+    except (OSError, ValueError) as e:
+        print(f"❌ Script failed: {e}")
+        return 1
+    if not args.quiet:
+        print("📐 Rules: " + "; ".join(f"{describe_rule(rule)} -> {rule[0]} ({', '.join(rule[2])})"
+                                      for rule in rules))
+    
+    if len(instances) > 1:
+        return classify_instances(instances, args, rules, dry_run)
+    instance = instances[0] if instances else 'hook_production' if args.production else 'hook'
+    return classify_instance(instance, args, rules, dry_run, [instance])[0]
+
+
+def classify_instance(instance, args, rules, dry_run, instances):
+    """Classify one instance of instances (those running at once); return (exit code, results or None)"""
+    from _classification_plan import build_plan, load_plan, write_plan
+    from _classification_rules import rules_fingerprint
+    from _config import connect_odoo
+    from _contact_updater import apply_classification_plan, classify_contacts_by_reference
+    from _event_stream import EventStream, events_path
+    from _run_journal import RunJournal, find_unfinished_run, new_run_id
+    from _scan_watermark import load_watermark, save_watermark
+    
+    # Contact lines only when a dry run lists them and no events file takes them; otherwise a
+    # progress line, unless several instances share the terminal
+    echo = args.preview and not args.events
+    events = EventStream(events_path(args.events, instance, instances), echo=echo,
+                         progress=not echo and len(instances) == 1 and sys.stderr.isatty(),
+                         quiet=args.quiet, instance=instance if len(instances) > 1 else None)
+    journal = None
+    plan = planned = None
     try:
+        # A plan to apply is checked before connecting: it must come from this instance and rules
+        if args.plan and not dry_run:
+            plan = load_plan(args.plan)
+            if plan['instance'] != instance or plan['rules'] != rules_fingerprint(rules):
+                print(f"❌ Plan {args.plan} was made for "
+                      f"{'other rules' if plan['instance'] == instance else plan['instance']} - run the dry run again")
+                return 1, None
+        
         # Connect to Hook Odoo instance
-        instance = 'hook_production' if '--production' in sys.argv else 'hook'
-        print(f"🔌 Connecting to Hook Odoo ({instance})...")
+        events.info(f"🔌 Connecting to Hook Odoo ({instance})...")
         models, db, uid, password = connect_odoo(instance)
-        print("✅ Connected successfully")
+        events.info("✅ Connected successfully")
+        
+        # Only partners changed since the last successful run, unless --full
+        since = None if args.full else load_watermark(instance)
+        if plan is not None:
+            since = plan['since']
+        elif since and since.get('rules') != rules_fingerprint(rules):
+            events.info("📐 Rules changed since the last run - rescanning every partner")
+            since = None
         
-        # Run classification
-        print("\n🔄 Starting contact classification...")
-        results = classify_contacts_by_reference(models, db, uid, password, dry_run=dry_run)
+        # Every execute run is journaled, so it can be resumed if it dies halfway
+        if args.resume:
+            run_id = find_unfinished_run(instance) if args.resume == 'latest' else args.resume
+            if not run_id:
+                print(f"❌ No unfinished run of {instance} to resume")
+                return 1, None
+            journal = RunJournal(run_id, resume=True)
+            if journal.finished or journal.instance != instance:
+                print(f"❌ Run {run_id} {'already finished' if journal.finished else f'is not a run of {instance}'}")
+                return 1, None
+            if journal.rules != rules_fingerprint(rules):
+                print(f"❌ Rules changed since run {run_id} started - rerun without --resume")
+                return 1, None
+            since = journal.since
+            events.info(f"📒 Resuming run {run_id} ({len(journal.applied_ids)} contacts already applied)")
+        elif not dry_run:
+            journal = RunJournal(new_run_id(instance))
+            journal.start(instance, since, rules_fingerprint(rules))
+            events.info(f"📒 Journal: {journal.path}")
+        
+        # Run classification; an events file gets every contact, even in a dry run
+        if plan is not None:
+            events.info(f"\n📋 Applying plan {args.plan} "
+                        f"({sum(len(group['ids']) for group in plan['groups'])} contacts)...")
+            results = apply_classification_plan(models, db, uid, password, plan, rules, chunk_size=args.chunk_size,
+                                                journal=journal, events=events, write_workers=args.write_workers)
+        else:
+            events.info(f"\n🔄 Starting {'incremental' if since else 'full'} contact classification...")
+            planned = {} if args.plan else None
+            results = classify_contacts_by_reference(models, db, uid, password, dry_run=dry_run,
+                                                     chunk_size=args.chunk_size,
+                                                     preview=args.preview or bool(args.events),
+                                                     page_size=args.page_size, since=since, rules=rules,
+                                                     journal=journal, events=events, plan=planned,
+                                                     write_workers=args.write_workers, shards=args.shards,
+                                                     instance=instance)
+        events.close()
+        # A stale plan writes nothing: its journal is closed rather than left to resume
+        if journal is not None and (results['completed'] or results.get('drifted')):
+            journal.finish({'updated': sum(results[f'{label}s_updated'] for label in results['rules']),
+                            'errors': len(results['errors'])})
         
         # Display results
         print("\n" + "=" * 50)
         print("📊 CLASSIFICATION RESULTS")
         print("=" * 50)
-        print(f"Vendors found: {results['vendors_found']}")
-        print(f"Vendors updated: {results['vendors_updated']}")
-        print(f"Customers found: {results['customers_found']}")
-        print(f"Customers updated: {results['customers_updated']}")
+        for label in results['rules']:
+            plural = f"{label}s"
+            print(f"{plural.capitalize()} found: {results[f'{plural}_found']}")
+            print(f"{plural.capitalize()} already classified: {results[f'{plural}_already']}")
+            print(f"{plural.capitalize()} needing update: {results[f'{plural}_to_update']}")
+            print(f"{plural.capitalize()} updated: {results[f'{plural}_updated']}")
         
         if results['errors']:
             print(f"\n❌ Errors encountered: {len(results['errors'])}")
             for error in results['errors']:
                 print(f"   - {error}")
         
-        total_updated = results['vendors_updated'] + results['customers_updated']
+        total_updated = sum(results[f'{label}s_updated'] for label in results['rules'])
         if dry_run:
             print(f"\n🔍 Would update {total_updated} contacts total")
-            print("💡 Run with --execute to perform actual updates")
+            events.info("💡 Run with --execute to perform actual updates")
         else:
             print(f"\n✅ Successfully updated {total_updated} contacts")
-            print("🎯 Contacts should now appear in proper sections:")
-            print("   - Vendors in Purchasing > Vendors")
-            print("   - Customers in Sales > Customers")
+            events.info("🎯 Contacts should now appear in proper sections:\n"
+                        "   - Vendors in Purchasing > Vendors\n"
+                        "   - Customers in Sales > Customers")
+        if args.events:
+            events.info(f"🧾 {events.events} contact events written to {events.path}")
+        if planned is not None and results['completed'] and not results['errors']:
+            found = {label: results[f'{label}s_found'] for label in results['rules']}
+            write_plan(args.plan, build_plan(instance, rules_fingerprint(rules), since, results['watermark'],
+                                             planned, found))
+            events.info(f"📋 Plan saved to {args.plan} - apply it with: "
+                        f"python classify_contacts.py --execute --plan {args.plan}")
+        elif planned is not None:
+            print("📋 Plan not saved because of errors")
+        
+        watermark = results['watermark']
+        current = load_watermark(instance) if plan is not None else None
+        if plan is not None and current and watermark and \
+                (current['write_date'] or '', current['id']) > (watermark['write_date'] or '', watermark['id']):
+            events.info("🕒 Watermark kept: a later run already advanced it past this plan's dry run")
+        elif not dry_run and not results['errors'] and watermark:
+            save_watermark(instance, watermark)
+            events.info(f"🕒 Next run will only examine partners changed since "
+                        f"{watermark['write_date']} (use --full to rescan everything)")
+        elif not dry_run and results['errors']:
+            print("🕒 Watermark not advanced because of errors - the next run rescans the same partners")
+        if results.get('drifted'):
+            return 1, results
+        if journal is not None and not results['completed']:
+            print(f"⏯️  Run interrupted - continue it with: python classify_contacts.py --execute --resume "
+                  f"{journal.run_id}")
+            return 1, results
         
     except Exception as e:
         print(f"❌ Script failed: {e}")
+        return 1, None
+    finally:
+        events.close()
+        if journal is not None:
+            journal.close()
+    
+    return 0, results
+
+
+def classify_instances(instances, args, rules, dry_run):
+    """
+    Classify several instances concurrently - each on its own connection
+    pool and limiter - and print one merged summary with per-instance timings
+    
+    Output lines of each instance are prefixed with its name.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from _rpc_transport import pool_stats
+    
+    output = PrefixedOutput(sys.stdout)
+    
+    def run(instance):
+        output.set_prefix(f"[{instance}] ")
+        start = time.perf_counter()
+        try:
+            code, results = classify_instance(instance, args, rules, dry_run, instances)
+        finally:
+            output.set_prefix(None)
+        return code, results, time.perf_counter() - start
+    
+    if not args.quiet:
+        print(f"🚀 Classifying {len(instances)} instances concurrently: {', '.join(instances)}")
+    start = time.perf_counter()
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(instances)) as executor:
+            outcomes = dict(zip(instances, executor.map(run, instances)))
+    finally:
+        sys.stdout = output.stream
+    wall = time.perf_counter() - start
+    requests = {instance: stats['requests'] for instance, stats in pool_stats().items()}
+    
+    print("\n" + "=" * 78)
+    print("📊 MULTI-INSTANCE SUMMARY")
+    print("=" * 78)
+    print(f"{'Instance':<20} {'status':<7} {'found':>8} {'to update':>10} {'updated':>8} {'errors':>7} "
+          f"{'RPCs':>6} {'wall s':>7}")
+    print("-" * 78)
+    totals = {'found': 0, 'to_update': 0, 'updated': 0, 'errors': 0}
+    for instance, (code, results, elapsed) in outcomes.items():
+        if results is None:
+            print(f"{instance:<20} {'❌':<6} {'-':>8} {'-':>10} {'-':>8} {'-':>7} {requests.get(instance, 0):>6} "
+                  f"{elapsed:>7.2f}")
+            continue
+        counts = {count: sum(results[f'{label}s_{count}'] for label in results['rules'])
+                  for count in ('found', 'to_update', 'updated')}
+        counts['errors'] = len(results['errors'])
+        for count, value in counts.items():
+            totals[count] += value
+        print(f"{instance:<20} {'✅' if code == 0 else '❌':<6} {counts['found']:>8} {counts['to_update']:>10} "
+              f"{counts['updated']:>8} {counts['errors']:>7} {requests.get(instance, 0):>6} {elapsed:>7.2f}")
+    print("-" * 78)
+    print(f"{'TOTAL':<20} {'':<6} {totals['found']:>8} {totals['to_update']:>10} {totals['updated']:>8} "
+          f"{totals['errors']:>7} {sum(requests.get(instance, 0) for instance in instances):>6} {wall:>7.2f}")
+    print(f"\n⏱️  Wall time {wall:.2f}s (instances one after another: "
+          f"{sum(elapsed for code, results, elapsed in outcomes.values()):.2f}s)")
+    
+    return max(code for code, results, elapsed in outcomes.values())
+
+
+class PrefixedOutput:
+    """sys.stdout stand-in that prefixes each line written by a thread with that thread's prefix"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    def set_prefix(self, prefix):
+        """Set (or with None, clear) the calling thread's prefix, writing out any unfinished line"""
+        pending = getattr(self._local, 'pending', '')
+        if pending:
+            self._emit([pending])
+        self._local.prefix = prefix
+        self._local.pending = ''
+    
+    def write(self, text):
+        prefix = getattr(self._local, 'prefix', None)
+        if prefix is None:
+            with self._lock:
+                return self.stream.write(text)
+        *lines, self._local.pending = (self._local.pending + text).split('\n')
+        if lines:
+            self._emit(lines)
+        return len(text)
+    
+    def _emit(self, lines):
+        prefix = self._local.prefix
+        with self._lock:
+            self.stream.write(''.join(f"{prefix}{line}\n" for line in lines))
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def rollback(run_id, instance, dry_run, args):
+    """
+    Restore the rank values recorded in a run's journal, on the instance the
+    run was made on (which must be instance, when one is given)
+    """
+    from _config import connect_odoo
+    from _contact_updater import rollback_classification
+    from _event_stream import EventStream
+    from _run_journal import RunJournal
+    
+    events = EventStream(args.events, quiet=args.quiet)
+    journal = None
+    try:
+        journal = RunJournal(run_id, resume=True)
+        if not journal.instance or (instance and journal.instance != instance):
+            print(f"❌ Run {run_id} is not a run of {instance or 'any instance'}")
+            return 1
+        instance = journal.instance
+        events.info(f"↩️  Rolling back run {run_id}: {len(journal.changes)} write batches recorded")
+        
+        events.info(f"🔌 Connecting to Hook Odoo ({instance})...")
+        models, db, uid, password = connect_odoo(instance)
+        events.info("✅ Connected successfully")
+        
+        results = rollback_classification(models, db, uid, password, journal.changes, dry_run=dry_run,
+                                          chunk_size=args.chunk_size, write_workers=args.write_workers,
+                                          events=events)
+        events.close()
+        
+        print("\n" + "=" * 50)
+        print("📊 ROLLBACK RESULTS")
+        print("=" * 50)
+        print(f"Rank values changed by the run: {results['recorded']}")
+        print(f"Changed again since (left alone): {results['changed_since']}")
+        print(f"{'Would restore' if dry_run else 'Restored'}: "
+              f"{results['restorable'] if dry_run else results['restored']}")
+        
+        if results['errors']:
+            print(f"\n❌ Errors encountered: {len(results['errors'])}")
+            for error in results['errors']:
+                print(f"   - {error}")
+            return 1
+        if args.events:
+            events.info(f"🧾 {events.events} contact events written to {events.path}")
+        if dry_run:
+            events.info("💡 Run with --execute to perform the rollback")
+        else:
+            journal.record_rollback({'restored': results['restored'], 'changed_since': results['changed_since']})
+            events.info("🕒 Restored contacts count as changed: fix the rules before the next run, "
+                        "or they are classified again")
+        
+    except Exception as e:
+        print(f"❌ Rollback failed: {e}")
         return 1
+    finally:
+        events.close()
+        if journal is not None:
+            journal.close()
     
     return 0
 